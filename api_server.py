@@ -0,0 +1,383 @@
+"""
+Servidor HTTP/JSON do PROFOCO para integração com o LMS e clientes em lote
+
+Expõe as operações do Database e do OllamaClient sem passar pela interface do
+Streamlit: questionários, envio de respostas (corrigidas na hora; a análise da IA
+entra na fila em segundo plano), resultados e geração de questionários (jobs
+persistidos, executados pelo worker). Pode rodar ao lado do app.py sobre o mesmo
+profoco.db: os envios aparecem no Dashboard e os jobs são disputados pelos mesmos
+workers.
+
+Os handlers são assíncronos; as consultas ao banco (SQLite, bloqueantes) rodam no
+pool de threads, e todas as requisições compartilham o mesmo Database e o mesmo
+OllamaClient (um pool de conexões HTTP por servidor Ollama).
+
+Rotas:
+    GET  /saude
+    GET  /questionarios[?disciplina=]
+    GET  /questionarios/{id}
+    POST /questionarios/{id}/respostas   {"nome_aluno", "matricula_aluno"?, "respostas": ["A", ...]}
+    POST /respostas/lote                 {"envios": [{"id_questionario", "nome_aluno", ...}, ...]}
+    GET  /resultados[?disciplina=&id_questionario=&aluno=&data_inicio=&data_fim=&limite=&deslocamento=]
+    GET  /resultados/novos?desde=ID[&limite=]
+    GET  /resultados/{id}
+    POST /resultados/lote                {"ids": [1, 2, ...]}
+    POST /geracoes                       {"disciplina", "topico", "num_questoes"?}
+    POST /geracoes/lote                  {"geracoes": [{...}, ...]}
+    GET  /geracoes/{id}
+
+Uso:
+    python api_server.py [--host 127.0.0.1] [--porta 8600] [--db profoco.db]
+"""
+import argparse
+import logging
+from typing import Dict, List, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from database import Database
+from json_extractor import LETRAS_OPCOES
+from ollama_client import OllamaClient, definir_sessao
+from tasks import (
+    analisar_resultado, criar_cliente, obter_fila, obter_fila_reforco, recuperar_analises_pendentes
+)
+from worker import JOB_GERAR_QUESTIONARIO, iniciar_worker_embutido
+
+logger = logging.getLogger(__name__)
+
+# Itens aceitos por requisição nas rotas de lote
+MAX_LOTE = 500
+
+# Mesmos limites da página "Criar Questionário"
+MIN_QUESTOES = 3
+MAX_QUESTOES = 10
+
+
+def _validar_envio(envio: Dict, questionarios: Dict[int, Dict]) -> Dict:
+    """
+    Confere um envio de respostas (ValueError com o motivo se inválido)
+    
+    Args:
+        envio: id_questionario, nome_aluno, matricula_aluno (opcional) e respostas
+        questionarios: Questionários já lidos, por ID
+    
+    Returns:
+        Dicionário pronto para Database.salvar_resultados (sem nota e análise)
+    """
+    questionario = questionarios.get(envio.get('id_questionario'))
+    if questionario is None:
+        raise ValueError(f"Questionário {envio.get('id_questionario')} não encontrado")
+    
+    nome = envio.get('nome_aluno')
+    if not isinstance(nome, str) or not nome.strip():
+        raise ValueError("'nome_aluno' é obrigatório")
+    
+    respostas = envio.get('respostas')
+    if not isinstance(respostas, list) or len(respostas) != len(questionario['questoes']):
+        raise ValueError(f"'respostas' deve ter {len(questionario['questoes'])} letras")
+    respostas = [str(r).strip().upper() for r in respostas]
+    if any(r not in LETRAS_OPCOES for r in respostas):
+        raise ValueError(f"Respostas válidas: {', '.join(LETRAS_OPCOES)}")
+    
+    return {
+        'id_questionario': questionario['id'],
+        'nome_aluno': nome.strip(),
+        'matricula_aluno': envio.get('matricula_aluno') or None,
+        'respostas': respostas,
+    }
+
+
+def _validar_geracao(parametros: Dict) -> Dict:
+    """Confere os parâmetros de um job de geração (ValueError com o motivo se inválidos)"""
+    disciplina = parametros.get('disciplina')
+    topico = parametros.get('topico')
+    if not isinstance(disciplina, str) or not disciplina.strip():
+        raise ValueError("'disciplina' é obrigatória")
+    if not isinstance(topico, str) or not topico.strip():
+        raise ValueError("'topico' é obrigatório")
+    num_questoes = parametros.get('num_questoes', 5)
+    if not isinstance(num_questoes, int) or not MIN_QUESTOES <= num_questoes <= MAX_QUESTOES:
+        raise ValueError(f"'num_questoes' deve estar entre {MIN_QUESTOES} e {MAX_QUESTOES}")
+    return {'disciplina': disciplina.strip(), 'topico': topico.strip(), 'num_questoes': num_questoes}
+
+
+def _inteiro(valor, nome: str, minimo: int = 0) -> int:
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise HTTPException(400, f"'{nome}' deve ser um número inteiro")
+    if numero < minimo:
+        raise HTTPException(400, f"'{nome}' deve ser no mínimo {minimo}")
+    return numero
+
+
+async def _corpo(request: Request) -> Dict:
+    try:
+        corpo = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Corpo da requisição não é um JSON válido")
+    if not isinstance(corpo, dict):
+        raise HTTPException(400, "O corpo da requisição deve ser um objeto JSON")
+    return corpo
+
+
+def _lote(corpo: Dict, campo: str) -> list:
+    itens = corpo.get(campo)
+    if not isinstance(itens, list) or not itens:
+        raise HTTPException(400, f"'{campo}' deve ser uma lista não vazia")
+    if len(itens) > MAX_LOTE:
+        raise HTTPException(413, f"No máximo {MAX_LOTE} itens por lote")
+    return itens
+
+
+class ApiProfoco:
+    """Handlers da API sobre um Database e um OllamaClient compartilhados"""
+    
+    def __init__(self, db: Database, ollama: OllamaClient):
+        self.db = db
+        self.ollama = ollama
+    
+    def rotas(self) -> List[Route]:
+        return [
+            Route('/saude', self.saude),
+            Route('/questionarios', self.listar_questionarios),
+            Route('/questionarios/{id:int}', self.obter_questionario),
+            Route('/questionarios/{id:int}/respostas', self.enviar_respostas, methods=['POST']),
+            Route('/respostas/lote', self.enviar_respostas_lote, methods=['POST']),
+            Route('/resultados', self.buscar_resultados),
+            Route('/resultados/novos', self.resultados_novos),
+            Route('/resultados/lote', self.obter_resultados_lote, methods=['POST']),
+            Route('/resultados/{id:int}', self.obter_resultado),
+            Route('/geracoes', self.criar_geracao, methods=['POST']),
+            Route('/geracoes/lote', self.criar_geracoes_lote, methods=['POST']),
+            Route('/geracoes/{id:int}', self.obter_geracao),
+        ]
+    
+    # ==================== QUESTIONÁRIOS ====================
+    
+    async def saude(self, request: Request) -> JSONResponse:
+        return JSONResponse({
+            'status': 'ok',
+            'ia': self.ollama.estado_prontidao(),
+            'analises_na_fila': obter_fila().pendentes(),
+            'reforcos_na_fila': obter_fila_reforco().pendentes(),
+        })
+    
+    async def listar_questionarios(self, request: Request) -> JSONResponse:
+        disciplina = request.query_params.get('disciplina')
+        if disciplina:
+            questionarios = await run_in_threadpool(self.db.listar_questionarios_disciplina, disciplina)
+        else:
+            questionarios = await run_in_threadpool(self.db.listar_questionarios)
+        return JSONResponse({'questionarios': questionarios})
+    
+    async def obter_questionario(self, request: Request) -> JSONResponse:
+        questionario = await run_in_threadpool(self.db.obter_questionario, request.path_params['id'])
+        if questionario is None:
+            raise HTTPException(404, "Questionário não encontrado")
+        return JSONResponse(questionario)
+    
+    # ==================== ENVIOS ====================
+    
+    def _enviar(self, envios: List[Dict], sessao: str) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Corrige e salva (em uma transação) os envios válidos e enfileira a análise da IA
+        
+        Returns:
+            (resultados, erros): um item por envio salvo e um por envio recusado,
+            ambos com o 'indice' do envio no lote
+        """
+        questionarios = {}
+        for envio in envios:
+            id_questionario = envio.get('id_questionario') if isinstance(envio, dict) else None
+            if isinstance(id_questionario, int) and id_questionario not in questionarios:
+                questionario = self.db.obter_questionario(id_questionario)
+                if questionario is not None:
+                    questionarios[id_questionario] = questionario
+        
+        validos, erros = [], []
+        for indice, envio in enumerate(envios):
+            try:
+                if not isinstance(envio, dict):
+                    raise ValueError("Cada envio deve ser um objeto JSON")
+                resultado = _validar_envio(envio, questionarios)
+            except ValueError as e:
+                erros.append({'indice': indice, 'erro': str(e)})
+                continue
+            
+            # Nota calculada localmente; os comentários da IA chegam em segundo plano
+            questionario = questionarios[resultado['id_questionario']]
+            analise = self.ollama.corrigir_respostas(
+                questoes=questionario['questoes'],
+                respostas_aluno=resultado['respostas'],
+                topico=questionario['topico']
+            )
+            resultado.update(nota=analise['nota'], analise=analise)
+            validos.append((indice, resultado))
+        
+        ids = self.db.salvar_resultados([resultado for _, resultado in validos]) if validos else []
+        
+        # As análises do cliente formam uma sessão própria no escalonador
+        definir_sessao(sessao)
+        for resultado_id in ids:
+            obter_fila().submit(analisar_resultado, self.db, self.ollama, resultado_id)
+        
+        resultados = [
+            {
+                'indice': indice,
+                'id': resultado_id,
+                'nota': resultado['nota'],
+                'acertos': resultado['analise']['acertos'],
+                'status_analise': resultado['analise']['status_analise'],
+            }
+            for (indice, resultado), resultado_id in zip(validos, ids)
+        ]
+        return resultados, erros
+    
+    async def enviar_respostas(self, request: Request) -> JSONResponse:
+        corpo = await _corpo(request)
+        corpo['id_questionario'] = request.path_params['id']
+        if await run_in_threadpool(self.db.obter_questionario, corpo['id_questionario']) is None:
+            raise HTTPException(404, "Questionário não encontrado")
+        resultados, erros = await run_in_threadpool(self._enviar, [corpo], _sessao(request))
+        if erros:
+            raise HTTPException(400, erros[0]['erro'])
+        resultado = resultados[0]
+        del resultado['indice']
+        return JSONResponse(resultado, status_code=201)
+    
+    async def enviar_respostas_lote(self, request: Request) -> JSONResponse:
+        envios = _lote(await _corpo(request), 'envios')
+        resultados, erros = await run_in_threadpool(self._enviar, envios, _sessao(request))
+        return JSONResponse({'resultados': resultados, 'erros': erros}, status_code=201 if resultados else 400)
+    
+    # ==================== RESULTADOS ====================
+    
+    async def buscar_resultados(self, request: Request) -> JSONResponse:
+        parametros = request.query_params
+        filtros = {
+            'disciplina': parametros.get('disciplina') or None,
+            'id_questionario': (_inteiro(parametros['id_questionario'], 'id_questionario')
+                                if parametros.get('id_questionario') else None),
+            'aluno': parametros.get('aluno') or None,
+            'data_inicio': parametros.get('data_inicio') or None,
+            'data_fim': parametros.get('data_fim') or None,
+        }
+        limite = min(_inteiro(parametros.get('limite', 25), 'limite', 1), MAX_LOTE)
+        deslocamento = _inteiro(parametros.get('deslocamento', 0), 'deslocamento')
+        
+        total = await run_in_threadpool(self.db.contar_resultados, **filtros)
+        resultados = await run_in_threadpool(
+            self.db.buscar_resultados, **filtros, limite=limite, deslocamento=deslocamento
+        )
+        return JSONResponse({'total': total, 'resultados': resultados})
+    
+    async def resultados_novos(self, request: Request) -> JSONResponse:
+        """Feed de mudanças: resultados com ID acima de 'desde', para o LMS sincronizar por polling"""
+        desde = _inteiro(request.query_params.get('desde', 0), 'desde')
+        limite = min(_inteiro(request.query_params.get('limite', MAX_LOTE), 'limite', 1), MAX_LOTE)
+        resultados = await run_in_threadpool(self.db.resultados_desde, desde, limite)
+        return JSONResponse({
+            'resultados': resultados,
+            'ultimo_id': resultados[-1]['id'] if resultados else desde,
+            'mais': len(resultados) == limite,
+        })
+    
+    async def obter_resultado(self, request: Request) -> JSONResponse:
+        resultado = await run_in_threadpool(self.db.obter_resultado, request.path_params['id'])
+        if resultado is None:
+            raise HTTPException(404, "Resultado não encontrado")
+        return JSONResponse(resultado)
+    
+    async def obter_resultados_lote(self, request: Request) -> JSONResponse:
+        ids = _lote(await _corpo(request), 'ids')
+        if not all(isinstance(resultado_id, int) for resultado_id in ids):
+            raise HTTPException(400, "'ids' deve conter apenas números inteiros")
+        resultados = await run_in_threadpool(self.db.obter_resultados, ids)
+        encontrados = {r['id'] for r in resultados}
+        return JSONResponse({
+            'resultados': resultados,
+            'nao_encontrados': [resultado_id for resultado_id in ids if resultado_id not in encontrados],
+        })
+    
+    # ==================== GERAÇÃO DE QUESTIONÁRIOS ====================
+    
+    def _criar_jobs(self, lista: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        jobs, erros = [], []
+        for indice, parametros in enumerate(lista):
+            try:
+                if not isinstance(parametros, dict):
+                    raise ValueError("Cada geração deve ser um objeto JSON")
+                parametros = _validar_geracao(parametros)
+            except ValueError as e:
+                erros.append({'indice': indice, 'erro': str(e)})
+                continue
+            jobs.append({'indice': indice, 'id': self.db.criar_job(JOB_GERAR_QUESTIONARIO, parametros),
+                         'status': 'pendente'})
+        return jobs, erros
+    
+    async def criar_geracao(self, request: Request) -> JSONResponse:
+        jobs, erros = await run_in_threadpool(self._criar_jobs, [await _corpo(request)])
+        if erros:
+            raise HTTPException(400, erros[0]['erro'])
+        job = jobs[0]
+        del job['indice']
+        return JSONResponse(job, status_code=202)
+    
+    async def criar_geracoes_lote(self, request: Request) -> JSONResponse:
+        geracoes = _lote(await _corpo(request), 'geracoes')
+        jobs, erros = await run_in_threadpool(self._criar_jobs, geracoes)
+        return JSONResponse({'jobs': jobs, 'erros': erros}, status_code=202 if jobs else 400)
+    
+    async def obter_geracao(self, request: Request) -> JSONResponse:
+        job = await run_in_threadpool(self.db.obter_job, request.path_params['id'])
+        if job is None or job['tipo'] != JOB_GERAR_QUESTIONARIO:
+            raise HTTPException(404, "Geração não encontrada")
+        return JSONResponse(job)
+
+
+def _sessao(request: Request) -> str:
+    """Sessão do escalonador do Ollama: uma por cliente (divisão justa entre os clientes da API)"""
+    return f"api-{request.client.host if request.client else 'local'}"
+
+
+async def _erro_http(request: Request, exc: HTTPException) -> JSONResponse:
+    return JSONResponse({'erro': exc.detail}, status_code=exc.status_code)
+
+
+def criar_app(db: Database, ollama: OllamaClient) -> Starlette:
+    """Aplicação ASGI da API (use com uvicorn ou com o TestClient do Starlette)"""
+    return Starlette(routes=ApiProfoco(db, ollama).rotas(), exception_handlers={HTTPException: _erro_http})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default="127.0.0.1", help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument('--porta', type=int, default=8600, help="porta (padrão: 8600)")
+    parser.add_argument('--db', default="profoco.db", help="arquivo do banco (padrão: profoco.db)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    db = Database(args.db)
+    ollama = criar_cliente(db)
+    ollama.iniciar_aquecimento()
+    
+    # Análises de envios feitos pela API antes de um reinício voltam para a fila
+    recuperar_analises_pendentes(db, ollama)
+    
+    # Jobs de geração: o worker embutido divide a fila com os do app (PROFOCO_WORKER_EMBUTIDO=0 desativa)
+    iniciar_worker_embutido(db, ollama)
+    
+    logger.info("API do PROFOCO em http://%s:%s (banco %s)", args.host, args.porta, args.db)
+    uvicorn.run(criar_app(db, ollama), host=args.host, port=args.porta, log_level="info")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark do extrator de JSON (json_extractor.py)
+
+Reexecuta o corpus sintético de respostas (corpus_respostas.jsonl, montado à mão com os
+formatos que o código anterior precisava tratar, não gravado do modelo) e mostra, para o
+extrator atual e para o algoritmo antigo de OllamaClient._extract_json, a taxa de
+sucesso (JSON extraído e questões normalizadas) e a vazão, também separada entre as
+respostas com JSON válido (que o algoritmo antigo aceitava) e as malformadas.
+
+Uso:
+    python benchmarks/bench_parser.py [--repeticoes 200] [--corpus caminho.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from json_extractor import extract_json, normalizar_questoes  # noqa: E402
+
+CORPUS_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus_respostas.jsonl')
+
+
+def extrator_legado(text: str):
+    """Algoritmo anterior: divide em blocos ``` e tenta até quatro json.loads"""
+    text = text.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    
+    if text.startswith('['):
+        end_idx = text.rfind(']')
+        if end_idx != -1:
+            try:
+                return json.loads(text[:end_idx + 1])
+            except json.JSONDecodeError:
+                pass
+    
+    start_idx = text.find('{')
+    end_idx = text.rfind('}')
+    if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+        try:
+            return json.loads(text[start_idx:end_idx + 1])
+        except json.JSONDecodeError:
+            pass
+    
+    start_idx = text.find('[')
+    end_idx = text.rfind(']')
+    if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+        try:
+            return json.loads(text[start_idx:end_idx + 1])
+        except json.JSONDecodeError:
+            pass
+    
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("JSON não encontrado")
+
+
+def carregar_corpus(caminho: str):
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def avaliar(caso, extrator) -> bool:
+    """Sucesso = o resultado esperado foi obtido (0 esperado = erro reportado corretamente)"""
+    try:
+        data = extrator(caso['texto'])
+    except ValueError:
+        return caso['esperado'] == 0
+    
+    if caso['tarefa'] == 'analise':
+        return isinstance(data, dict) and 'nivel_dominio' in data
+    return caso['esperado'] > 0 and len(normalizar_questoes(data)) >= caso['esperado']
+
+
+def medir(extrator, casos, repeticoes: int):
+    falhas = [caso for caso in casos if not avaliar(caso, extrator)]
+    
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for caso in casos:
+            try:
+                extrator(caso['texto'])
+            except ValueError:
+                pass
+    duracao = time.perf_counter() - inicio
+    
+    total_bytes = sum(len(caso['texto'].encode('utf-8')) for caso in casos) * repeticoes
+    return {
+        'sucessos': len(casos) - len(falhas),
+        'total': len(casos),
+        'respostas_por_s': len(casos) * repeticoes / duracao,
+        'mb_por_s': total_bytes / duracao / 1e6,
+        'falhas': falhas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--corpus', default=CORPUS_PADRAO)
+    args = parser.parse_args()
+    
+    casos = carregar_corpus(args.corpus)
+    print(f"Corpus: {len(casos)} respostas, {args.repeticoes} repetições\n")
+    print(f"{'Extrator':<12} {'Sucesso':>14} {'Respostas/s':>14} {'MB/s':>8}")
+    
+    resultados = {
+        'legado': medir(extrator_legado, casos, args.repeticoes),
+        'atual': medir(extract_json, casos, args.repeticoes),
+    }
+    for nome, r in resultados.items():
+        taxa = r['sucessos'] / r['total'] * 100
+        print(f"{nome:<12} {r['sucessos']:>4}/{r['total']:<3} {taxa:5.1f}% {r['respostas_por_s']:>14.0f} {r['mb_por_s']:>8.2f}")
+    
+    # Vazão por grupo: JSON válido (aceito pelo algoritmo antigo) e malformado
+    rejeitados = {caso['id'] for caso in resultados['legado']['falhas']}
+    grupos = {
+        'JSON válido': [caso for caso in casos if caso['id'] not in rejeitados],
+        'malformado': [caso for caso in casos if caso['id'] in rejeitados],
+    }
+    print(f"\n{'Respostas/s':<12} {'legado':>14} {'atual':>14}")
+    for grupo, casos_grupo in grupos.items():
+        if casos_grupo:
+            vazoes = [medir(extrator, casos_grupo, args.repeticoes)['respostas_por_s']
+                      for extrator in (extrator_legado, extract_json)]
+            print(f"{grupo:<12} {vazoes[0]:>14.0f} {vazoes[1]:>14.0f}")
+    
+    for nome, r in resultados.items():
+        if r['falhas']:
+            print(f"\nFalhas ({nome}):")
+            for caso in r['falhas']:
+                print(f"  #{caso['id']:<3} {caso['descricao']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Tempo de inicialização do app.py: importação das páginas e primeira pintura de cada tela
+
+Cada medição roda em um interpretador novo (partida a frio), com o Streamlit já
+importado, como no servidor:
+  - importação: import de paginas.comum, paginas.aluno e paginas.professor;
+  - primeira pintura: primeira execução do app.py (AppTest) na tela inicial, na área
+    do aluno e na área do professor, incluindo a criação do banco e do cliente de IA.
+
+As medianas são comparadas com o orçamento de cada item; o comando termina com código 1
+se algum item estourar o orçamento. O banco é criado em um diretório temporário e o
+cliente de IA aponta para o Ollama falso (fake_ollama.py), nunca para o profoco.db ou
+para o Ollama real.
+
+Uso:
+    python benchmarks/bench_startup.py [--repeticoes 5] [--orcamento-tela-inicial 1]
+                                       [--orcamento-aluno 2] [--orcamento-professor 3]
+                                       [--json inicializacao.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_ollama  # noqa: E402
+
+MODULOS = ['paginas.comum', 'paginas.aluno', 'paginas.professor']
+TELAS = ['inicial', 'aluno', 'professor']
+
+# Orçamento padrão (segundos, mediana) da primeira pintura de cada tela
+ORCAMENTO_TELA_INICIAL = 1.0
+ORCAMENTO_ALUNO = 2.0
+ORCAMENTO_PROFESSOR = 3.0
+
+# Aluno fictício da área do aluno (a página inicial só consulta os resultados dele)
+_ALUNO = {'id': 0, 'nome': 'Aluno do Benchmark', 'matricula': None}
+
+
+def _filho_importacao(modulo: str) -> Dict:
+    """Importa o Streamlit e depois o módulo, medindo cada etapa"""
+    inicio = time.perf_counter()
+    import streamlit  # noqa: F401
+    streamlit_s = time.perf_counter() - inicio
+    
+    inicio = time.perf_counter()
+    __import__(modulo)
+    return {'streamlit': streamlit_s, 'segundos': time.perf_counter() - inicio,
+            'pandas': 'pandas' in sys.modules}
+
+
+def _filho_pintura(tela: str) -> Dict:
+    """Primeira execução do app.py na tela, em um diretório vazio (banco novo)"""
+    from streamlit.testing.v1 import AppTest
+    
+    app = AppTest.from_file(os.path.join(RAIZ, 'app.py'), default_timeout=60)
+    if tela != 'inicial':
+        app.session_state['perfil'] = tela
+    if tela == 'aluno':
+        app.session_state['aluno_autenticado'] = _ALUNO
+    
+    inicio = time.perf_counter()
+    app.run()
+    return {
+        'segundos': time.perf_counter() - inicio,
+        'erros': [e.value for e in app.exception],
+        'pandas': 'pandas' in sys.modules,
+        'ollama_client': 'ollama_client' in sys.modules,
+    }
+
+
+def _executar_filho(argumentos: List[str], url: str) -> Dict:
+    with tempfile.TemporaryDirectory(prefix='profoco-startup-') as diretorio:
+        env = dict(os.environ, PROFOCO_OLLAMA_HOSTS=url, PROFOCO_WORKER_EMBUTIDO='0',
+                   PYTHONPATH=RAIZ)
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--filho', *argumentos],
+            cwd=diretorio, env=env, capture_output=True, text=True, check=True
+        )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def medir(repeticoes: int, url: str) -> Dict:
+    """Medianas de importação e de primeira pintura em repeticoes partidas a frio"""
+    importacao = {}
+    for modulo in MODULOS:
+        amostras = [_executar_filho(['importacao', modulo], url) for _ in range(repeticoes)]
+        importacao[modulo] = {
+            'segundos': statistics.median(a['segundos'] for a in amostras),
+            'streamlit': statistics.median(a['streamlit'] for a in amostras),
+            'pandas': amostras[0]['pandas'],
+        }
+    
+    pintura = {}
+    for tela in TELAS:
+        amostras = [_executar_filho(['pintura', tela], url) for _ in range(repeticoes)]
+        pintura[tela] = {
+            'segundos': statistics.median(a['segundos'] for a in amostras),
+            'maximo': max(a['segundos'] for a in amostras),
+            'pandas': amostras[0]['pandas'],
+            'ollama_client': amostras[0]['ollama_client'],
+            'erros': sorted({e for a in amostras for e in a['erros']}),
+        }
+    return {'importacao': importacao, 'pintura': pintura}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=5, help="partidas a frio por medição (padrão: 5)")
+    parser.add_argument('--orcamento-tela-inicial', type=float, default=ORCAMENTO_TELA_INICIAL,
+                        help=f"segundos para pintar a tela inicial (padrão: {ORCAMENTO_TELA_INICIAL})")
+    parser.add_argument('--orcamento-aluno', type=float, default=ORCAMENTO_ALUNO,
+                        help=f"segundos para pintar o início do aluno (padrão: {ORCAMENTO_ALUNO})")
+    parser.add_argument('--orcamento-professor', type=float, default=ORCAMENTO_PROFESSOR,
+                        help=f"segundos para pintar o início do professor (padrão: {ORCAMENTO_PROFESSOR})")
+    parser.add_argument('--json', help="grava o relatório neste arquivo")
+    parser.add_argument('--filho', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.filho:
+        modo, alvo = args.filho
+        medicao = _filho_importacao(alvo) if modo == 'importacao' else _filho_pintura(alvo)
+        print(json.dumps(medicao))
+        return
+    
+    servidor = fake_ollama.iniciar(porta=0, latencia=0.0)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    try:
+        relatorio = medir(args.repeticoes, url)
+    finally:
+        servidor.shutdown()
+    orcamento = {
+        'inicial': args.orcamento_tela_inicial,
+        'aluno': args.orcamento_aluno,
+        'professor': args.orcamento_professor,
+    }
+    relatorio['orcamento'] = orcamento
+    
+    print(f"Partidas a frio por medição: {args.repeticoes} (medianas)\n")
+    print(f"{'Importação (após o Streamlit)':<32} {'Segundos':>9}  pandas")
+    for modulo, r in relatorio['importacao'].items():
+        print(f"{modulo:<32} {r['segundos']:>9.3f}  {'sim' if r['pandas'] else 'não'}")
+    streamlit_s = statistics.median(r['streamlit'] for r in relatorio['importacao'].values())
+    print(f"{'(streamlit)':<32} {streamlit_s:>9.3f}")
+    
+    print(f"\n{'Primeira pintura':<18} {'Mediana':>9} {'Máximo':>9} {'Orçamento':>10}  Situação")
+    estourou = False
+    for tela, r in relatorio['pintura'].items():
+        dentro = r['segundos'] <= orcamento[tela] and not r['erros']
+        estourou = estourou or not dentro
+        situacao = "ok" if dentro else ("ERRO" if r['erros'] else "ESTOUROU")
+        carregados = [nome for nome in ('pandas', 'ollama_client') if r[nome]]
+        print(f"{tela:<18} {r['segundos']:>9.3f} {r['maximo']:>9.3f} {orcamento[tela]:>10.2f}  {situacao}"
+              f"  (carregou: {', '.join(carregados) or 'só o Streamlit'})")
+        for erro in r['erros']:
+            print(f"    {erro}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if estourou else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,448 @@
+"""
+Servidor HTTP que imita o Ollama, para testes de carga sem GPU e sem modelo
+
+Implementa /api/generate (com e sem streaming), /api/embed, /api/tags, /api/ps e
+/api/version. As respostas seguem o 'format' (JSON Schema) pedido pelo cliente:
+questões para schema_questoes() e análise para SCHEMA_ANALISE. O tempo de cada
+geração é latência (avaliação do prompt) + tokens / tokens por segundo, e no máximo
+--paralelo gerações rodam ao mesmo tempo (como OLLAMA_NUM_PARALLEL); as demais esperam.
+
+Uma fração das respostas pode ser corrompida (--malformadas) com os defeitos que o
+modelo real produz: texto e cercas de markdown ao redor, JSON truncado, aspas
+simples, vírgula sobrando ou nenhum JSON. Outra fração pode ter a conexão cortada no
+meio da resposta (--cortadas), como quando o Ollama reinicia ou fica sem memória.
+
+Uso:
+    python benchmarks/fake_ollama.py [--porta 11435] [--latencia 0.3] [--tokens-por-s 40]
+                                     [--paralelo 1] [--malformadas 0.05] [--erros 0]
+                                     [--cortadas 0]
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Vocabulário das perguntas geradas; palavras sorteadas mantêm as perguntas
+# distintas também para o índice de embeddings (deduplicação por similaridade)
+_VOCABULARIO = (
+    "equação função verbo sujeito fração área perímetro célula energia força massa "
+    "velocidade revolução império república capital clima relevo bioma átomo molécula "
+    "reação ácido base número primo divisor múltiplo ângulo triângulo círculo raio "
+    "passado presente futuro plural adjetivo advérbio pronome texto poema autor século "
+    "guerra tratado colônia fotossíntese ecossistema cadeia alimentar gene herança "
+    "probabilidade média mediana gráfico tabela vetor matriz limite derivada integral "
+    "leitura escrita gramática ortografia mapa escala latitude longitude continente"
+).split()
+
+MODOS_MALFORMADOS = ('cercado', 'truncado', 'aspas_simples', 'virgula_sobrando', 'sem_json')
+
+DIMENSAO_EMBEDDINGS = 256
+
+
+class ServidorOllamaFalso(ThreadingHTTPServer):
+    """Servidor com a configuração da simulação e os contadores do que foi atendido"""
+    
+    daemon_threads = True
+    
+    def __init__(self, endereco, latencia: float = 0.3, tokens_por_s: float = 40.0,
+                 paralelo: int = 1, malformadas: float = 0.0, erros: float = 0.0,
+                 cortadas: float = 0.0, carga: float = 0.0, variacao: float = 0.2,
+                 modelos: Optional[List[str]] = None, semente: Optional[int] = None):
+        """
+        Args:
+            endereco: (host, porta) do servidor
+            latencia: Segundos de avaliação do prompt antes do primeiro token
+            tokens_por_s: Velocidade de geração
+            paralelo: Gerações simultâneas (as demais esperam na fila)
+            malformadas: Fração das respostas corrompidas (0 a 1)
+            erros: Fração das requisições respondidas com HTTP 500 (0 a 1)
+            cortadas: Fração das requisições com a conexão cortada no meio da resposta (0 a 1)
+            carga: Segundos para carregar um modelo na primeira requisição
+            variacao: Variação aleatória (±) aplicada à latência e à velocidade
+            modelos: Modelos "instalados" (None = aceita qualquer modelo)
+            semente: Semente do gerador aleatório (resultados reproduzíveis)
+        """
+        super().__init__(endereco, _Handler)
+        self.latencia = latencia
+        self.tokens_por_s = tokens_por_s
+        self.malformadas = malformadas
+        self.erros = erros
+        self.cortadas = cortadas
+        self.carga = carga
+        self.variacao = variacao
+        self.modelos = set(modelos) if modelos else None
+        self.carregados = set()
+        self._aleatorio = random.Random(semente)
+        self._slots = threading.BoundedSemaphore(max(1, paralelo))
+        self._lock = threading.Lock()
+        self._contadores = {
+            'requisicoes': 0,
+            'geracoes': 0,
+            'embeddings': 0,
+            'malformadas': 0,
+            'erros_injetados': 0,
+            'cortadas': 0,
+            'em_execucao': 0,
+            'na_fila': 0,
+            'pico_fila': 0,
+            'tokens_gerados': 0,
+        }
+    
+    # ---------- estado compartilhado entre as threads ----------
+    
+    def sortear(self) -> float:
+        with self._lock:
+            return self._aleatorio.random()
+    
+    def escolher(self, opcoes):
+        with self._lock:
+            return self._aleatorio.choice(opcoes)
+    
+    def amostra(self, opcoes, k: int):
+        with self._lock:
+            return self._aleatorio.sample(opcoes, k)
+    
+    def variar(self, valor: float) -> float:
+        """valor com variação aleatória de ±variacao"""
+        return valor * (1 + self.variacao * (2 * self.sortear() - 1))
+    
+    def contar(self, contador: str, quantidade: int = 1):
+        with self._lock:
+            self._contadores[contador] += quantidade
+            if contador == 'na_fila':
+                self._contadores['pico_fila'] = max(self._contadores['pico_fila'], self._contadores['na_fila'])
+    
+    def estatisticas(self) -> Dict[str, int]:
+        """Cópia dos contadores (requisições, gerações, respostas corrompidas, pico da fila...)"""
+        with self._lock:
+            return dict(self._contadores)
+    
+    def modelo_instalado(self, modelo: str) -> bool:
+        return self.modelos is None or modelo in self.modelos or f"{modelo}:latest" in self.modelos
+    
+    def ocupar_slot(self):
+        """Espera uma vaga de geração (no máximo 'paralelo' gerações ao mesmo tempo)"""
+        self.contar('na_fila')
+        self._slots.acquire()
+        self.contar('na_fila', -1)
+        self.contar('em_execucao')
+    
+    def liberar_slot(self):
+        self.contar('em_execucao', -1)
+        self._slots.release()
+    
+    def carregar(self, modelo: str) -> float:
+        """Simula a carga do modelo na primeira vez que ele é usado; retorna a duração"""
+        with self._lock:
+            if modelo in self.carregados:
+                return 0.0
+            self.carregados.add(modelo)
+        time.sleep(self.carga)
+        return self.carga
+
+
+# ==================== CONTEÚDO DAS RESPOSTAS ====================
+
+def _pergunta(servidor: ServidorOllamaFalso) -> str:
+    palavras = servidor.amostra(_VOCABULARIO, 6)
+    return f"Sobre {palavras[0]} e {palavras[1]}, qual afirmação relaciona {', '.join(palavras[2:])}?"
+
+
+def _questoes(servidor: ServidorOllamaFalso, quantidade: int) -> Dict:
+    return {
+        'questoes': [
+            {
+                'pergunta': _pergunta(servidor),
+                'opcoes': [f"{letra}) {' '.join(servidor.amostra(_VOCABULARIO, 3))}" for letra in 'ABCD'],
+                'correta': servidor.escolher('ABCD')
+            }
+            for _ in range(quantidade)
+        ]
+    }
+
+
+def _analise(servidor: ServidorOllamaFalso) -> Dict:
+    return {
+        'nivel_dominio': servidor.escolher(['Iniciante', 'Básico', 'Intermediário', 'Avançado']),
+        'topicos_dificuldade': servidor.amostra(_VOCABULARIO, 2),
+        'recomendacoes': "Revise os exemplos resolvidos e refaça os exercícios em que errou.",
+        'pontos_fortes': "Boa compreensão dos conceitos básicos do tópico."
+    }
+
+
+def conteudo_resposta(servidor: ServidorOllamaFalso, prompt: str, formato) -> Dict:
+    """Gera o JSON que o modelo devolveria para o prompt e o formato pedidos"""
+    propriedades = formato.get('properties', {}) if isinstance(formato, dict) else {}
+    if 'nivel_dominio' in propriedades:
+        return _analise(servidor)
+    if 'questoes' in propriedades:
+        return _questoes(servidor, propriedades['questoes'].get('minItems', 5))
+    
+    # Sem schema: decide pelo prompt
+    if 'nivel_dominio' in prompt:
+        return _analise(servidor)
+    m = re.search(r'(\d+)\s+quest', prompt)
+    return _questoes(servidor, int(m.group(1)) if m else 5)
+
+
+def corromper(texto: str, dados: Dict, modo: str) -> str:
+    """Aplica à resposta um dos defeitos de saída de MODOS_MALFORMADOS"""
+    if modo == 'cercado':
+        return f"Claro! Aqui está o resultado:\n```json\n{texto}\n```\nEspero ter ajudado."
+    if modo == 'truncado':
+        return texto[:max(1, int(len(texto) * 0.8))]
+    if modo == 'aspas_simples':
+        return repr(dados)
+    if modo == 'virgula_sobrando':
+        return texto[:-1] + ',}' if texto.endswith('}') else texto + ','
+    return "Desculpe, não consegui gerar a resposta no formato solicitado."
+
+
+def _embedding(texto: str) -> List[float]:
+    """Saco de palavras com hash estável (textos parecidos têm vetores parecidos)"""
+    vetor = [0.0] * DIMENSAO_EMBEDDINGS
+    for palavra in re.findall(r'\w+', texto.lower()):
+        posicao = int(hashlib.md5(palavra.encode('utf-8')).hexdigest()[:8], 16) % DIMENSAO_EMBEDDINGS
+        vetor[posicao] += 1.0
+    return vetor
+
+
+# ==================== HTTP ====================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: ServidorOllamaFalso
+    
+    def log_message(self, *args):
+        pass
+    
+    def _responder_json(self, obj, status: int = 200):
+        corpo = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+    
+    def _erro(self, status: int, mensagem: str):
+        self._responder_json({'error': mensagem}, status)
+    
+    def _cortar(self, modelo: str):
+        """Anuncia a resposta inteira, envia só o começo e fecha a conexão"""
+        corpo = json.dumps({'model': modelo, 'response': 'x' * 200, 'done': True}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo[:len(corpo) // 2])
+        self.wfile.flush()
+        self.close_connection = True
+    
+    def do_GET(self):
+        self.server.contar('requisicoes')
+        if self.path == '/api/tags':
+            modelos = sorted(self.server.modelos or self.server.carregados)
+            return self._responder_json({'models': [{'name': nome, 'model': nome} for nome in modelos]})
+        if self.path == '/api/ps':
+            return self._responder_json({'models': [{'name': nome, 'model': nome} for nome in sorted(self.server.carregados)]})
+        if self.path == '/api/version':
+            return self._responder_json({'version': '0.0.0-falso'})
+        if self.path == '/estatisticas':
+            return self._responder_json(self.server.estatisticas())
+        self._erro(404, 'not found')
+    
+    def do_POST(self):
+        self.server.contar('requisicoes')
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+            corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            return self._erro(400, 'invalid JSON body')
+        
+        modelo = corpo.get('model', '')
+        if self.path not in ('/api/generate', '/api/embed'):
+            return self._erro(404, 'not found')
+        if not self.server.modelo_instalado(modelo):
+            return self._erro(404, f"model '{modelo}' not found, try pulling it first")
+        if self.server.erros and self.server.sortear() < self.server.erros:
+            self.server.contar('erros_injetados')
+            return self._erro(500, 'erro simulado do servidor')
+        if self.server.cortadas and self.server.sortear() < self.server.cortadas:
+            self.server.contar('cortadas')
+            return self._cortar(modelo)
+        
+        if self.path == '/api/embed':
+            return self._embed(corpo)
+        return self._generate(corpo)
+    
+    def _embed(self, corpo: Dict):
+        self.server.contar('embeddings')
+        entradas = corpo.get('input', [])
+        if isinstance(entradas, str):
+            entradas = [entradas]
+        inicio = time.monotonic()
+        carga = self.server.carregar(corpo['model'])
+        time.sleep(0.002 * len(entradas))
+        self._responder_json({
+            'model': corpo['model'],
+            'embeddings': [_embedding(texto) for texto in entradas],
+            'total_duration': int((time.monotonic() - inicio) * 1e9),
+            'load_duration': int(carga * 1e9),
+            'prompt_eval_count': sum(len(texto) // 4 + 1 for texto in entradas),
+        })
+    
+    def _generate(self, corpo: Dict):
+        servidor = self.server
+        modelo = corpo['model']
+        prompt = corpo.get('prompt', '')
+        
+        if not prompt:
+            # Requisição vazia: apenas carrega o modelo (aquecimento)
+            carga = servidor.carregar(modelo)
+            return self._responder_json({
+                'model': modelo, 'created_at': _agora(), 'response': '', 'done': True,
+                'done_reason': 'load', 'load_duration': int(carga * 1e9)
+            })
+        
+        servidor.contar('geracoes')
+        dados = conteudo_resposta(servidor, prompt + (corpo.get('system') or ''), corpo.get('format'))
+        texto = json.dumps(dados, ensure_ascii=False)
+        if servidor.malformadas and servidor.sortear() < servidor.malformadas:
+            servidor.contar('malformadas')
+            texto = corromper(texto, dados, servidor.escolher(MODOS_MALFORMADOS))
+        
+        tokens = _tokens(texto)
+        servidor.contar('tokens_gerados', len(tokens))
+        
+        inicio = time.monotonic()
+        servidor.ocupar_slot()
+        try:
+            carga = servidor.carregar(modelo)
+            duracao_prompt = servidor.variar(servidor.latencia)
+            intervalo_token = 1.0 / servidor.variar(servidor.tokens_por_s)
+            final = {
+                'model': modelo, 'created_at': _agora(), 'response': '', 'done': True, 'done_reason': 'stop',
+                'load_duration': int(carga * 1e9),
+                'prompt_eval_count': len(prompt) // 4 + 1,
+                'prompt_eval_duration': int(duracao_prompt * 1e9),
+                'eval_count': len(tokens),
+                'eval_duration': int(len(tokens) * intervalo_token * 1e9),
+            }
+            
+            time.sleep(duracao_prompt)
+            if corpo.get('stream', True):
+                self._transmitir(modelo, tokens, intervalo_token, final, inicio)
+            else:
+                time.sleep(len(tokens) * intervalo_token)
+                final['response'] = texto
+                final['total_duration'] = int((time.monotonic() - inicio) * 1e9)
+                self._responder_json(final)
+        finally:
+            servidor.liberar_slot()
+    
+    def _transmitir(self, modelo: str, tokens: List[str], intervalo_token: float, final: Dict, inicio: float):
+        """Envia a resposta como NDJSON em chunks (um objeto por grupo de tokens), como o Ollama"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        # Agrupa tokens para não dormir menos de ~20 ms por vez
+        por_envio = max(1, math.ceil(0.02 / intervalo_token))
+        for i in range(0, len(tokens), por_envio):
+            grupo = tokens[i:i + por_envio]
+            time.sleep(len(grupo) * intervalo_token)
+            self._chunk({'model': modelo, 'created_at': _agora(), 'response': ''.join(grupo), 'done': False})
+        
+        final['total_duration'] = int((time.monotonic() - inicio) * 1e9)
+        self._chunk(final)
+        self.wfile.write(b'0\r\n\r\n')
+    
+    def _chunk(self, obj: Dict):
+        linha = (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+        self.wfile.write(f"{len(linha):x}\r\n".encode('ascii') + linha + b'\r\n')
+        self.wfile.flush()
+
+
+def _tokens(texto: str) -> List[str]:
+    """Divide o texto em "tokens" de ~4 caracteres (a média dos tokenizadores)"""
+    return [texto[i:i + 4] for i in range(0, len(texto), 4)]
+
+
+def _agora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def iniciar(host: str = '127.0.0.1', porta: int = 11435, **configuracao) -> ServidorOllamaFalso:
+    """
+    Inicia o servidor em uma thread daemon e o retorna (use servidor.shutdown() para parar)
+    
+    Args:
+        host: Endereço de escuta
+        porta: Porta (0 = escolhe uma livre; veja servidor.server_address)
+        **configuracao: Parâmetros de ServidorOllamaFalso (latencia, tokens_por_s, ...)
+    """
+    servidor = ServidorOllamaFalso((host, porta), **configuracao)
+    threading.Thread(target=servidor.serve_forever, name='fake-ollama', daemon=True).start()
+    return servidor
+
+
+def adicionar_argumentos(parser: argparse.ArgumentParser):
+    """Opções da simulação, compartilhadas com o teste de carga"""
+    parser.add_argument('--latencia', type=float, default=0.3,
+                        help="segundos de avaliação do prompt antes do primeiro token (padrão: 0.3)")
+    parser.add_argument('--tokens-por-s', type=float, default=40.0,
+                        help="velocidade de geração (padrão: 40)")
+    parser.add_argument('--paralelo', type=int, default=1,
+                        help="gerações simultâneas, como OLLAMA_NUM_PARALLEL (padrão: 1)")
+    parser.add_argument('--malformadas', type=float, default=0.05,
+                        help="fração das respostas corrompidas (padrão: 0.05)")
+    parser.add_argument('--erros', type=float, default=0.0,
+                        help="fração das requisições com HTTP 500 (padrão: 0)")
+    parser.add_argument('--cortadas', type=float, default=0.0,
+                        help="fração das requisições com a conexão cortada no meio da resposta (padrão: 0)")
+    parser.add_argument('--carga', type=float, default=0.0,
+                        help="segundos para carregar o modelo na primeira requisição (padrão: 0)")
+    parser.add_argument('--semente', type=int, default=None)
+
+
+def configuracao_dos_argumentos(args: argparse.Namespace) -> Dict:
+    return {
+        'latencia': args.latencia,
+        'tokens_por_s': args.tokens_por_s,
+        'paralelo': args.paralelo,
+        'malformadas': args.malformadas,
+        'erros': args.erros,
+        'cortadas': args.cortadas,
+        'carga': args.carga,
+        'semente': args.semente,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=11435)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+    
+    servidor = ServidorOllamaFalso((args.host, args.porta), **configuracao_dos_argumentos(args))
+    print(f"Ollama falso em http://{args.host}:{args.porta} (Ctrl+C para parar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(json.dumps(servidor.estatisticas(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
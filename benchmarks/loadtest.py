@@ -0,0 +1,324 @@
+"""
+Teste de carga de uma turma: N alunos respondendo e pedindo reforço ao mesmo tempo
+
+Reproduz o fluxo do app.py com OllamaClient e Database reais: o professor gera os
+questionários; depois cada aluno (uma thread, com a própria sessão no escalonador)
+entra ao longo da rampa, envia as respostas (correção local + análise da IA na fila
+em segundo plano), consulta o banco até a análise ficar pronta e, com nota abaixo
+de 70%, monta o reforço personalizado.
+
+Sem --url, sobe o Ollama falso (fake_ollama.py) no próprio processo; com
+--servidores N, sobe N instâncias e distribui as requisições entre elas (pool de
+servidores). O banco é criado em um diretório temporário (ou em --db), nunca no
+profoco.db.
+
+Uso:
+    python benchmarks/loadtest.py [--alunos 30] [--rampa 10] [--questionarios 3]
+                                  [--url http://lab1:11434,http://lab2:11434 | --servidores 3]
+                                  [--json resultado.json]
+                                  [opções do Ollama falso: --latencia, --tokens-por-s, ...]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_ollama  # noqa: E402
+from database import Database  # noqa: E402
+from ollama_client import OllamaClient, definir_sessao, estatisticas_geracao  # noqa: E402
+from reforco import montar_reforco  # noqa: E402
+from tasks import analisar_resultado, criar_cliente, indexar_questionario, obter_fila  # noqa: E402
+
+NOTA_REFORCO = 70  # o app.py sugere reforço para notas abaixo de 70%
+
+_TOPICOS = [
+    ("Matemática", "Frações"),
+    ("Matemática", "Equações do 1º grau"),
+    ("Inglês", "Verbo To Be"),
+    ("Ciências", "Fotossíntese"),
+    ("História", "Revolução Industrial"),
+]
+
+
+class Medicoes:
+    """Durações e erros de cada operação, registrados pelas threads dos alunos"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._duracoes: Dict[str, List[float]] = defaultdict(list)
+        self._erros: Dict[str, Counter] = defaultdict(Counter)
+    
+    def registrar(self, operacao: str, duracao: float):
+        with self._lock:
+            self._duracoes[operacao].append(duracao)
+    
+    def registrar_erro(self, operacao: str, erro: Exception):
+        with self._lock:
+            self._erros[operacao][type(erro).__name__] += 1
+    
+    @staticmethod
+    def _percentil(valores: List[float], p: float) -> Optional[float]:
+        if not valores:
+            return None
+        ordenados = sorted(valores)
+        return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+    
+    def resumo(self) -> Dict[str, Dict]:
+        """Por operação: execuções, erros (por tipo), p50/p95/p99 e máximo em segundos"""
+        with self._lock:
+            operacoes = sorted(set(self._duracoes) | set(self._erros))
+            resumo = {}
+            for operacao in operacoes:
+                valores = self._duracoes[operacao]
+                erros = sum(self._erros[operacao].values())
+                resumo[operacao] = {
+                    'ok': len(valores),
+                    'erros': erros,
+                    'taxa_erro': erros / ((len(valores) + erros) or 1),
+                    'tipos_erro': dict(self._erros[operacao]),
+                    'p50': self._percentil(valores, 50),
+                    'p95': self._percentil(valores, 95),
+                    'p99': self._percentil(valores, 99),
+                    'max': max(valores) if valores else None,
+                }
+            return resumo
+
+
+def preparar_turma(db: Database, ollama: OllamaClient, num_alunos: int, num_questionarios: int,
+                   num_questoes: int, medicoes: Medicoes) -> List[int]:
+    """Cadastra os alunos e gera os questionários como o professor faria no app"""
+    for n in range(num_alunos):
+        db.criar_aluno(f"Aluno {n:03d}", f"LT{n:04d}")
+    
+    definir_sessao("professor")
+    ids = []
+    for disciplina, topico in _TOPICOS[:num_questionarios]:
+        inicio = time.monotonic()
+        try:
+            questoes = ollama.gerar_questoes(disciplina, topico, num_questoes)
+        except Exception as e:
+            medicoes.registrar_erro('gerar_questionario', e)
+            continue
+        medicoes.registrar('gerar_questionario', time.monotonic() - inicio)
+        id_questionario = db.criar_questionario(disciplina, topico, questoes)
+        obter_fila().submit(indexar_questionario, db, ollama, id_questionario)
+        ids.append(id_questionario)
+    return ids
+
+
+def simular_aluno(n: int, db: Database, ollama: OllamaClient, ids_questionarios: List[int],
+                  medicoes: Medicoes, acerto: float, intervalo_consulta: float,
+                  limite_analise: float, num_reforco: int, aleatorio: random.Random):
+    """Um aluno: entra, responde, espera a análise e, se precisar, monta o reforço"""
+    definir_sessao(f"aluno-{n}")
+    aluno = db.autenticar_aluno(f"LT{n:04d}")
+    questionario = db.obter_questionario(aleatorio.choice(ids_questionarios))
+    questoes = questionario['questoes']
+    respostas = [
+        q['correta'] if aleatorio.random() < acerto else aleatorio.choice([l for l in 'ABCD' if l != q['correta']])
+        for q in questoes
+    ]
+    
+    # Envio: correção local, gravação e análise da IA enfileirada
+    inicio = time.monotonic()
+    try:
+        analise = ollama.corrigir_respostas(questoes, respostas, questionario['topico'])
+        resultado_id = db.salvar_resultado(
+            id_questionario=questionario['id'],
+            nome_aluno=aluno['nome'],
+            respostas=respostas,
+            nota=analise['nota'],
+            analise=analise,
+            matricula_aluno=aluno['matricula']
+        )
+        obter_fila().submit(analisar_resultado, db, ollama, resultado_id)
+    except Exception as e:
+        medicoes.registrar_erro('envio', e)
+        return
+    medicoes.registrar('envio', time.monotonic() - inicio)
+    
+    # A página do resultado consulta o banco periodicamente até a análise terminar
+    while True:
+        resultado = db.obter_resultado(resultado_id)
+        if resultado['analise'].get('status_analise') != 'pendente':
+            medicoes.registrar('analise_pronta', time.monotonic() - inicio)
+            break
+        if time.monotonic() - inicio > limite_analise:
+            medicoes.registrar_erro('analise_pronta', TimeoutError("análise ainda pendente"))
+            break
+        time.sleep(intervalo_consulta)
+    
+    if resultado['nota'] >= NOTA_REFORCO or num_reforco <= 0:
+        return
+    
+    # Reforço: mesmos parâmetros da página "Reforço Personalizado" do aluno
+    inicio = time.monotonic()
+    try:
+        resultados_aluno = db.obter_resultados_aluno(nome_aluno=aluno['nome'], matricula=aluno['matricula'])
+        topicos = sorted({
+            topico
+            for r in resultados_aluno if r['nota'] < NOTA_REFORCO
+            for topico in r['analise'].get('topicos_dificuldade', [])
+        })
+        montar_reforco(
+            db, ollama,
+            topicos_dificuldade=topicos or [questionario['topico']],
+            disciplina=questionario['disciplina'],
+            num_questoes=num_reforco,
+            nome_aluno=aluno['nome'],
+            matricula=aluno['matricula']
+        )
+    except Exception as e:
+        medicoes.registrar_erro('reforco', e)
+        return
+    medicoes.registrar('reforco', time.monotonic() - inicio)
+
+
+def resumo_telemetria(db: Database, campo: str = 'tarefa') -> Dict[str, Dict]:
+    """Chamadas ao modelo por tarefa (ou outro campo, como 'host') e desfecho, lidas da tabela metricas_llm"""
+    grupos: Dict[str, Counter] = defaultdict(Counter)
+    for metrica in db.obter_metricas():
+        grupos[metrica[campo] or '-'][metrica['status']] += 1
+    return {grupo: dict(contagem) for grupo, contagem in sorted(grupos.items())}
+
+
+def _fmt(valor: Optional[float]) -> str:
+    return f"{valor:.2f}" if valor is not None else "-"
+
+
+def imprimir_relatorio(relatorio: Dict):
+    print(f"\nAlunos: {relatorio['alunos']}  Duração: {relatorio['duracao']:.1f}s  "
+          f"Vazão: {relatorio['alunos_por_min']:.1f} alunos/min, "
+          f"{relatorio['chamadas_llm_por_s']:.2f} chamadas ao modelo/s\n")
+    
+    print(f"{'Operação':<20} {'OK':>5} {'Erros':>6} {'Erro %':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'Máx (s)':>8}")
+    for operacao, r in relatorio['operacoes'].items():
+        print(f"{operacao:<20} {r['ok']:>5} {r['erros']:>6} {r['taxa_erro'] * 100:>6.1f}% "
+              f"{_fmt(r['p50']):>8} {_fmt(r['p95']):>8} {_fmt(r['p99']):>8} {_fmt(r['max']):>8}")
+        if r['tipos_erro']:
+            print(f"{'':<20} {r['tipos_erro']}")
+    
+    print("\nChamadas ao modelo (tarefa: desfechos)")
+    for tarefa, desfechos in relatorio['telemetria'].items():
+        print(f"  {tarefa:<12} {desfechos}")
+    
+    if len(relatorio['por_servidor']) > 1:
+        print("\nChamadas ao modelo (servidor: desfechos)")
+        for host, desfechos in relatorio['por_servidor'].items():
+            print(f"  {host:<28} {desfechos}")
+    
+    print("\nGeração por modelo")
+    for modelo, e in relatorio['geracao'].items():
+        print(f"  {modelo:<20} respostas={e['respostas']} retentativas={e['retentativas']} "
+              f"falha={e['taxa_falha_parse'] * 100:.1f}%")
+    
+    for n, estatisticas in enumerate(relatorio.get('servidores_falsos') or []):
+        print(f"\nOllama falso {n + 1}: {estatisticas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--alunos', type=int, default=30, help="alunos simultâneos (padrão: 30)")
+    parser.add_argument('--rampa', type=float, default=10.0,
+                        help="segundos em que os alunos vão entrando (padrão: 10)")
+    parser.add_argument('--questionarios', type=int, default=3, choices=range(1, len(_TOPICOS) + 1))
+    parser.add_argument('--questoes', type=int, default=5, help="questões por questionário (padrão: 5)")
+    parser.add_argument('--reforco', type=int, default=5,
+                        help="questões de reforço por aluno abaixo de 70%% (0 = não pede reforço)")
+    parser.add_argument('--acerto', type=float, default=0.5,
+                        help="probabilidade de o aluno acertar cada questão (padrão: 0.5)")
+    parser.add_argument('--intervalo-consulta', type=float, default=3.0,
+                        help="intervalo entre consultas ao resultado, como a página do aluno (padrão: 3)")
+    parser.add_argument('--limite-analise', type=float, default=600.0,
+                        help="segundos até considerar a análise perdida (padrão: 600)")
+    parser.add_argument('--url', default=None,
+                        help="Ollama a testar; vários separados por vírgula formam um pool "
+                             "(padrão: sobe o Ollama falso no próprio processo)")
+    parser.add_argument('--servidores', type=int, default=1,
+                        help="instâncias do Ollama falso quando não há --url (padrão: 1)")
+    parser.add_argument('--modelo', default=os.environ.get('PROFOCO_MODELO', "llama3.2:3b"))
+    parser.add_argument('--db', default=None, help="arquivo do banco (padrão: diretório temporário)")
+    parser.add_argument('--json', default=None, help="grava o relatório em JSON neste arquivo")
+    fake_ollama.adicionar_argumentos(parser)
+    args = parser.parse_args()
+    
+    # Falhas já tratadas pelo app (ex.: reforço só com questões do banco) são avisos esperados sob carga
+    logging.basicConfig(level=logging.ERROR, format="%(levelname)s %(name)s: %(message)s")
+    
+    servidores = []
+    if args.url:
+        urls = [url.strip() for url in args.url.split(',') if url.strip()]
+    else:
+        servidores = [
+            fake_ollama.iniciar(porta=0, **fake_ollama.configuracao_dos_argumentos(args))
+            for _ in range(max(1, args.servidores))
+        ]
+        urls = [f"http://127.0.0.1:{servidor.server_address[1]}" for servidor in servidores]
+    
+    caminho_db = args.db or os.path.join(tempfile.mkdtemp(prefix='profoco-carga-'), 'carga.db')
+    db = Database(caminho_db)
+    ollama = criar_cliente(db, hosts=urls, model=args.modelo)
+    aleatorio = random.Random(args.semente)
+    medicoes = Medicoes()
+    
+    print(f"Ollama: {', '.join(urls)}  Banco: {caminho_db}")
+    print(f"Gerando {args.questionarios} questionário(s)...")
+    ids = preparar_turma(db, ollama, args.alunos, args.questionarios, args.questoes, medicoes)
+    if not ids:
+        print("Nenhum questionário foi gerado; verifique o Ollama.")
+        sys.exit(1)
+    
+    chamadas_preparo = len(db.obter_metricas())
+    print(f"Simulando {args.alunos} alunos (rampa de {args.rampa:.0f}s)...")
+    inicio = time.monotonic()
+    threads = []
+    for n in range(args.alunos):
+        atraso = aleatorio.uniform(0, args.rampa)
+        thread = threading.Timer(atraso, simular_aluno, args=(
+            n, db, ollama, ids, medicoes, args.acerto, args.intervalo_consulta,
+            args.limite_analise, args.reforco, random.Random(aleatorio.random())
+        ))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    duracao = time.monotonic() - inicio
+    
+    telemetria = resumo_telemetria(db)
+    chamadas = sum(sum(desfechos.values()) for desfechos in telemetria.values()) - chamadas_preparo
+    relatorio = {
+        'alunos': args.alunos,
+        'duracao': duracao,
+        'alunos_por_min': args.alunos / duracao * 60,
+        'chamadas_llm_por_s': chamadas / duracao,
+        'operacoes': medicoes.resumo(),
+        'telemetria': telemetria,
+        'por_servidor': resumo_telemetria(db, 'host'),
+        'geracao': estatisticas_geracao.resumo(),
+        'servidores_falsos': [servidor.estatisticas() for servidor in servidores],
+        'configuracao': vars(args),
+    }
+    imprimir_relatorio(relatorio)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    
+    for servidor in servidores:
+        servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,38 @@ Módulo de gerenciamento do banco de dados SQLite
 """
 import sqlite3
 import json
+import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
+# Colunas de metricas_llm preenchidas a partir do registro de cada chamada ao modelo
+_COLUNAS_METRICAS = (
+    'tarefa', 'modelo', 'host', 'status', 'tentativa', 'latencia', 'espera_fila',
+    'total_duration', 'load_duration', 'prompt_eval_duration', 'eval_duration',
+    'prompt_eval_count', 'eval_count', 'erro'
+)
+
+# Tabelas com versão de dados (versao_dados), mantida por gatilhos do banco. Só as
+# que têm leitores em cache: os resultados chegam ao Dashboard pelo feed de novos
+# resultados (resultados_desde), e gatilhos em resultados custariam uma escrita
+# extra a cada envio e a cada análise concluída
+_TABELAS_VERSIONADAS = ('questionarios',)
+
+# Arquivos cujo esquema já foi criado/migrado neste processo: as tabelas são
+# criadas uma única vez por processo, e não a cada Database() instanciado
+_esquemas_prontos = set()
+_esquemas_lock = threading.Lock()
 
 class Database:
     def __init__(self, db_path: str = "profoco.db"):
-        """Inicializa a conexão com o banco de dados e cria as tabelas"""
+        """Inicializa a conexão com o banco de dados e cria as tabelas (uma vez por processo)"""
         self.db_path = db_path
-        self.init_database()
+        with _esquemas_lock:
+            caminho = os.path.abspath(db_path)
+            if caminho not in _esquemas_prontos:
+                self.init_database()
+                _esquemas_prontos.add(caminho)
     
     def get_connection(self):
         """Retorna uma conexão com o banco de dados"""
@@ -39,7 +62,8 @@ class Database:
                 disciplina TEXT NOT NULL,
                 topico TEXT NOT NULL,
                 questoes_json TEXT NOT NULL,
-                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                id_job INTEGER
             )
         """)
         
@@ -57,6 +81,152 @@ class Database:
                 FOREIGN KEY (id_questionario) REFERENCES questionarios(id)
             )
         """)
+        # Consultas do Dashboard (buscar_resultados): ordem por data e filtros por
+        # questionário, período e disciplina
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_resultados_data ON resultados(data_resposta)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_resultados_questionario ON resultados(id_questionario, data_resposta)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_questionarios_disciplina ON questionarios(disciplina)")
+        # Análises da IA pendentes (listar_analises_pendentes): índice parcial, só com as
+        # poucas linhas que ainda aguardam a análise
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_resultados_analise_pendente ON resultados(id)
+            WHERE json_extract(analise_json, '$.status_analise') = 'pendente'
+        """)
+        
+        # Cache de análises da IA por padrão de erros (ver OllamaClient.chave_analise)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS cache_analises (
+                chave TEXT PRIMARY KEY,
+                id_questionario INTEGER,
+                modelo TEXT,
+                analise_json TEXT NOT NULL,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Embeddings das questões (vetores float32), carregados no índice de similaridade
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings_questoes (
+                id_questionario INTEGER NOT NULL,
+                indice INTEGER NOT NULL,
+                modelo TEXT NOT NULL,
+                vetor BLOB NOT NULL,
+                PRIMARY KEY (id_questionario, indice, modelo),
+                FOREIGN KEY (id_questionario) REFERENCES questionarios(id)
+            )
+        """)
+        
+        # Telemetria das chamadas ao modelo (durações em segundos)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metricas_llm (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                tarefa TEXT NOT NULL,
+                modelo TEXT NOT NULL,
+                host TEXT,
+                status TEXT NOT NULL,
+                tentativa INTEGER DEFAULT 0,
+                latencia REAL,
+                espera_fila REAL,
+                total_duration REAL,
+                load_duration REAL,
+                prompt_eval_duration REAL,
+                eval_duration REAL,
+                prompt_eval_count INTEGER,
+                eval_count INTEGER,
+                erro TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metricas_llm_data ON metricas_llm(data)")
+        
+        # Jobs em segundo plano (ex.: geração de questionários), executados pelo worker.py
+        # status: pendente -> executando -> concluido | falhou; um job 'executando' cujo
+        # heartbeat parou (worker encerrado) volta a ser reivindicado
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tipo TEXT NOT NULL,
+                parametros_json TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pendente',
+                progresso_json TEXT,
+                resultado_json TEXT,
+                erro TEXT,
+                tentativas INTEGER DEFAULT 0,
+                worker TEXT,
+                heartbeat TIMESTAMP,
+                disponivel_em TIMESTAMP,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                data_inicio TIMESTAMP,
+                data_fim TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)")
+        
+        # Conjuntos de reforço do aluno, preparados em segundo plano após uma nota baixa
+        # (id_resultado: resultado que o originou, no máximo um conjunto por resultado)
+        # ou gerados na página de reforço; status: pendente -> pronto | falhou
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS reforcos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome_aluno TEXT NOT NULL,
+                matricula_aluno TEXT,
+                disciplina TEXT NOT NULL,
+                topicos_json TEXT NOT NULL,
+                num_questoes INTEGER NOT NULL,
+                id_resultado INTEGER UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pendente',
+                questoes_json TEXT,
+                do_banco INTEGER DEFAULT 0,
+                erro TEXT,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                data_conclusao TIMESTAMP,
+                FOREIGN KEY (id_resultado) REFERENCES resultados(id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reforcos_matricula ON reforcos(matricula_aluno, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reforcos_nome ON reforcos(nome_aluno, id)")
+        
+        # Tentativas de resposta de cada conjunto de reforço
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resultados_reforco (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_reforco INTEGER NOT NULL,
+                respostas_json TEXT NOT NULL,
+                nota REAL NOT NULL,
+                acertos INTEGER NOT NULL,
+                data_resposta TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (id_reforco) REFERENCES reforcos(id)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_resultados_reforco_reforco ON resultados_reforco(id_reforco, id)"
+        )
+        
+        # Versão dos dados de cada tabela: os gatilhos a incrementam a cada escrita (de
+        # qualquer processo), o que permite manter em cache o que foi lido da tabela
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS versoes_dados (
+                tabela TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        for tabela in _TABELAS_VERSIONADAS:
+            cursor.execute("INSERT OR IGNORE INTO versoes_dados (tabela, versao) VALUES (?, 0)", (tabela,))
+            for evento in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS versao_{tabela}_{evento.lower()}
+                    AFTER {evento} ON {tabela}
+                    BEGIN
+                        UPDATE versoes_dados SET versao = versao + 1 WHERE tabela = '{tabela}';
+                    END
+                """)
+        
+        # Migração: remove os gatilhos de versão da tabela resultados (sem leitores)
+        for evento in ('insert', 'update', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS versao_resultados_{evento}")
+        cursor.execute("DELETE FROM versoes_dados WHERE tabela = 'resultados'")
         
         # Migração: adiciona coluna matricula_aluno se não existir (para bancos antigos)
         try:
@@ -65,6 +235,19 @@ class Database:
             # Coluna já existe, ignora
             pass
         
+        # Migração: servidor Ollama de cada chamada (pool de servidores)
+        try:
+            cursor.execute("ALTER TABLE metricas_llm ADD COLUMN host TEXT")
+        except sqlite3.OperationalError:
+            pass
+        
+        # Migração: job que gerou o questionário (no máximo um questionário por job)
+        try:
+            cursor.execute("ALTER TABLE questionarios ADD COLUMN id_job INTEGER")
+        except sqlite3.OperationalError:
+            pass
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_questionarios_job ON questionarios(id_job)")
+        
         conn.commit()
         conn.close()
     
@@ -86,6 +269,69 @@ class Database:
         
         return questionario_id
     
+    def criar_questionario_job(self, job_id: int, worker: str, disciplina: str, topico: str,
+                               questoes: List[Dict]) -> Optional[int]:
+        """
+        Salva o questionário gerado por um job, uma única vez por job
+        
+        Em uma transação: se o job já tem questionário (tentativa anterior interrompida
+        entre salvar e concluir), retorna o existente; senão, só salva se o job ainda
+        estiver reservado para o worker.
+        
+        Args:
+            job_id: ID do job de geração
+            worker: Identificador do worker que executa o job
+            disciplina: Disciplina do questionário
+            topico: Tópico do questionário
+            questoes: Questões geradas
+        
+        Returns:
+            ID do questionário, ou None se o job foi retomado por outro worker
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            # BEGIN IMMEDIATE: a verificação da reserva e a gravação não se intercalam com outro worker
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT id FROM questionarios WHERE id_job = ?", (job_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                conn.commit()
+                return row[0]
+            
+            cursor.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND worker = ? AND status = 'executando'", (job_id, worker)
+            )
+            if cursor.fetchone() is None:
+                conn.rollback()
+                return None
+            
+            cursor.execute("""
+                INSERT INTO questionarios (disciplina, topico, questoes_json, id_job)
+                VALUES (?, ?, ?, ?)
+            """, (disciplina, topico, json.dumps(questoes, ensure_ascii=False), job_id))
+            questionario_id = cursor.lastrowid
+            conn.commit()
+            return questionario_id
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def questionario_do_job(self, job_id: int) -> Optional[Dict]:
+        """Obtém o questionário já salvo por um job (mesmo formato de obter_questionario), se houver"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id FROM questionarios WHERE id_job = ?", (job_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return self.obter_questionario(row[0]) if row else None
+    
     def obter_questionario(self, questionario_id: int) -> Optional[Dict]:
         """Obtém um questionário pelo ID"""
         conn = self.get_connection()
@@ -134,6 +380,55 @@ class Database:
             for row in rows
         ]
     
+    def listar_questionarios_disciplina(self, disciplina: str) -> List[Dict]:
+        """Lista os questionários de uma disciplina (sem diferenciar maiúsculas) com as questões"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, disciplina, topico, questoes_json, data_criacao
+            FROM questionarios
+            WHERE disciplina = ? COLLATE NOCASE
+            ORDER BY data_criacao DESC
+        """, (disciplina.strip(),))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'id': row[0],
+                'disciplina': row[1],
+                'topico': row[2],
+                'questoes': json.loads(row[3]),
+                'data_criacao': row[4]
+            }
+            for row in rows
+        ]
+    
+    def obter_respostas_questionarios(self, ids_questionarios: List[int]) -> Dict[int, List[List[str]]]:
+        """Respostas de todos os alunos, agrupadas por questionário (para a dificuldade de cada questão)"""
+        if not ids_questionarios:
+            return {}
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        marcadores = ", ".join("?" for _ in ids_questionarios)
+        cursor.execute(f"""
+            SELECT id_questionario, respostas_json
+            FROM resultados
+            WHERE id_questionario IN ({marcadores})
+        """, list(ids_questionarios))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        respostas: Dict[int, List[List[str]]] = {}
+        for id_questionario, respostas_json in rows:
+            respostas.setdefault(id_questionario, []).append(json.loads(respostas_json))
+        return respostas
+    
     def salvar_resultado(self, id_questionario: int, nome_aluno: str, 
                         respostas: List[str], nota: float, analise: Dict,
                         matricula_aluno: Optional[str] = None) -> int:
@@ -155,6 +450,423 @@ class Database:
         
         return resultado_id
     
+    def atualizar_analise(self, resultado_id: int, analise: Dict) -> bool:
+        """Substitui a análise de um resultado (usado quando a análise da IA termina)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE resultados SET analise_json = ?
+            WHERE id = ?
+        """, (json.dumps(analise, ensure_ascii=False), resultado_id))
+        
+        atualizado = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        
+        return atualizado
+    
+    def obter_resultado(self, resultado_id: int) -> Optional[Dict]:
+        """Obtém um resultado pelo ID"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT r.id, r.id_questionario, q.disciplina, q.topico,
+                   r.nome_aluno, r.matricula_aluno, r.respostas_json, r.nota, r.analise_json, r.data_resposta
+            FROM resultados r
+            JOIN questionarios q ON r.id_questionario = q.id
+            WHERE r.id = ?
+        """, (resultado_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return {
+                'id': row[0],
+                'id_questionario': row[1],
+                'disciplina': row[2],
+                'topico': row[3],
+                'nome_aluno': row[4],
+                'matricula_aluno': row[5],
+                'respostas': json.loads(row[6]),
+                'nota': row[7],
+                'analise': json.loads(row[8]),
+                'data_resposta': row[9]
+            }
+        return None
+    
+    def salvar_resultados(self, resultados: List[Dict]) -> List[int]:
+        """
+        Salva vários resultados em uma única transação (envios em lote)
+        
+        Args:
+            resultados: Dicionários com os argumentos de salvar_resultado() (id_questionario,
+                        nome_aluno, respostas, nota, analise e, opcionalmente, matricula_aluno)
+        
+        Returns:
+            IDs dos resultados, na ordem recebida
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        ids = []
+        try:
+            for r in resultados:
+                cursor.execute("""
+                    INSERT INTO resultados (id_questionario, nome_aluno, matricula_aluno, respostas_json, nota, analise_json)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (r['id_questionario'], r['nome_aluno'], r.get('matricula_aluno'),
+                      json.dumps(r['respostas'], ensure_ascii=False), r['nota'],
+                      json.dumps(r['analise'], ensure_ascii=False)))
+                ids.append(cursor.lastrowid)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        return ids
+    
+    def obter_resultados(self, ids: List[int]) -> List[Dict]:
+        """Obtém vários resultados pelo ID (mesmo formato de obter_resultado), na ordem pedida"""
+        rows = {}
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 500):
+            bloco = ids[inicio:inicio + 500]
+            cursor.execute(f"""
+                SELECT r.id, r.id_questionario, q.disciplina, q.topico,
+                       r.nome_aluno, r.matricula_aluno, r.respostas_json, r.nota, r.analise_json, r.data_resposta
+                FROM resultados r
+                JOIN questionarios q ON r.id_questionario = q.id
+                WHERE r.id IN ({', '.join('?' * len(bloco))})
+            """, bloco)
+            rows.update((row[0], row) for row in cursor.fetchall())
+        conn.close()
+        
+        return [
+            {
+                'id': row[0],
+                'id_questionario': row[1],
+                'disciplina': row[2],
+                'topico': row[3],
+                'nome_aluno': row[4],
+                'matricula_aluno': row[5],
+                'respostas': json.loads(row[6]),
+                'nota': row[7],
+                'analise': json.loads(row[8]),
+                'data_resposta': row[9]
+            }
+            for row in (rows.get(resultado_id) for resultado_id in ids) if row
+        ]
+    
+    def listar_analises_pendentes(self) -> List[int]:
+        """Lista os IDs dos resultados cuja análise da IA ainda não foi feita"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id FROM resultados
+            WHERE json_extract(analise_json, '$.status_analise') = 'pendente'
+            ORDER BY id ASC
+        """)
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [row[0] for row in rows]
+    
+    def obter_analise_cache(self, chave: str) -> Optional[Dict]:
+        """Obtém uma análise da IA já gerada para o mesmo padrão de erros"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT analise_json FROM cache_analises WHERE chave = ?", (chave,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return json.loads(row[0])
+        return None
+    
+    def salvar_analise_cache(self, chave: str, analise: Dict, id_questionario: Optional[int] = None,
+                             modelo: Optional[str] = None):
+        """Guarda a análise da IA de um padrão de erros para reaproveitamento"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO cache_analises (chave, id_questionario, modelo, analise_json)
+            VALUES (?, ?, ?, ?)
+        """, (chave, id_questionario, modelo, json.dumps(analise, ensure_ascii=False)))
+        
+        conn.commit()
+        conn.close()
+    
+    def salvar_embeddings(self, id_questionario: int, modelo: str, vetores: List[bytes]):
+        """
+        Guarda os embeddings das questões de um questionário
+        
+        Args:
+            id_questionario: ID do questionário
+            modelo: Modelo de embeddings que gerou os vetores
+            vetores: Um vetor serializado (vector_index.vetor_para_blob) por questão, na ordem das questões
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT OR REPLACE INTO embeddings_questoes (id_questionario, indice, modelo, vetor)
+            VALUES (?, ?, ?, ?)
+        """, [(id_questionario, indice, modelo, vetor) for indice, vetor in enumerate(vetores)])
+        
+        conn.commit()
+        conn.close()
+    
+    def listar_embeddings(self, modelo: str) -> List[tuple]:
+        """Lista (id_questionario, indice, vetor) de todas as questões com embedding do modelo"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id_questionario, indice, vetor
+            FROM embeddings_questoes
+            WHERE modelo = ?
+        """, (modelo,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return rows
+    
+    def listar_questionarios_sem_embeddings(self, modelo: str) -> List[int]:
+        """IDs dos questionários que ainda não têm embeddings do modelo"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id FROM questionarios
+            WHERE id NOT IN (
+                SELECT DISTINCT id_questionario FROM embeddings_questoes WHERE modelo = ?
+            )
+            ORDER BY id
+        """, (modelo,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [row[0] for row in rows]
+    
+    def registrar_metrica(self, chamada: Dict):
+        """
+        Grava a telemetria de uma chamada ao modelo (ver OllamaClient._nova_chamada)
+        
+        Args:
+            chamada: Registro com tarefa, modelo, status, tentativa, latencia, espera_fila,
+                     as durações do Ollama em segundos, contagens de tokens e erro
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        colunas = [coluna for coluna in _COLUNAS_METRICAS if coluna in chamada]
+        cursor.execute(
+            f"INSERT INTO metricas_llm ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+            [chamada[coluna] for coluna in colunas]
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def obter_metricas(self, horas: Optional[int] = None) -> List[Dict]:
+        """
+        Lista a telemetria das chamadas ao modelo, da mais antiga para a mais recente
+        
+        Args:
+            horas: Considera apenas as últimas N horas (None = todo o histórico)
+        """
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if horas is None:
+            cursor.execute("SELECT * FROM metricas_llm ORDER BY id")
+        else:
+            cursor.execute(
+                "SELECT * FROM metricas_llm WHERE data >= datetime('now', ?) ORDER BY id",
+                (f'-{int(horas)} hours',)
+            )
+        
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        
+        return rows
+    
+    def criar_job(self, tipo: str, parametros: Dict) -> int:
+        """Enfileira um job para o worker e retorna seu ID"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO jobs (tipo, parametros_json)
+            VALUES (?, ?)
+        """, (tipo, json.dumps(parametros, ensure_ascii=False)))
+        
+        job_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        
+        return job_id
+    
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['parametros'] = json.loads(job.pop('parametros_json'))
+        job['progresso'] = json.loads(job.pop('progresso_json') or 'null')
+        job['resultado'] = json.loads(job.pop('resultado_json') or 'null')
+        return job
+    
+    def obter_job(self, job_id: int) -> Optional[Dict]:
+        """Obtém um job, com 'parametros', 'progresso' e 'resultado' já decodificados"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return self._job(row) if row else None
+    
+    def listar_jobs(self, tipo: Optional[str] = None, limite: int = 20) -> List[Dict]:
+        """Lista os jobs mais recentes (opcionalmente de um tipo)"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        if tipo is None:
+            cursor.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limite,))
+        else:
+            cursor.execute("SELECT * FROM jobs WHERE tipo = ? ORDER BY id DESC LIMIT ?", (tipo, limite))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._job(row) for row in rows]
+    
+    def reivindicar_job(self, worker: str, expiracao_heartbeat: int = 120,
+                        max_tentativas: int = 5) -> Optional[Dict]:
+        """
+        Reserva o próximo job para o worker (de forma atômica entre processos)
+        
+        Candidatos são os jobs pendentes já disponíveis e os 'executando' cujo heartbeat
+        tem mais de expiracao_heartbeat segundos (o worker que os pegou parou). Jobs
+        abandonados que já atingiram max_tentativas são marcados como falhos.
+        
+        Args:
+            worker: Identificador do worker
+            expiracao_heartbeat: Segundos sem heartbeat para considerar o job abandonado
+            max_tentativas: Execuções permitidas por job
+        
+        Returns:
+            O job reservado (status 'executando') ou None se não houver nenhum
+        """
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        expirado = f'-{int(expiracao_heartbeat)} seconds'
+        
+        try:
+            # BEGIN IMMEDIATE bloqueia outros escritores entre a escolha e a reserva
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'falhou', erro = 'Worker interrompido muitas vezes', data_fim = CURRENT_TIMESTAMP
+                WHERE status = 'executando' AND heartbeat < datetime('now', ?) AND tentativas >= ?
+            """, (expirado, max_tentativas))
+            cursor.execute("""
+                SELECT id FROM jobs
+                WHERE (status = 'pendente' AND (disponivel_em IS NULL OR disponivel_em <= CURRENT_TIMESTAMP))
+                   OR (status = 'executando' AND heartbeat < datetime('now', ?))
+                ORDER BY id
+                LIMIT 1
+            """, (expirado,))
+            row = cursor.fetchone()
+            if row is None:
+                conn.commit()
+                return None
+            
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'executando', worker = ?, heartbeat = CURRENT_TIMESTAMP,
+                    tentativas = tentativas + 1, erro = NULL,
+                    data_inicio = COALESCE(data_inicio, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            """, (worker, row['id']))
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],))
+            job = self._job(cursor.fetchone())
+            conn.commit()
+            return job
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _atualizar_job(self, job_id: int, worker: str, sql: str, parametros: tuple) -> bool:
+        """Executa 'UPDATE jobs SET <sql>' se o job ainda estiver reservado para o worker"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            f"UPDATE jobs SET {sql} WHERE id = ? AND worker = ? AND status = 'executando'",
+            parametros + (job_id, worker)
+        )
+        
+        atualizado = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        
+        return atualizado
+    
+    def renovar_job(self, job_id: int, worker: str, progresso: Optional[Dict] = None) -> bool:
+        """
+        Atualiza o heartbeat (e, se informado, o progresso) de um job em execução
+        
+        Returns:
+            False se o job não está mais reservado para o worker
+        """
+        if progresso is None:
+            return self._atualizar_job(job_id, worker, "heartbeat = CURRENT_TIMESTAMP", ())
+        return self._atualizar_job(
+            job_id, worker, "heartbeat = CURRENT_TIMESTAMP, progresso_json = ?",
+            (json.dumps(progresso, ensure_ascii=False),)
+        )
+    
+    def concluir_job(self, job_id: int, worker: str, resultado: Dict) -> bool:
+        """Marca o job como concluído com o resultado (ex.: {'id_questionario': 12})"""
+        return self._atualizar_job(
+            job_id, worker, "status = 'concluido', resultado_json = ?, data_fim = CURRENT_TIMESTAMP",
+            (json.dumps(resultado, ensure_ascii=False),)
+        )
+    
+    def falhar_job(self, job_id: int, worker: str, erro: str) -> bool:
+        """Marca o job como falho, guardando a mensagem de erro"""
+        return self._atualizar_job(
+            job_id, worker, "status = 'falhou', erro = ?, data_fim = CURRENT_TIMESTAMP", (erro,)
+        )
+    
+    def reagendar_job(self, job_id: int, worker: str, erro: str, atraso: int) -> bool:
+        """Devolve o job à fila para nova tentativa depois de atraso segundos (ex.: servidor fora do ar)"""
+        return self._atualizar_job(
+            job_id, worker,
+            "status = 'pendente', worker = NULL, erro = ?, disponivel_em = datetime('now', ?)",
+            (erro, f'+{int(atraso)} seconds')
+        )
+    
     def obter_resultados_questionario(self, id_questionario: int) -> List[Dict]:
         """Obtém todos os resultados de um questionário"""
         conn = self.get_connection()
@@ -182,6 +894,213 @@ class Database:
             for row in rows
         ]
     
+    def versao_dados(self, *tabelas: str) -> Tuple[int, ...]:
+        """
+        Versão atual dos dados das tabelas versionadas (questionarios), que muda a cada
+        inserção, alteração ou exclusão. Uma consulta de uma linha por tabela, usada
+        como chave de cache do que foi lido delas.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            f"SELECT tabela, versao FROM versoes_dados WHERE tabela IN ({', '.join('?' * len(tabelas))})",
+            tabelas
+        )
+        versoes = dict(cursor.fetchall())
+        conn.close()
+        
+        return tuple(versoes.get(tabela, 0) for tabela in tabelas)
+    
+    @staticmethod
+    def _filtro_resultados(disciplina: Optional[str] = None, id_questionario: Optional[int] = None,
+                           aluno: Optional[str] = None, data_inicio: Optional[str] = None,
+                           data_fim: Optional[str] = None) -> Tuple[str, list]:
+        """Cláusula WHERE (sobre resultados r JOIN questionarios q) e parâmetros dos filtros informados"""
+        condicoes = []
+        params = []
+        if disciplina:
+            condicoes.append("q.disciplina = ?")
+            params.append(disciplina)
+        if id_questionario is not None:
+            condicoes.append("r.id_questionario = ?")
+            params.append(id_questionario)
+        if aluno:
+            condicoes.append("(r.nome_aluno LIKE ? OR r.matricula_aluno LIKE ?)")
+            params.extend([f"%{aluno.strip()}%"] * 2)
+        if data_inicio:
+            condicoes.append("r.data_resposta >= ?")
+            params.append(data_inicio)
+        if data_fim:
+            # Inclusivo: todo o dia final
+            condicoes.append("r.data_resposta < date(?, '+1 day')")
+            params.append(data_fim)
+        return ("WHERE " + " AND ".join(condicoes)) if condicoes else "", params
+    
+    def estatisticas_gerais(self) -> Dict:
+        """
+        Contagens da página inicial do professor, calculadas no banco
+        
+        Returns:
+            Dicionário com questionarios, resultados e nota_media (None sem resultados)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM questionarios), COUNT(*), AVG(nota)
+            FROM resultados
+        """)
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return {'questionarios': row[0], 'resultados': row[1], 'nota_media': row[2]}
+    
+    def contar_resultados(self, **filtros) -> int:
+        """Número de resultados que atendem aos filtros de buscar_resultados()"""
+        where, params = self._filtro_resultados(**filtros)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM resultados r
+            JOIN questionarios q ON r.id_questionario = q.id
+            {where}
+        """, params)
+        
+        total = cursor.fetchone()[0]
+        conn.close()
+        
+        return total
+    
+    def buscar_resultados(self, disciplina: Optional[str] = None, id_questionario: Optional[int] = None,
+                          aluno: Optional[str] = None, data_inicio: Optional[str] = None,
+                          data_fim: Optional[str] = None, limite: int = 25,
+                          deslocamento: int = 0) -> List[Dict]:
+        """
+        Uma página de resultados (mais recentes primeiro), filtrada no banco
+        
+        Args:
+            disciplina: Disciplina do questionário
+            id_questionario: Questionário respondido
+            aluno: Trecho do nome ou da matrícula do aluno
+            data_inicio: Primeiro dia (AAAA-MM-DD)
+            data_fim: Último dia (AAAA-MM-DD), inclusive
+            limite: Tamanho da página
+            deslocamento: Resultados a pular (página x limite)
+        
+        Returns:
+            Lista com id, disciplina, topico, nome_aluno, matricula_aluno, nota,
+            nivel_dominio e data_resposta (sem as respostas nem a análise completa)
+        """
+        where, params = self._filtro_resultados(disciplina, id_questionario, aluno, data_inicio, data_fim)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            SELECT r.id, q.disciplina, q.topico, r.nome_aluno, r.matricula_aluno, r.nota,
+                   json_extract(r.analise_json, '$.nivel_dominio'), r.data_resposta
+            FROM resultados r
+            JOIN questionarios q ON r.id_questionario = q.id
+            {where}
+            ORDER BY r.data_resposta DESC, r.id DESC
+            LIMIT ? OFFSET ?
+        """, params + [limite, deslocamento])
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'id': row[0],
+                'disciplina': row[1],
+                'topico': row[2],
+                'nome_aluno': row[3],
+                'matricula_aluno': row[4],
+                'nota': row[5],
+                'nivel_dominio': row[6],
+                'data_resposta': row[7]
+            }
+            for row in rows
+        ]
+    
+    # Colunas de resultados_desde() e resumos_resultados(): só o que os agregados do Dashboard usam
+    _SELECT_RESUMO_RESULTADO = """
+        SELECT r.id, q.disciplina, q.topico, r.nome_aluno, r.matricula_aluno, r.nota,
+               json_extract(r.analise_json, '$.nivel_dominio'),
+               json_extract(r.analise_json, '$.topicos_dificuldade'),
+               json_extract(r.analise_json, '$.status_analise'), r.data_resposta
+        FROM resultados r
+        JOIN questionarios q ON r.id_questionario = q.id
+    """
+    
+    @staticmethod
+    def _resumo_resultado(row: tuple) -> Dict:
+        return {
+            'id': row[0],
+            'disciplina': row[1],
+            'topico': row[2],
+            'nome_aluno': row[3],
+            'matricula_aluno': row[4],
+            'nota': row[5],
+            'nivel_dominio': row[6],
+            'topicos_dificuldade': json.loads(row[7]) if row[7] else [],
+            'pendente': row[8] == 'pendente',
+            'data_resposta': row[9]
+        }
+    
+    def resultados_desde(self, ultimo_id: int, limite: int = 500) -> List[Dict]:
+        """
+        Feed de novos resultados: os de ID maior que ultimo_id, em ordem de ID
+        (o ID só cresce, então o maior ID lido serve de marca para a próxima consulta)
+        
+        Args:
+            ultimo_id: Maior ID já lido (0 na primeira consulta)
+            limite: Máximo de resultados por consulta
+        
+        Returns:
+            Lista com id, disciplina, topico, nome_aluno, matricula_aluno, nota,
+            nivel_dominio, topicos_dificuldade, pendente (análise da IA ainda não feita)
+            e data_resposta
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"""
+            {self._SELECT_RESUMO_RESULTADO}
+            WHERE r.id > ?
+            ORDER BY r.id
+            LIMIT ?
+        """, (ultimo_id, limite))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._resumo_resultado(row) for row in rows]
+    
+    def resumos_resultados(self, ids: List[int]) -> List[Dict]:
+        """
+        Os mesmos campos de resultados_desde() para resultados já lidos (ex.: para
+        reler os que aguardavam a análise da IA)
+        """
+        resumos = []
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 500):
+            bloco = ids[inicio:inicio + 500]
+            cursor.execute(f"""
+                {self._SELECT_RESUMO_RESULTADO}
+                WHERE r.id IN ({', '.join('?' * len(bloco))})
+            """, bloco)
+            resumos.extend(self._resumo_resultado(row) for row in cursor.fetchall())
+        conn.close()
+        
+        return resumos
+    
     def obter_todos_resultados(self) -> List[Dict]:
         """Obtém todos os resultados de todos os questionários"""
         conn = self.get_connection()
@@ -351,4 +1270,170 @@ class Database:
             }
             for row in rows
         ]
-
+    
+    def criar_reforco(self, nome_aluno: str, disciplina: str, topicos: List[str], num_questoes: int,
+                      matricula_aluno: Optional[str] = None,
+                      id_resultado: Optional[int] = None) -> Optional[int]:
+        """
+        Registra um conjunto de reforço pendente (as questões são gravadas por concluir_reforco)
+        
+        Args:
+            nome_aluno: Nome do aluno
+            disciplina: Disciplina do reforço
+            topicos: Tópicos de dificuldade cobertos
+            num_questoes: Número de questões pedido
+            matricula_aluno: Matrícula do aluno
+            id_resultado: Resultado com nota baixa que originou o reforço, se houver
+        
+        Returns:
+            ID do reforço, ou None se o resultado já tiver um reforço
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT OR IGNORE INTO reforcos
+                (nome_aluno, matricula_aluno, disciplina, topicos_json, num_questoes, id_resultado)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (nome_aluno, matricula_aluno, disciplina, json.dumps(topicos, ensure_ascii=False),
+              num_questoes, id_resultado))
+        
+        reforco_id = cursor.lastrowid if cursor.rowcount > 0 else None
+        conn.commit()
+        conn.close()
+        
+        return reforco_id
+    
+    def _atualizar_reforco(self, reforco_id: int, sql: str, parametros: tuple) -> bool:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(f"UPDATE reforcos SET {sql}, data_conclusao = CURRENT_TIMESTAMP WHERE id = ?",
+                       parametros + (reforco_id,))
+        
+        atualizado = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        
+        return atualizado
+    
+    def concluir_reforco(self, reforco_id: int, questoes: List[Dict], do_banco: int = 0) -> bool:
+        """Grava as questões de um reforço e o marca como 'pronto'"""
+        return self._atualizar_reforco(
+            reforco_id, "status = 'pronto', questoes_json = ?, do_banco = ?, erro = NULL",
+            (json.dumps(questoes, ensure_ascii=False), do_banco)
+        )
+    
+    def falhar_reforco(self, reforco_id: int, erro: str) -> bool:
+        """Marca um reforço como 'falhou' (a geração não produziu nenhuma questão)"""
+        return self._atualizar_reforco(reforco_id, "status = 'falhou', erro = ?", (erro,))
+    
+    # Tentativas e notas de cada reforço, junto com o próprio reforço
+    _SELECT_REFORCO = """
+        SELECT f.*,
+               (SELECT COUNT(*) FROM resultados_reforco t WHERE t.id_reforco = f.id) AS tentativas,
+               (SELECT MAX(t.nota) FROM resultados_reforco t WHERE t.id_reforco = f.id) AS melhor_nota,
+               (SELECT t.nota FROM resultados_reforco t WHERE t.id_reforco = f.id
+                ORDER BY t.id DESC LIMIT 1) AS ultima_nota
+        FROM reforcos f
+    """
+    
+    @staticmethod
+    def _reforco(row: sqlite3.Row) -> Dict:
+        reforco = dict(row)
+        reforco['topicos'] = json.loads(reforco.pop('topicos_json'))
+        reforco['questoes'] = json.loads(reforco.pop('questoes_json') or '[]')
+        return reforco
+    
+    def obter_reforco(self, reforco_id: int) -> Optional[Dict]:
+        """
+        Obtém um reforço, com 'topicos' e 'questoes' decodificados, o número de
+        'tentativas', a 'melhor_nota' e a 'ultima_nota'
+        """
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(self._SELECT_REFORCO + " WHERE f.id = ?", (reforco_id,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return self._reforco(row) if row else None
+    
+    def listar_reforcos_aluno(self, nome_aluno: Optional[str] = None,
+                              matricula: Optional[str] = None) -> List[Dict]:
+        """Lista os reforços de um aluno (mesmo formato de obter_reforco), mais recente primeiro"""
+        if matricula:
+            filtro, parametro = "f.matricula_aluno = ?", matricula
+        elif nome_aluno:
+            filtro, parametro = "f.nome_aluno = ?", nome_aluno
+        else:
+            return []
+        
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute(self._SELECT_REFORCO + f" WHERE {filtro} ORDER BY f.id DESC", (parametro,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [self._reforco(row) for row in rows]
+    
+    def listar_reforcos_pendentes(self) -> List[int]:
+        """Lista os IDs dos reforços cuja geração ainda não terminou"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id FROM reforcos WHERE status = 'pendente' ORDER BY id ASC")
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [row[0] for row in rows]
+    
+    def salvar_resultado_reforco(self, reforco_id: int, respostas: List[str], nota: float,
+                                 acertos: int) -> int:
+        """Salva uma tentativa de resposta de um reforço"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT INTO resultados_reforco (id_reforco, respostas_json, nota, acertos)
+            VALUES (?, ?, ?, ?)
+        """, (reforco_id, json.dumps(respostas, ensure_ascii=False), nota, acertos))
+        
+        tentativa_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        
+        return tentativa_id
+    
+    def obter_resultados_reforco(self, reforco_id: int) -> List[Dict]:
+        """Obtém as tentativas de um reforço, mais recente primeiro"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, id_reforco, respostas_json, nota, acertos, data_resposta
+            FROM resultados_reforco
+            WHERE id_reforco = ?
+            ORDER BY id DESC
+        """, (reforco_id,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'id': row[0],
+                'id_reforco': row[1],
+                'respostas': json.loads(row[2]),
+                'nota': row[3],
+                'acertos': row[4],
+                'data_resposta': row[5]
+            }
+            for row in rows
+        ]
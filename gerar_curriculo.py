@@ -0,0 +1,213 @@
+"""
+Geração em lote dos questionários de um currículo (um por par disciplina/tópico)
+
+Lê um CSV com as colunas disciplina, topico e, opcionalmente, num_questoes, e gera cada
+questionário com OllamaClient.gerar_questoes, salvando-o com Database.criar_questionario
+(e indexando as questões para a verificação de duplicatas), em um pool limitado de
+threads. Cada questionário salvo é registrado em um arquivo de progresso (JSON Lines);
+ao rodar de novo com o mesmo arquivo, os pares já gerados são pulados, então uma
+execução interrompida (Ctrl+C, queda do servidor) continua de onde parou.
+
+Exemplo de CSV:
+    disciplina,topico,num_questoes
+    Matemática,Frações,5
+    Inglês,Verbo To Be,8
+
+Uso:
+    python gerar_curriculo.py curriculo.csv [--db profoco.db] [--paralelo N]
+                              [--questoes 5] [--progresso curriculo.progresso.jsonl]
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Set, Tuple
+
+from database import Database
+from ollama_client import (
+    OllamaClient, PRIORIDADE_PROFESSOR, estatisticas_geracao, obter_scheduler
+)
+from tasks import criar_cliente, indexar_questionario
+
+logger = logging.getLogger(__name__)
+
+# Mesmos limites da página "Criar Questionário"
+MIN_QUESTOES = 3
+MAX_QUESTOES = 10
+
+
+def _chave(disciplina: str, topico: str) -> Tuple[str, str]:
+    return disciplina.strip().casefold(), topico.strip().casefold()
+
+
+def ler_curriculo(caminho: str, num_questoes_padrao: int) -> List[Dict]:
+    """
+    Lê o CSV do currículo (pares repetidos aparecem uma única vez)
+    
+    Returns:
+        Lista com disciplina, topico e num_questoes de cada linha
+    """
+    itens = []
+    vistos: Set[Tuple[str, str]] = set()
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        leitor = csv.DictReader(f)
+        colunas = {(coluna or '').strip().lower() for coluna in leitor.fieldnames or []}
+        if not {'disciplina', 'topico'} <= colunas:
+            raise ValueError("O CSV precisa das colunas 'disciplina' e 'topico'")
+        
+        for linha_csv, linha in enumerate(leitor, start=2):
+            linha = {(coluna or '').strip().lower(): (valor or '').strip() for coluna, valor in linha.items()}
+            if not linha['disciplina'] or not linha['topico']:
+                logger.warning("Linha %d sem disciplina ou tópico; ignorada", linha_csv)
+                continue
+            chave = _chave(linha['disciplina'], linha['topico'])
+            if chave in vistos:
+                logger.warning("Linha %d repete %s — %s; ignorada", linha_csv, linha['disciplina'], linha['topico'])
+                continue
+            vistos.add(chave)
+            
+            num_questoes = int(linha.get('num_questoes') or num_questoes_padrao)
+            if not MIN_QUESTOES <= num_questoes <= MAX_QUESTOES:
+                raise ValueError(f"Linha {linha_csv}: num_questoes deve estar entre {MIN_QUESTOES} e {MAX_QUESTOES}")
+            itens.append({'disciplina': linha['disciplina'], 'topico': linha['topico'], 'num_questoes': num_questoes})
+    return itens
+
+
+def ler_progresso(caminho: str) -> Set[Tuple[str, str]]:
+    """Pares (disciplina, tópico) já gerados em execuções anteriores"""
+    if not os.path.exists(caminho):
+        return set()
+    concluidos = set()
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue  # última linha incompleta (execução interrompida durante a gravação)
+            concluidos.add(_chave(registro['disciplina'], registro['topico']))
+    return concluidos
+
+
+def gerar_questionario(db: Database, ollama: OllamaClient, item: Dict) -> Dict:
+    """Gera, salva e indexa o questionário de um item do currículo"""
+    inicio = time.perf_counter()
+    questoes = ollama.gerar_questoes(
+        disciplina=item['disciplina'],
+        topico=item['topico'],
+        num_questoes=item['num_questoes'],
+        prioridade=PRIORIDADE_PROFESSOR
+    )
+    questionario_id = db.criar_questionario(
+        disciplina=item['disciplina'],
+        topico=item['topico'],
+        questoes=questoes
+    )
+    
+    # Indexa as novas questões para que os próximos questionários não as repitam
+    try:
+        indexar_questionario(db, ollama, questionario_id)
+    except Exception:
+        logger.warning("Falha ao indexar o questionário %s", questionario_id, exc_info=True)
+    
+    return dict(item, id_questionario=questionario_id, questoes=len(questoes),
+                duracao=time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('curriculo', help="CSV com as colunas disciplina, topico e num_questoes (opcional)")
+    parser.add_argument('--db', default="profoco.db", help="arquivo do banco (padrão: profoco.db)")
+    parser.add_argument('--paralelo', type=int,
+                        help="questionários gerados ao mesmo tempo (padrão: slots dos servidores Ollama)")
+    parser.add_argument('--questoes', type=int, default=5,
+                        help="questões por questionário quando o CSV não informa (padrão: 5)")
+    parser.add_argument('--progresso',
+                        help="arquivo de progresso para retomar (padrão: <curriculo>.progresso.jsonl)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    try:
+        itens = ler_curriculo(args.curriculo, args.questoes)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Erro no currículo: {e}")
+    caminho_progresso = args.progresso or f"{os.path.splitext(args.curriculo)[0]}.progresso.jsonl"
+    concluidos = ler_progresso(caminho_progresso)
+    pendentes = [item for item in itens if _chave(item['disciplina'], item['topico']) not in concluidos]
+    
+    print(f"Currículo: {len(itens)} questionários; {len(itens) - len(pendentes)} já gerados "
+          f"({caminho_progresso}); {len(pendentes)} a gerar")
+    if not pendentes:
+        return
+    
+    db = Database(args.db)
+    ollama = criar_cliente(db)
+    ollama.iniciar_aquecimento()
+    # Mais threads que slots só aumentariam a fila do escalonador
+    paralelo = max(1, args.paralelo or obter_scheduler().slots)
+    print(f"Gerando com {paralelo} em paralelo\n")
+    
+    gerados: List[Dict] = []
+    falhas: List[Tuple[Dict, str]] = []
+    interrompido = False
+    inicio = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='profoco-curriculo')
+    futuros = {executor.submit(gerar_questionario, db, ollama, item): item for item in pendentes}
+    
+    with open(caminho_progresso, 'a', encoding='utf-8') as progresso:
+        def registrar(futuro):
+            item = futuros.pop(futuro)
+            n = len(gerados) + len(falhas) + 1
+            try:
+                gerado = futuro.result()
+            except Exception as e:
+                falhas.append((item, str(e)))
+                print(f"[{n:>3}/{len(pendentes)}] FALHOU {item['disciplina']} — {item['topico']}: {e}")
+                return
+            
+            progresso.write(json.dumps(gerado, ensure_ascii=False) + "\n")
+            progresso.flush()
+            gerados.append(gerado)
+            print(f"[{n:>3}/{len(pendentes)}] {gerado['disciplina']} — {gerado['topico']}: "
+                  f"{gerado['questoes']} questões (#{gerado['id_questionario']}) em {gerado['duracao']:.1f}s"
+                  f" | {len(gerados) / (time.perf_counter() - inicio) * 60:.1f} questionários/min")
+        
+        try:
+            for futuro in as_completed(list(futuros)):
+                registrar(futuro)
+        except KeyboardInterrupt:
+            # Os questionários em geração terminam e são registrados, para não serem gerados de novo
+            interrompido = True
+            print("\nInterrompido; aguardando os questionários em geração...")
+            executor.shutdown(wait=True, cancel_futures=True)
+            for futuro in [f for f in futuros if not f.cancelled()]:
+                registrar(futuro)
+            print("Rode o mesmo comando para continuar de onde parou.")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    duracao = time.perf_counter() - inicio
+    total_questoes = sum(gerado['questoes'] for gerado in gerados)
+    print(f"\nGerados: {len(gerados)} questionários ({total_questoes} questões) em {duracao:.1f}s")
+    if gerados:
+        print(f"Vazão: {len(gerados) / duracao * 60:.1f} questionários/min, "
+              f"{total_questoes / duracao * 60:.1f} questões/min; "
+              f"{sum(gerado['duracao'] for gerado in gerados) / len(gerados):.1f}s por questionário")
+    for modelo, estatisticas in estatisticas_geracao.resumo().items():
+        print(f"Modelo {modelo}: {estatisticas['respostas']} respostas, "
+              f"{estatisticas['taxa_retentativa']:.0%} de novas tentativas, "
+              f"{estatisticas['taxa_falha_parse']:.0%} com JSON inválido")
+    if falhas:
+        print(f"\nFalhas ({len(falhas)}; serão tentadas de novo na próxima execução):")
+        for item, erro in falhas:
+            print(f"  {item['disciplina']} — {item['topico']}: {erro}")
+    if falhas or interrompido:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
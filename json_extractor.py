@@ -0,0 +1,311 @@
+"""
+Extração tolerante de JSON das respostas do modelo e normalização das questões
+"""
+import json
+import re
+from typing import Dict, List, Optional
+
+LETRAS_OPCOES = ['A', 'B', 'C', 'D']
+
+# Número máximo de trechos candidatos ('{' ou '[') examinados por resposta
+MAX_CANDIDATOS = 8
+
+_ABERTURA = re.compile(r'[\[{]')
+_DECODIFICADOR = json.JSONDecoder()
+_ESPACOS = re.compile(r'[\s]*')
+_PALAVRA = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_NUMERO = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_TRECHO_STRING = {
+    '"': re.compile(r'[^"\\]*'),
+    "'": re.compile(r"[^'\\]*"),
+}
+_LITERAIS = {
+    'true': True, 'false': False, 'null': None,
+    'True': True, 'False': False, 'None': None,
+}
+_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f',
+    '/': '/', '\\': '\\', '"': '"', "'": "'",
+}
+
+
+class _ParserTolerante:
+    """
+    Parser descendente que aceita os desvios mais comuns do modelo: aspas simples,
+    vírgulas sobrando, chaves sem aspas, literais Python (True/False/None) e
+    resposta truncada (estruturas abertas são fechadas no fim do texto). A leitura
+    começa em text[inicio] e para no fechamento do valor; o texto depois dele é ignorado.
+    """
+    
+    def __init__(self, text: str, inicio: int = 0):
+        self.t = text
+        self.i = inicio
+        self.n = len(text)
+    
+    def parse(self):
+        return self._valor()
+    
+    def _espacos(self):
+        self.i = _ESPACOS.match(self.t, self.i).end()
+    
+    def _valor(self):
+        self._espacos()
+        if self.i >= self.n:
+            raise ValueError("fim inesperado do texto")
+        c = self.t[self.i]
+        if c == '{':
+            return self._objeto()
+        if c == '[':
+            return self._lista()
+        if c == '"' or c == "'":
+            return self._string()
+        m = _NUMERO.match(self.t, self.i)
+        if m:
+            self.i = m.end()
+            texto = m.group()
+            return float(texto) if any(x in texto for x in '.eE') else int(texto)
+        m = _PALAVRA.match(self.t, self.i)
+        if m and m.group() in _LITERAIS:
+            self.i = m.end()
+            return _LITERAIS[m.group()]
+        raise ValueError(f"valor inesperado na posição {self.i}: {self.t[self.i:self.i + 20]!r}")
+    
+    def _objeto(self) -> Dict:
+        self.i += 1
+        obj = {}
+        while True:
+            self._espacos()
+            if self.i >= self.n:
+                return obj
+            c = self.t[self.i]
+            if c == '}':
+                self.i += 1
+                return obj
+            if c == ',':
+                self.i += 1
+                continue
+            if c == '"' or c == "'":
+                chave = self._string()
+            else:
+                m = _PALAVRA.match(self.t, self.i)
+                if not m:
+                    raise ValueError(f"chave inválida na posição {self.i}")
+                chave = m.group()
+                self.i = m.end()
+            self._espacos()
+            if self.i >= self.n:
+                return obj
+            if self.t[self.i] != ':':
+                raise ValueError(f"esperado ':' na posição {self.i}")
+            self.i += 1
+            self._espacos()
+            if self.i >= self.n:
+                return obj
+            obj[chave] = self._valor()
+    
+    def _lista(self) -> List:
+        self.i += 1
+        lista = []
+        while True:
+            self._espacos()
+            if self.i >= self.n:
+                return lista
+            c = self.t[self.i]
+            if c == ']':
+                self.i += 1
+                return lista
+            if c == ',':
+                self.i += 1
+                continue
+            lista.append(self._valor())
+    
+    def _string(self) -> str:
+        aspas = self.t[self.i]
+        trecho = _TRECHO_STRING[aspas]
+        self.i += 1
+        partes = []
+        while self.i < self.n:
+            m = trecho.match(self.t, self.i)
+            partes.append(m.group())
+            self.i = m.end()
+            if self.i >= self.n:
+                break
+            c = self.t[self.i]
+            if c == aspas:
+                self.i += 1
+                return ''.join(partes)
+            # c == '\\'
+            esc = self.t[self.i + 1:self.i + 2]
+            if esc == 'u' and self.i + 6 <= self.n:
+                try:
+                    partes.append(chr(int(self.t[self.i + 2:self.i + 6], 16)))
+                    self.i += 6
+                    continue
+                except ValueError:
+                    pass
+            partes.append(_ESCAPES.get(esc, esc))
+            self.i += 2
+        return ''.join(partes)
+
+
+def _parece_dado(valor) -> bool:
+    """Descarta candidatos como '[1]' ou '[abaixo]' que aparecem no texto livre"""
+    if isinstance(valor, dict):
+        return True
+    return isinstance(valor, list) and len(valor) > 0 and all(isinstance(v, dict) for v in valor)
+
+
+def extract_json(text: str):
+    """
+    Extrai o JSON da resposta do modelo, mesmo com texto adicional ao redor
+    
+    Em cada candidato ('{' ou '[', do início para o fim), tenta primeiro decodificar
+    o valor JSON que começa ali (json.JSONDecoder.raw_decode, em C, que ignora o texto
+    depois do valor). Só se isso falhar o valor é lido com o parser tolerante, a partir
+    do mesmo ponto. Avança para o próximo candidato se o valor não for um objeto ou
+    lista de objetos.
+    
+    Args:
+        text: Texto da resposta do modelo
+    
+    Returns:
+        Dicionário ou Lista Python com os dados JSON
+    
+    Raises:
+        ValueError: se nenhum JSON aproveitável for encontrado
+    """
+    pos = 0
+    for _ in range(MAX_CANDIDATOS):
+        m = _ABERTURA.search(text, pos)
+        if not m:
+            break
+        inicio = m.start()
+        pos = inicio + 1
+        
+        try:
+            valor, _ = _DECODIFICADOR.raw_decode(text, inicio)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if _parece_dado(valor):
+                return valor
+            continue
+        
+        try:
+            valor = _ParserTolerante(text, inicio).parse()
+            if _parece_dado(valor):
+                return valor
+        except (ValueError, IndexError):
+            pass
+    
+    raise ValueError(f"Não foi possível extrair JSON válido da resposta: {text.strip()[:500]}")
+
+
+# ==================== NORMALIZAÇÃO DE QUESTÕES ====================
+
+def _lista_questoes(data) -> List:
+    """Converte os diferentes formatos devolvidos pelo modelo em uma lista de questões"""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+    
+    for chave in ('questoes', 'questions', 'questoes_reforco'):
+        if isinstance(data.get(chave), list):
+            return data[chave]
+    
+    valores = list(data.values())
+    if len(valores) == 1 and isinstance(valores[0], list):
+        # Se o dict tem apenas uma chave e o valor é uma lista
+        return valores[0]
+    
+    # Formatos com chaves numeradas: questao1, questao2... ou q1, q2... (ordem numérica)
+    numeradas = []
+    for chave, valor in data.items():
+        if chave.startswith('questao'):
+            digitos = ''.join(filter(str.isdigit, chave))
+            numeradas.append((int(digitos) if digitos else 999, valor))
+        elif chave.startswith('q') and chave[1:].isdigit():
+            numeradas.append((int(chave[1:]), valor))
+    if numeradas:
+        return [valor for _, valor in sorted(numeradas, key=lambda par: par[0])]
+    
+    if 'pergunta' in data or 'question' in data:
+        # Questão única
+        return [data]
+    
+    if valores and all(isinstance(v, dict) for v in valores):
+        return valores
+    
+    return []
+
+
+def _primeiro(q: Dict, *chaves):
+    for chave in chaves:
+        valor = q.get(chave)
+        if valor:
+            return valor
+    return None
+
+
+def _sem_prefixo(opcao) -> str:
+    """Remove prefixos como 'A) ', 'b. ' ou 'C: ' do texto de uma opção"""
+    texto = str(opcao).strip()
+    if len(texto) > 2 and texto[0].upper() in LETRAS_OPCOES and texto[1] in ').:':
+        texto = texto[2:].strip()
+    return texto
+
+
+def _letra_correta(valor) -> Optional[str]:
+    """Normaliza a resposta correta ('b', 'B)', 'B) texto') para a letra"""
+    texto = str(valor or '').strip().upper()
+    if texto and texto[0] in LETRAS_OPCOES and (len(texto) == 1 or texto[1] in ').: '):
+        return texto[0]
+    return None
+
+
+def normalizar_questoes(data, estrito: bool = False) -> List[Dict]:
+    """
+    Converte o JSON do modelo em questões no formato do PROFOCO:
+    {'pergunta': str, 'opcoes': [4 textos sem prefixo], 'correta': 'A'|'B'|'C'|'D'}
+    
+    Args:
+        data: JSON decodificado (lista, objeto com a lista, chaves numeradas ou questão única)
+        estrito: Se True, descarta questões sem exatamente 4 opções ou sem letra correta
+                 válida; se False, completa as opções e usa 'A' como correta
+    
+    Returns:
+        Lista de questões normalizadas (pode ser vazia)
+    """
+    questoes = []
+    for q in _lista_questoes(data):
+        if not isinstance(q, dict):
+            continue
+        
+        pergunta = _primeiro(q, 'pergunta', 'question', 'texto', 'enunciado')
+        if not pergunta or not isinstance(pergunta, str):
+            continue
+        
+        opcoes = _primeiro(q, 'opcoes', 'options', 'alternativas') or []
+        if isinstance(opcoes, dict):
+            # {'A': '...', 'B': '...'}
+            opcoes = [opcoes[k] for k in sorted(opcoes)]
+        if not isinstance(opcoes, list):
+            opcoes = []
+        opcoes = [_sem_prefixo(opcao) for opcao in opcoes]
+        
+        correta = _letra_correta(_primeiro(q, 'correta', 'correct', 'resposta_correta'))
+        
+        if estrito and (len(opcoes) != 4 or correta is None):
+            continue
+        
+        while len(opcoes) < 4:
+            opcoes.append("Opção não disponível")
+        
+        questoes.append({
+            'pergunta': pergunta.strip(),
+            'opcoes': opcoes[:4],
+            'correta': correta or 'A'
+        })
+    
+    return questoes
@@ -1,116 +1,1997 @@
 """
 Módulo de integração com Ollama para geração de questões e análise de respostas
 """
+import asyncio
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+import time
 import requests
+import httpx
 import json
-from typing import List, Dict, Optional
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional, Tuple
 
+from json_extractor import extract_json, normalizar_questoes, LETRAS_OPCOES
+from vector_index import IndiceVetorial, filtrar_similares
 
-class OllamaClient:
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3"):
+logger = logging.getLogger(__name__)
+
+# Marcador usado no lugar do nome do aluno nos comentários da IA. O nome não é
+# enviado ao modelo: é inserido depois, o que permite reaproveitar a mesma
+# análise para todos os alunos com o mesmo padrão de erros.
+MARCADOR_ALUNO = "{aluno}"
+
+# Locks por chave de padrão de erros, para que envios simultâneos com o mesmo
+# padrão gerem a análise uma única vez (os demais aguardam e leem do cache).
+# Número fixo de locks, escolhidos pelo hash da chave: a memória não cresce com o
+# número de padrões; chaves diferentes no mesmo lock só esperam uma pela outra.
+NUM_LOCKS_ANALISE = 256
+_locks_analise = [threading.Lock() for _ in range(NUM_LOCKS_ANALISE)]
+
+
+def _lock_analise(chave: str) -> threading.Lock:
+    return _locks_analise[hash(chave) % NUM_LOCKS_ANALISE]
+
+
+# ==================== ESCALONADOR DE REQUISIÇÕES ====================
+
+# Classes de prioridade (menor valor = atendido primeiro)
+PRIORIDADE_INTERATIVA = 0      # retorno ao aluno: análise de respostas, reforço
+PRIORIDADE_PROFESSOR = 1       # geração de questionários pelo professor
+PRIORIDADE_SEGUNDO_PLANO = 2   # pré-geração em segundo plano
+
+# Sessão (navegador/usuário) que está fazendo a requisição, usada para dividir
+# a vez de forma justa entre sessões da mesma prioridade
+sessao_atual: contextvars.ContextVar = contextvars.ContextVar('sessao_atual', default=None)
+
+
+def definir_sessao(sessao: Optional[str]):
+    """Define a sessão das próximas requisições feitas pela thread/contexto atual"""
+    sessao_atual.set(sessao)
+
+
+class FilaCheiaError(RuntimeError):
+    """A fila do escalonador está cheia; a requisição foi recusada sem esperar"""
+
+
+class _Ticket:
+    __slots__ = ('prioridade', 'sessao', 'liberado')
+    
+    def __init__(self, prioridade: int, sessao):
+        self.prioridade = prioridade
+        self.sessao = sessao
+        self.liberado = False
+
+
+class RequestScheduler:
+    """
+    Escalonador de requisições ao Ollama compartilhado pelo processo.
+    
+    - Limita a concorrência ao número de slots paralelos do servidor
+    - Atende primeiro as classes de maior prioridade
+    - Dentro de uma prioridade, alterna entre sessões (round-robin), para que
+      uma sessão com muitas requisições não bloqueie as demais
+    - Recusa requisições (FilaCheiaError) quando a fila passa do limite; as de
+      segundo plano são recusadas já com metade da fila ocupada
+    - Estima o tempo de espera a partir da duração média das requisições
+    """
+    
+    def __init__(self, slots: int = 1, max_fila: int = 64, duracao_inicial: float = 30.0):
+        """
+        Args:
+            slots: Requisições simultâneas permitidas (OLLAMA_NUM_PARALLEL do servidor)
+            max_fila: Número máximo de requisições aguardando
+            duracao_inicial: Estimativa inicial (segundos) da duração de uma requisição
+        """
+        self.slots = max(1, slots)
+        self.max_fila = max_fila
+        self._cond = threading.Condition()
+        self._ativos = 0
+        self._filas = {
+            p: OrderedDict()
+            for p in (PRIORIDADE_INTERATIVA, PRIORIDADE_PROFESSOR, PRIORIDADE_SEGUNDO_PLANO)
+        }
+        self._aguardando = 0
+        self._duracao_media = duracao_inicial
+    
+    def _limite_fila(self, prioridade: int) -> int:
+        if prioridade >= PRIORIDADE_SEGUNDO_PLANO:
+            return self.max_fila // 2
+        return self.max_fila
+    
+    def _proximo(self) -> Optional[_Ticket]:
+        """Retira o próximo ticket: maior prioridade, alternando entre sessões"""
+        for prioridade in sorted(self._filas):
+            fila = self._filas[prioridade]
+            for sessao, tickets in fila.items():
+                ticket = tickets.popleft()
+                if tickets:
+                    fila.move_to_end(sessao)
+                else:
+                    del fila[sessao]
+                return ticket
+        return None
+    
+    def _despachar(self):
+        while self._ativos < self.slots:
+            ticket = self._proximo()
+            if ticket is None:
+                break
+            ticket.liberado = True
+            self._aguardando -= 1
+            self._ativos += 1
+        self._cond.notify_all()
+    
+    def _remover(self, ticket: _Ticket):
+        fila = self._filas[ticket.prioridade]
+        tickets = fila.get(ticket.sessao)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del fila[ticket.sessao]
+            self._aguardando -= 1
+    
+    @contextmanager
+    def slot(self, prioridade: int = PRIORIDADE_INTERATIVA, sessao=None,
+             timeout_espera: Optional[float] = None):
+        """
+        Aguarda a vez e ocupa um slot do servidor enquanto o bloco executa
+        
+        Args:
+            prioridade: Classe de prioridade (PRIORIDADE_*)
+            sessao: Identificador da sessão (padrão: sessao_atual)
+            timeout_espera: Tempo máximo (segundos) na fila antes de desistir
+        
+        Raises:
+            FilaCheiaError: se a fila estiver cheia
+            TimeoutError: se o tempo na fila passar de timeout_espera
+        """
+        if sessao is None:
+            sessao = sessao_atual.get()
+        
+        with self._cond:
+            if self._aguardando >= self._limite_fila(prioridade):
+                raise FilaCheiaError(
+                    "Erro: O servidor de IA está sobrecarregado no momento "
+                    f"({self._aguardando} requisições na fila). Tente novamente em instantes."
+                )
+            ticket = _Ticket(prioridade, sessao)
+            self._filas[prioridade].setdefault(sessao, deque()).append(ticket)
+            self._aguardando += 1
+            self._despachar()
+            
+            limite = None if timeout_espera is None else time.monotonic() + timeout_espera
+            while not ticket.liberado:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    self._remover(ticket)
+                    raise TimeoutError("Erro: Tempo de espera na fila do Ollama esgotado.")
+                self._cond.wait(restante)
+        
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            duracao = time.monotonic() - inicio
+            with self._cond:
+                self._ativos -= 1
+                # Média móvel exponencial da duração das requisições
+                self._duracao_media = 0.8 * self._duracao_media + 0.2 * duracao
+                self._despachar()
+    
+    def ampliar_slots(self, slots: int):
+        """Passa a permitir ao menos slots requisições simultâneas (ex.: pool com vários servidores)"""
+        with self._cond:
+            if slots > self.slots:
+                self.slots = slots
+                self._despachar()
+    
+    def estimar_espera(self, prioridade: int = PRIORIDADE_INTERATIVA) -> float:
+        """Estimativa (segundos) de espera na fila para uma nova requisição com esta prioridade"""
+        with self._cond:
+            a_frente = sum(
+                len(tickets)
+                for p, fila in self._filas.items() if p <= prioridade
+                for tickets in fila.values()
+            )
+            if self._ativos < self.slots and a_frente == 0:
+                return 0.0
+            return (a_frente + 1) * self._duracao_media / self.slots
+    
+    def estado(self) -> Dict:
+        """Resumo da ocupação, para exibição na interface"""
+        with self._cond:
+            return {
+                'slots': self.slots,
+                'ativos': self._ativos,
+                'aguardando': self._aguardando,
+                'por_prioridade': {
+                    p: sum(len(t) for t in fila.values()) for p, fila in self._filas.items()
+                },
+                'duracao_media': self._duracao_media
+            }
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def obter_scheduler() -> RequestScheduler:
+    """
+    Retorna o escalonador do processo. O número de slots vem de OLLAMA_NUM_PARALLEL
+    (a mesma variável que configura o servidor Ollama), multiplicado pelo número de
+    servidores do pool (ver obter_pool), e o tamanho da fila de PROFOCO_MAX_FILA.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(
+                slots=int(os.environ.get('OLLAMA_NUM_PARALLEL', '1')),
+                max_fila=int(os.environ.get('PROFOCO_MAX_FILA', '64'))
+            )
+        return _scheduler
+
+
+# ==================== MODELOS POR TAREFA E LATÊNCIA ====================
+
+# Tarefas que podem usar modelos diferentes
+TAREFA_GERACAO = 'geracao'    # geração de questionários (se beneficia de um modelo maior)
+TAREFA_ANALISE = 'analise'    # comentários curtos e estruturados da análise
+TAREFA_REFORCO = 'reforco'    # questões de reforço
+TAREFAS = (TAREFA_GERACAO, TAREFA_ANALISE, TAREFA_REFORCO)
+
+
+def modelos_configurados() -> Dict[str, str]:
+    """
+    Modelos por tarefa definidos no ambiente (PROFOCO_MODELO_GERACAO,
+    PROFOCO_MODELO_ANALISE, PROFOCO_MODELO_REFORCO); tarefas sem variável
+    usam o modelo padrão do cliente
+    """
+    modelos = {}
+    for tarefa in TAREFAS:
+        modelo = os.environ.get(f'PROFOCO_MODELO_{tarefa.upper()}')
+        if modelo:
+            modelos[tarefa] = modelo
+    return modelos
+
+
+class LatenciaModelos:
+    """
+    Latências observadas por modelo e faixa de tamanho do prompt, usadas para
+    derivar o timeout de cada requisição (percentil 95 x FATOR_TIMEOUT, limitado
+    entre TIMEOUT_MINIMO e TIMEOUT_MAXIMO) e para detectar um modelo lento
+    (timeout recente), que passa a ser evitado por JANELA_DEGRADADO segundos.
+    """
+    
+    # Limites (em caracteres do prompt) das faixas 'curto', 'medio' e 'longo'
+    FAIXAS = ((1500, 'curto'), (4000, 'medio'))
+    AMOSTRAS = 50
+    MIN_AMOSTRAS = 5
+    FATOR_TIMEOUT = 2.0
+    TIMEOUT_MINIMO = 20.0
+    TIMEOUT_MAXIMO = float(os.environ.get('PROFOCO_TIMEOUT_MAXIMO', '300'))
+    JANELA_DEGRADADO = 120.0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._amostras: Dict[Tuple[str, str], deque] = {}
+        self._timeouts: Dict[str, int] = {}
+        self._ultimo_timeout: Dict[str, float] = {}
+    
+    @classmethod
+    def faixa(cls, tamanho_prompt: int) -> str:
+        for limite, nome in cls.FAIXAS:
+            if tamanho_prompt < limite:
+                return nome
+        return 'longo'
+    
+    @staticmethod
+    def _percentil(valores: List[float], p: float) -> float:
+        ordenados = sorted(valores)
+        indice = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))
+        return ordenados[indice]
+    
+    def registrar(self, modelo: str, tamanho_prompt: int, duracao: float):
+        """Registra a duração (segundos) de uma resposta bem-sucedida"""
+        chave = (modelo, self.faixa(tamanho_prompt))
+        with self._lock:
+            self._amostras.setdefault(chave, deque(maxlen=self.AMOSTRAS)).append(duracao)
+    
+    def registrar_timeout(self, modelo: str):
+        with self._lock:
+            self._timeouts[modelo] = self._timeouts.get(modelo, 0) + 1
+            self._ultimo_timeout[modelo] = time.monotonic()
+    
+    def timeout(self, modelo: str, tamanho_prompt: int) -> float:
+        """Timeout (segundos) para uma requisição; TIMEOUT_MAXIMO enquanto há poucas amostras"""
+        return self._timeout_faixa(modelo, self.faixa(tamanho_prompt))
+    
+    def _timeout_faixa(self, modelo: str, faixa: str) -> float:
+        with self._lock:
+            amostras = list(self._amostras.get((modelo, faixa), ()))
+        if len(amostras) < self.MIN_AMOSTRAS:
+            return self.TIMEOUT_MAXIMO
+        limite = self._percentil(amostras, 95) * self.FATOR_TIMEOUT
+        return min(self.TIMEOUT_MAXIMO, max(self.TIMEOUT_MINIMO, limite))
+    
+    def degradado(self, modelo: str) -> bool:
+        """True se o modelo estourou o timeout há menos de JANELA_DEGRADADO segundos"""
+        with self._lock:
+            ultimo = self._ultimo_timeout.get(modelo)
+        return ultimo is not None and time.monotonic() - ultimo < self.JANELA_DEGRADADO
+    
+    def resumo(self) -> List[Dict]:
+        """Uma linha por (modelo, faixa): amostras, p50, p95, timeout atual e timeouts do modelo"""
+        with self._lock:
+            amostras = {chave: list(valores) for chave, valores in self._amostras.items()}
+            timeouts = dict(self._timeouts)
+        
+        linhas = []
+        for (modelo, faixa), valores in sorted(amostras.items()):
+            linhas.append({
+                'modelo': modelo,
+                'faixa': faixa,
+                'amostras': len(valores),
+                'p50': self._percentil(valores, 50),
+                'p95': self._percentil(valores, 95),
+                'timeout': self._timeout_faixa(modelo, faixa),
+                'timeouts': timeouts.get(modelo, 0),
+                'degradado': self.degradado(modelo)
+            })
+        return linhas
+
+
+# Latências do processo (compartilhadas por todos os clientes)
+latencias = LatenciaModelos()
+
+
+# ==================== EMBEDDINGS ====================
+
+# Modelo usado em /api/embed (instale com: ollama pull nomic-embed-text)
+MODELO_EMBEDDINGS = os.environ.get('PROFOCO_MODELO_EMBEDDINGS', 'nomic-embed-text')
+
+# Similaridade (cosseno) a partir da qual duas perguntas são consideradas a mesma questão
+LIMIAR_DUPLICATA = float(os.environ.get('PROFOCO_LIMIAR_DUPLICATA', '0.92'))
+
+# Similaridade mínima para sugerir uma questão existente como semelhante
+LIMIAR_SEMELHANTE = 0.75
+
+
+# ==================== TELEMETRIA ====================
+
+# Desfecho de cada chamada ao modelo registrado na telemetria
+STATUS_OK = 'ok'
+STATUS_FALHA_PARSE = 'falha_parse'          # resposta sem JSON aproveitável
+STATUS_FORA_SCHEMA = 'fora_schema'          # JSON fora da estrutura pedida
+STATUS_TIMEOUT = 'timeout'
+STATUS_MODELO_AUSENTE = 'modelo_ausente'
+STATUS_ERRO = 'erro'
+
+# Campos de duração devolvidos pelo Ollama (em nanossegundos)
+_DURACOES_OLLAMA = ('total_duration', 'load_duration', 'prompt_eval_duration', 'eval_duration')
+
+
+# ==================== DISJUNTOR (CIRCUIT BREAKER) ====================
+
+# Estados do disjuntor de cada servidor Ollama
+CIRCUITO_FECHADO = 'fechado'        # servidor saudável: requisições passam
+CIRCUITO_ABERTO = 'aberto'          # falhas seguidas: requisições falham na hora
+CIRCUITO_SEMIABERTO = 'semiaberto'  # em recuperação: uma única requisição de teste passa
+
+# Falhas seguidas (conexão, timeout, HTTP 5xx) que abrem o disjuntor
+LIMITE_FALHAS_DISJUNTOR = int(os.environ.get('PROFOCO_DISJUNTOR_FALHAS', '3'))
+# Tempo aberto antes da primeira requisição de teste; dobra a cada teste que falha
+ESPERA_DISJUNTOR = float(os.environ.get('PROFOCO_DISJUNTOR_ESPERA', '30'))
+ESPERA_MAXIMA_DISJUNTOR = 300.0
+
+FALHA_CONEXAO = 'conexao'
+FALHA_TIMEOUT = 'timeout'
+FALHA_SERVIDOR = 'servidor'
+
+
+class ServidorIndisponivelError(ConnectionError):
+    """O disjuntor do servidor está aberto; a requisição foi recusada sem contatar o Ollama"""
+
+
+class DisjuntorOllama:
+    """
+    Disjuntor compartilhado pelas sessões que usam o mesmo servidor Ollama.
+    
+    Depois de LIMITE_FALHAS_DISJUNTOR falhas seguidas o disjuntor abre e as
+    requisições falham na hora, em vez de cada sessão esperar o próprio timeout.
+    Passada a espera, ele fica semiaberto: uma única requisição de teste chega ao
+    servidor; se ela funcionar o disjuntor fecha, senão reabre com o dobro da espera.
+    
+    As verificações periódicas do aquecimento servem de sonda de saúde: enquanto o
+    servidor não responde, mantêm o disjuntor aberto; se ele voltou a responder
+    depois de uma falha de conexão (ex.: Ollama reiniciado), antecipam o teste.
+    """
+    
+    def __init__(self, base_url: str, limite_falhas: int = LIMITE_FALHAS_DISJUNTOR,
+                 espera: float = ESPERA_DISJUNTOR, espera_maxima: float = ESPERA_MAXIMA_DISJUNTOR,
+                 duracao_maxima_teste: float = LatenciaModelos.TIMEOUT_MAXIMO + 60):
+        """
+        Args:
+            base_url: URL base do servidor Ollama
+            limite_falhas: Falhas seguidas que abrem o disjuntor
+            espera: Segundos aberto antes da primeira requisição de teste
+            espera_maxima: Limite da espera, que dobra a cada teste que falha
+            duracao_maxima_teste: Depois disso, uma requisição de teste sem desfecho
+                                  é considerada perdida e outra pode ser feita
+        """
+        self.base_url = base_url
+        self.limite_falhas = max(1, limite_falhas)
+        self.espera_inicial = espera
+        self.espera_maxima = espera_maxima
+        self.duracao_maxima_teste = duracao_maxima_teste
+        self._lock = threading.Lock()
+        self._estado = CIRCUITO_FECHADO
+        self._falhas = 0
+        self._espera = espera
+        self._reabre_em = 0.0
+        self._teste_desde: Optional[float] = None
+        self._ultima_falha: Optional[str] = None
+        self._ultimo_erro: Optional[str] = None
+        self._desde = time.time()
+    
+    def _mudar(self, estado: str):
+        if estado != self._estado:
+            self._estado = estado
+            self._desde = time.time()
+    
+    def _abrir(self, agora: float):
+        self._mudar(CIRCUITO_ABERTO)
+        self._reabre_em = agora + self._espera
+        self._teste_desde = None
+    
+    def disponivel(self) -> bool:
+        """Se uma requisição feita agora seria aceita (não altera o estado)"""
+        with self._lock:
+            agora = time.monotonic()
+            if self._estado == CIRCUITO_FECHADO:
+                return True
+            if self._estado == CIRCUITO_ABERTO:
+                return agora >= self._reabre_em
+            return self._teste_desde is None or agora - self._teste_desde > self.duracao_maxima_teste
+    
+    def _recusa(self, agora: float) -> ServidorIndisponivelError:
+        if self._estado == CIRCUITO_ABERTO:
+            detalhe = f"nova tentativa em {max(0.0, self._reabre_em - agora):.0f}s"
+        else:
+            detalhe = "verificando se voltou a responder"
+        return ServidorIndisponivelError(
+            f"Erro: Servidor de IA indisponível em {self.base_url} ({detalhe}). "
+            "Certifique-se de que o Ollama está rodando."
+        )
+    
+    def verificar(self):
+        """
+        Falha na hora se o servidor está indisponível, sem reservar a requisição de teste
+        (usado antes de entrar na fila do escalonador)
+        
+        Raises:
+            ServidorIndisponivelError: se permitir() recusaria a requisição agora
+        """
+        if not self.disponivel():
+            with self._lock:
+                raise self._recusa(time.monotonic())
+    
+    def permitir(self) -> bool:
+        """
+        Autoriza uma requisição ao servidor. Com o disjuntor semiaberto, só a primeira
+        requisição (o teste) é autorizada até que registrar_sucesso/registrar_falha/liberar
+        seja chamado.
+        
+        Returns:
+            True se a requisição é o teste de recuperação (quem a fez deve chamar
+            liberar() se ela terminar sem sucesso nem falha do servidor)
+        
+        Raises:
+            ServidorIndisponivelError: se o disjuntor estiver aberto ou já houver um teste em curso
+        """
+        with self._lock:
+            agora = time.monotonic()
+            if self._estado == CIRCUITO_FECHADO:
+                return False
+            if self._estado == CIRCUITO_ABERTO and agora >= self._reabre_em:
+                self._mudar(CIRCUITO_SEMIABERTO)
+            if self._estado == CIRCUITO_SEMIABERTO and (
+                self._teste_desde is None or agora - self._teste_desde > self.duracao_maxima_teste
+            ):
+                self._teste_desde = agora
+                return True
+            raise self._recusa(agora)
+    
+    def registrar_sucesso(self):
+        """O servidor respondeu: fecha o disjuntor e zera as falhas"""
+        with self._lock:
+            self._falhas = 0
+            self._espera = self.espera_inicial
+            self._teste_desde = None
+            self._mudar(CIRCUITO_FECHADO)
+    
+    def registrar_falha(self, tipo: str, erro: Optional[str] = None):
+        """
+        Registra uma falha do servidor (FALHA_CONEXAO, FALHA_TIMEOUT ou FALHA_SERVIDOR)
+        
+        Erros que não indicam problema no servidor (modelo ausente, fila cheia,
+        resposta fora do formato) não devem ser registrados aqui.
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._falhas += 1
+            self._ultima_falha = tipo
+            self._ultimo_erro = erro
+            if self._estado == CIRCUITO_SEMIABERTO:
+                # O teste falhou: reabre esperando mais
+                self._espera = min(self._espera * 2, self.espera_maxima)
+                self._abrir(agora)
+            elif self._estado == CIRCUITO_FECHADO and self._falhas >= self.limite_falhas:
+                self._abrir(agora)
+            elif self._estado == CIRCUITO_ABERTO and tipo == FALHA_CONEXAO:
+                # Sonda de saúde sem resposta: adia o próximo teste
+                self._reabre_em = max(self._reabre_em, agora + min(self._espera, 15.0))
+    
+    def liberar(self):
+        """A requisição autorizada terminou sem indicar a saúde do servidor (ex.: fila cheia)"""
+        with self._lock:
+            self._teste_desde = None
+    
+    def registrar_sonda(self, respondeu: bool, erro: Optional[str] = None):
+        """
+        Resultado de uma verificação de saúde (/api/tags, sem geração de texto)
+        
+        Args:
+            respondeu: Se o servidor respondeu à verificação
+            erro: Descrição da falha (se não respondeu)
+        """
+        if not respondeu:
+            self.registrar_falha(FALHA_CONEXAO, erro)
+            return
+        with self._lock:
+            if self._estado == CIRCUITO_ABERTO and self._ultima_falha == FALHA_CONEXAO:
+                # Estava fora do ar e voltou: a próxima requisição já pode ser o teste
+                self._reabre_em = time.monotonic()
+    
+    def estado(self) -> Dict:
+        """
+        Estado para a interface: {'estado' (CIRCUITO_*), 'falhas', 'ultimo_erro',
+        'desde' (timestamp da última mudança), 'proximo_teste' (segundos, se aberto)}
+        """
+        with self._lock:
+            agora = time.monotonic()
+            estado = self._estado
+            if estado == CIRCUITO_ABERTO and agora >= self._reabre_em:
+                estado = CIRCUITO_SEMIABERTO
+            return {
+                'estado': estado,
+                'falhas': self._falhas,
+                'ultimo_erro': self._ultimo_erro,
+                'desde': self._desde,
+                'proximo_teste': max(0.0, self._reabre_em - agora) if estado == CIRCUITO_ABERTO else None
+            }
+
+
+_disjuntores: Dict[str, DisjuntorOllama] = {}
+_disjuntores_lock = threading.Lock()
+
+
+def obter_disjuntor(base_url: str) -> DisjuntorOllama:
+    """Retorna o disjuntor do processo para o servidor (criado na primeira chamada)"""
+    with _disjuntores_lock:
+        if base_url not in _disjuntores:
+            _disjuntores[base_url] = DisjuntorOllama(base_url)
+        return _disjuntores[base_url]
+
+
+# ==================== AQUECIMENTO DO MODELO ====================
+
+# Tempo que o Ollama mantém o modelo na memória após cada requisição
+KEEP_ALIVE_PADRAO = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')
+
+# Estados de prontidão do modelo exibidos na interface
+PRONTIDAO_DESCONHECIDA = 'desconhecido'
+PRONTIDAO_CARREGANDO = 'carregando'
+PRONTIDAO_PRONTO = 'pronto'
+PRONTIDAO_MODELO_AUSENTE = 'modelo_ausente'
+PRONTIDAO_INDISPONIVEL = 'indisponivel'
+
+
+class AquecedorModelo:
+    """
+    Mantém o modelo carregado no servidor Ollama para que o tempo de carga
+    nunca recaia sobre a requisição de um aluno ou professor.
+    
+    Na partida e depois periodicamente: consulta /api/tags (o modelo está
+    instalado?) e /api/ps (está carregado?) e, se não estiver carregado, envia
+    uma requisição vazia a /api/generate com keep_alive explícito, que apenas
+    carrega o modelo. A requisição de carga não passa pelo escalonador, pois
+    não ocupa o servidor gerando texto.
+    """
+    
+    def __init__(self, base_url: str, model: str, keep_alive: str = KEEP_ALIVE_PADRAO,
+                 intervalo: float = 240.0, timeout_carga: float = 300.0):
+        """
+        Args:
+            base_url: URL base da API do Ollama
+            model: Modelo a manter carregado
+            keep_alive: Tempo de permanência na memória enviado ao Ollama (ex.: '30m')
+            intervalo: Segundos entre verificações (deve ser menor que keep_alive)
+            timeout_carga: Tempo máximo de espera pela carga do modelo
+        """
+        self.base_url = base_url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.intervalo = intervalo
+        self.timeout_carga = timeout_carga
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._estado = {
+            'estado': PRONTIDAO_DESCONHECIDA,
+            'mensagem': 'Verificando o servidor de IA...',
+            'verificado_em': None,
+            'duracao_carga': None
+        }
+    
+    def _nomes(self, caminho: str) -> List[str]:
+        response = requests.get(f"{self.base_url}{caminho}", timeout=5)
+        response.raise_for_status()
+        return [m.get('name', '') for m in response.json().get('models', [])]
+    
+    def _mesmo_modelo(self, nome: str) -> bool:
+        # 'llama3' equivale a 'llama3:latest' nas listas do Ollama
+        if ':' not in self.model:
+            return nome in (self.model, f"{self.model}:latest")
+        return nome == self.model
+    
+    def _atualizar(self, estado: str, mensagem: str, duracao_carga: Optional[float] = None):
+        with self._lock:
+            self._estado = {
+                'estado': estado,
+                'mensagem': mensagem,
+                'verificado_em': time.time(),
+                'duracao_carga': duracao_carga if duracao_carga is not None else self._estado['duracao_carga']
+            }
+    
+    def verificar(self, aquecer: bool = True) -> Dict:
+        """
+        Verifica a disponibilidade do modelo e, se aquecer=True, carrega-o quando necessário
+        
+        Returns:
+            Estado de prontidão atualizado (ver estado())
+        """
+        disjuntor = obter_disjuntor(self.base_url)
+        try:
+            instalados = self._nomes('/api/tags')
+            disjuntor.registrar_sonda(True)
+            if not any(self._mesmo_modelo(nome) for nome in instalados):
+                self._atualizar(
+                    PRONTIDAO_MODELO_AUSENTE,
+                    f"Modelo {self.model} não instalado. Execute: ollama pull {self.model}"
+                )
+                return self.estado()
+            
+            if any(self._mesmo_modelo(nome) for nome in self._nomes('/api/ps')):
+                self._atualizar(PRONTIDAO_PRONTO, f"Modelo {self.model} carregado")
+                if aquecer:
+                    # Renova o keep_alive mesmo com o modelo carregado
+                    self.aquecer()
+                return self.estado()
+            
+            if not aquecer:
+                self._atualizar(PRONTIDAO_CARREGANDO, f"Modelo {self.model} não está carregado")
+                return self.estado()
+            
+            self._atualizar(PRONTIDAO_CARREGANDO, f"Carregando o modelo {self.model}...")
+            inicio = time.monotonic()
+            self.aquecer()
+            self._atualizar(
+                PRONTIDAO_PRONTO, f"Modelo {self.model} carregado",
+                duracao_carga=time.monotonic() - inicio
+            )
+        except requests.exceptions.RequestException as e:
+            if isinstance(e, requests.exceptions.ConnectionError):
+                disjuntor.registrar_sonda(False, f"Sem conexão com o Ollama ({e.__class__.__name__})")
+            self._atualizar(
+                PRONTIDAO_INDISPONIVEL,
+                f"Servidor de IA indisponível em {self.base_url} ({e.__class__.__name__})"
+            )
+        return self.estado()
+    
+    def aquecer(self):
+        """Carrega o modelo (ou renova sua permanência) sem gerar texto"""
+        response = requests.post(
+            f"{self.base_url}/api/generate",
+            json={"model": self.model, "prompt": "", "keep_alive": self.keep_alive, "stream": False},
+            timeout=self.timeout_carga
+        )
+        response.raise_for_status()
+    
+    def estado(self) -> Dict:
+        """Último estado conhecido: {'estado', 'mensagem', 'verificado_em', 'duracao_carga'}"""
+        with self._lock:
+            return dict(self._estado)
+    
+    def iniciar(self):
+        """Inicia (uma única vez) a thread que aquece o modelo na partida e periodicamente"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._executar, name=f"profoco-aquecimento-{self.model}", daemon=True
+            )
+            self._thread.start()
+    
+    def _executar(self):
+        while True:
+            self.verificar(aquecer=True)
+            # Sem servidor, tenta novamente mais cedo
+            espera = self.intervalo if self.estado()['estado'] == PRONTIDAO_PRONTO else min(self.intervalo, 15.0)
+            time.sleep(espera)
+
+
+_aquecedores: Dict[Tuple[str, str], AquecedorModelo] = {}
+_aquecedores_lock = threading.Lock()
+
+
+def obter_aquecedor(base_url: str, model: str) -> AquecedorModelo:
+    """
+    Retorna o aquecedor do processo para (base_url, model). O intervalo entre
+    verificações vem de PROFOCO_INTERVALO_AQUECIMENTO (segundos).
+    """
+    with _aquecedores_lock:
+        chave = (base_url, model)
+        if chave not in _aquecedores:
+            _aquecedores[chave] = AquecedorModelo(
+                base_url, model,
+                intervalo=float(os.environ.get('PROFOCO_INTERVALO_AQUECIMENTO', '240'))
+            )
+        return _aquecedores[chave]
+
+
+# ==================== POOL DE SERVIDORES ====================
+
+# Segundos em que um servidor que respondeu 404 para um modelo deixa de recebê-lo
+ESPERA_MODELO_AUSENTE = 300.0
+
+
+def hosts_configurados() -> List[str]:
+    """
+    Servidores Ollama definidos em PROFOCO_OLLAMA_HOSTS (URLs separadas por vírgula,
+    ex.: máquinas do laboratório); sem a variável, apenas o servidor local
+    """
+    hosts = [
+        host.strip().rstrip('/')
+        for host in os.environ.get('PROFOCO_OLLAMA_HOSTS', '').split(',') if host.strip()
+    ]
+    return hosts or ["http://localhost:11434"]
+
+
+class HostOllama:
+    """Um servidor do pool: disjuntor, requisições em curso, latência média e modelos ausentes"""
+    
+    def __init__(self, base_url: str, slots: int = 1):
+        """
+        Args:
+            base_url: URL base da API do Ollama
+            slots: Requisições simultâneas que o servidor atende (OLLAMA_NUM_PARALLEL)
+        """
+        self.base_url = base_url
+        self.slots = max(1, slots)
+        # Compartilhado com o aquecimento, que usa as verificações como sonda de saúde
+        self.disjuntor = obter_disjuntor(base_url)
+        self.ativos = 0
+        self.requisicoes = 0
+        self.falhas = 0
+        self.latencia_media: Optional[float] = None
+        self._sem_modelo: Dict[str, float] = {}
+    
+    def preferencia(self, modelo: str) -> Optional[int]:
+        """
+        Ordem do servidor para o modelo: 0 se o modelo está carregado, 1 se a situação
+        é desconhecida ou o modelo está carregando, 2 se o aquecimento não conseguiu
+        falar com o servidor; None se o servidor não tem o modelo
+        """
+        if self._sem_modelo.get(modelo, 0.0) > time.monotonic():
+            return None
+        estado = obter_aquecedor(self.base_url, modelo).estado()['estado']
+        if estado == PRONTIDAO_MODELO_AUSENTE:
+            return None
+        if estado == PRONTIDAO_PRONTO:
+            return 0
+        return 2 if estado == PRONTIDAO_INDISPONIVEL else 1
+    
+    def registrar_sucesso(self, duracao: Optional[float] = None):
+        """O servidor respondeu; duracao (segundos) entra na latência média"""
+        self.disjuntor.registrar_sucesso()
+        if duracao is not None:
+            # Média móvel exponencial, como a duração média do escalonador
+            if self.latencia_media is None:
+                self.latencia_media = duracao
+            else:
+                self.latencia_media = 0.8 * self.latencia_media + 0.2 * duracao
+    
+    def registrar_falha(self, tipo: str, erro: Optional[str] = None):
+        """Falha do servidor (FALHA_*), contada também no disjuntor"""
+        self.falhas += 1
+        self.disjuntor.registrar_falha(tipo, erro)
+    
+    def registrar_modelo_ausente(self, modelo: str):
+        """O servidor respondeu 404 para o modelo: deixa de recebê-lo por ESPERA_MODELO_AUSENTE"""
+        self._sem_modelo[modelo] = time.monotonic() + ESPERA_MODELO_AUSENTE
+    
+    def estado(self) -> Dict:
+        """Estado para a interface: URL, ocupação, contadores, latência média e disjuntor"""
+        return {
+            'base_url': self.base_url,
+            'ativos': self.ativos,
+            'slots': self.slots,
+            'requisicoes': self.requisicoes,
+            'falhas': self.falhas,
+            'latencia_media': self.latencia_media,
+            'disjuntor': self.disjuntor.estado()
+        }
+
+
+class PoolOllama:
+    """
+    Servidores Ollama que atendem as mesmas requisições (ex.: máquinas do laboratório).
+    
+    Cada requisição vai para o servidor com menos requisições em curso (em proporção
+    aos seus slots) entre os que:
+    - têm o disjuntor fechado, ou liberam a requisição de teste;
+    - têm o modelo: os que já o têm carregado (segundo o aquecimento) vêm antes dos
+      demais, e os que responderam 404 para o modelo ficam de fora por um tempo.
+    No empate, vence o servidor de menor latência média. Quem faz a requisição passa
+    para outro servidor (reservar com excluir) quando o escolhido falha.
+    """
+    
+    def __init__(self, hosts: List[str], slots_por_host: int = 1):
+        """
+        Args:
+            hosts: URLs base dos servidores (repetidas são ignoradas)
+            slots_por_host: Requisições simultâneas de cada servidor (OLLAMA_NUM_PARALLEL)
+        """
+        self.hosts = [HostOllama(url, slots_por_host) for url in dict.fromkeys(hosts)]
+        self._lock = threading.Lock()
+    
+    def capacidade(self) -> int:
+        """Soma dos slots dos servidores"""
+        return sum(host.slots for host in self.hosts)
+    
+    def verificar(self):
+        """
+        Falha na hora se nenhum servidor aceitaria uma requisição agora
+        (usado antes de entrar na fila do escalonador)
+        
+        Raises:
+            ServidorIndisponivelError: se todos os disjuntores recusariam a requisição
+        """
+        if len(self.hosts) == 1:
+            self.hosts[0].disjuntor.verificar()
+        elif not any(host.disjuntor.disponivel() for host in self.hosts):
+            raise ServidorIndisponivelError(
+                f"Erro: Nenhum dos {len(self.hosts)} servidores de IA está respondendo. "
+                "Certifique-se de que o Ollama está rodando."
+            )
+    
+    def reservar(self, modelo: str, excluir=()) -> Optional[Tuple[HostOllama, bool]]:
+        """
+        Escolhe o servidor da próxima requisição ao modelo e a conta como em curso
+        até liberar(servidor)
+        
+        Args:
+            modelo: Modelo da requisição
+            excluir: Servidores que não devem ser usados (ex.: já falharam nesta requisição)
+        
+        Returns:
+            (servidor, teste), em que teste tem o sentido de DisjuntorOllama.permitir(),
+            ou None se nenhum servidor pode atender (ver recusa())
+        """
+        with self._lock:
+            candidatos = []
+            for posicao, host in enumerate(self.hosts):
+                if host in excluir or not host.disjuntor.disponivel():
+                    continue
+                preferencia = host.preferencia(modelo)
+                if preferencia is None:
+                    continue
+                candidatos.append((preferencia, host.ativos / host.slots, host.latencia_media or 0.0, posicao))
+            
+            for *_, posicao in sorted(candidatos):
+                host = self.hosts[posicao]
+                try:
+                    teste = host.disjuntor.permitir()
+                except ServidorIndisponivelError:
+                    continue  # outra requisição acabou de reservar o teste deste servidor
+                host.ativos += 1
+                host.requisicoes += 1
+                return host, teste
+        return None
+    
+    def liberar(self, host: HostOllama):
+        """A requisição reservada com reservar() terminou"""
+        with self._lock:
+            host.ativos -= 1
+    
+    def recusa(self, modelo: str, excluir=()) -> Exception:
+        """Erro a informar quando reservar() não encontrou servidor para o modelo"""
+        restantes = [host for host in self.hosts if host not in excluir]
+        if restantes and all(host.preferencia(modelo) is None for host in restantes):
+            return Exception(f"Erro: Modelo {modelo} não encontrado no Ollama.")
+        if len(self.hosts) == 1:
+            try:
+                self.hosts[0].disjuntor.verificar()
+            except ServidorIndisponivelError as e:
+                return e
+        return ServidorIndisponivelError(
+            f"Erro: Nenhum servidor de IA disponível para o modelo {modelo}. "
+            "Certifique-se de que o Ollama está rodando."
+        )
+    
+    def estado(self) -> List[Dict]:
+        """Estado de cada servidor (ver HostOllama.estado())"""
+        with self._lock:
+            return [host.estado() for host in self.hosts]
+
+
+_pools: Dict[Tuple[str, ...], PoolOllama] = {}
+_pools_lock = threading.Lock()
+
+
+def obter_pool(hosts: List[str]) -> PoolOllama:
+    """
+    Retorna o pool do processo para os servidores (criado na primeira chamada), com
+    OLLAMA_NUM_PARALLEL slots por servidor. O escalonador passa a liberar tantas
+    requisições simultâneas quanto a capacidade do pool.
+    """
+    chave = tuple(dict.fromkeys(hosts))
+    with _pools_lock:
+        if chave not in _pools:
+            _pools[chave] = PoolOllama(list(chave), int(os.environ.get('OLLAMA_NUM_PARALLEL', '1')))
+        pool = _pools[chave]
+    obter_scheduler().ampliar_slots(pool.capacidade())
+    return pool
+
+
+# ==================== SAÍDA ESTRUTURADA (JSON SCHEMA) ====================
+
+def schema_questoes(num_questoes: int) -> Dict:
+    """JSON Schema (campo 'format' do Ollama) de uma lista com num_questoes questões"""
+    return {
+        "type": "object",
+        "properties": {
+            "questoes": {
+                "type": "array",
+                "minItems": num_questoes,
+                "maxItems": num_questoes,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "pergunta": {"type": "string"},
+                        "opcoes": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": 4,
+                            "maxItems": 4
+                        },
+                        "correta": {"type": "string", "enum": LETRAS_OPCOES}
+                    },
+                    "required": ["pergunta", "opcoes", "correta"]
+                }
+            }
+        },
+        "required": ["questoes"]
+    }
+
+
+# JSON Schema da análise de desempenho
+SCHEMA_ANALISE = {
+    "type": "object",
+    "properties": {
+        "nivel_dominio": {"type": "string", "enum": ["Iniciante", "Básico", "Intermediário", "Avançado"]},
+        "topicos_dificuldade": {"type": "array", "items": {"type": "string"}},
+        "recomendacoes": {"type": "string"},
+        "pontos_fortes": {"type": "string"}
+    },
+    "required": ["nivel_dominio", "topicos_dificuldade", "recomendacoes", "pontos_fortes"]
+}
+
+_TIPOS_SCHEMA = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool
+}
+
+
+def validar_schema(data, schema: Dict, caminho: str = "$") -> List[str]:
+    """
+    Valida data contra o subconjunto de JSON Schema usado aqui
+    (type, enum, properties, required, items, minItems, maxItems)
+    
+    Returns:
+        Lista de erros (vazia se válido)
+    """
+    tipo = schema.get('type')
+    if tipo and not isinstance(data, _TIPOS_SCHEMA[tipo]):
+        return [f"{caminho}: esperado {tipo}, recebido {type(data).__name__}"]
+    
+    erros = []
+    if 'enum' in schema and data not in schema['enum']:
+        erros.append(f"{caminho}: valor {data!r} fora de {schema['enum']}")
+    
+    if tipo == 'object':
+        for campo in schema.get('required', []):
+            if campo not in data:
+                erros.append(f"{caminho}: campo obrigatório '{campo}' ausente")
+        for campo, sub_schema in schema.get('properties', {}).items():
+            if campo in data:
+                erros.extend(validar_schema(data[campo], sub_schema, f"{caminho}.{campo}"))
+    elif tipo == 'array':
+        if len(data) < schema.get('minItems', 0):
+            erros.append(f"{caminho}: {len(data)} itens (mínimo {schema['minItems']})")
+        if 'maxItems' in schema and len(data) > schema['maxItems']:
+            erros.append(f"{caminho}: {len(data)} itens (máximo {schema['maxItems']})")
+        if 'items' in schema:
+            for i, item in enumerate(data):
+                erros.extend(validar_schema(item, schema['items'], f"{caminho}[{i}]"))
+    
+    return erros
+
+
+class EstatisticasGeracao:
+    """
+    Contadores por modelo: respostas recebidas, novas tentativas (gerações repetidas),
+    respostas sem JSON aproveitável e respostas fora do schema
+    """
+    
+    EVENTOS = ('respostas', 'retentativas', 'falhas_parse', 'falhas_schema')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_modelo: Dict[str, Dict[str, int]] = {}
+    
+    def registrar(self, modelo: str, evento: str):
+        """Incrementa o contador de um evento (um de EVENTOS) para o modelo"""
+        with self._lock:
+            contadores = self._por_modelo.setdefault(modelo, dict.fromkeys(self.EVENTOS, 0))
+            contadores[evento] += 1
+    
+    def resumo(self) -> Dict[str, Dict]:
+        """Contadores e taxas (retentativas e falhas por resposta) de cada modelo"""
+        with self._lock:
+            resumo = {}
+            for modelo, contadores in self._por_modelo.items():
+                respostas = contadores['respostas'] or 1
+                resumo[modelo] = dict(
+                    contadores,
+                    taxa_retentativa=contadores['retentativas'] / respostas,
+                    taxa_falha_parse=(contadores['falhas_parse'] + contadores['falhas_schema']) / respostas
+                )
+            return resumo
+
+
+# Estatísticas do processo (compartilhadas por todos os clientes)
+estatisticas_geracao = EstatisticasGeracao()
+
+
+class _RespostaHTTPError(Exception):
+    """Resposta de erro do Ollama (HTTP 4xx/5xx), com a resposta do requests ou do httpx"""
+    
+    def __init__(self, response, mensagem: str):
+        super().__init__(mensagem)
+        self.response = response
+
+
+class _OllamaBase:
+    """
+    Código compartilhado entre o cliente síncrono e o assíncrono:
+    montagem de prompts, escolha de modelo e servidor, timeouts, extração de JSON
+    e normalização das respostas. As subclasses implementam apenas o transporte
+    HTTP (_enviar) e conduzem os roteiros de requisição com ele.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3",
+                 modelos: Optional[Dict[str, str]] = None, modelo_reserva: Optional[str] = None,
+                 telemetria=None, hosts: Optional[List[str]] = None,
+                 indice_questoes: Optional[IndiceVetorial] = None,
+                 modelo_embeddings: str = MODELO_EMBEDDINGS):
+        """
+        Inicializa o cliente Ollama
+        
+        Args:
+            base_url: URL base da API do Ollama (padrão: http://localhost:11434)
+            model: Nome do modelo padrão (padrão: llama3)
+            modelos: Modelo por tarefa ({TAREFA_GERACAO: ..., TAREFA_ANALISE: ...,
+                     TAREFA_REFORCO: ...}); tarefas ausentes usam o modelo padrão
+            modelo_reserva: Modelo menor usado quando o da tarefa estoura o timeout
+                            (opcional)
+            telemetria: Objeto com registrar_metrica(chamada: Dict), como o Database,
+                        que recebe uma linha por chamada ao modelo (opcional)
+            hosts: URLs de vários servidores Ollama entre os quais as requisições são
+                   distribuídas (ex.: hosts_configurados()); substitui base_url
+            indice_questoes: Índice com os embeddings das questões já salvas, usado
+                             para descartar paráfrases na geração (opcional)
+            modelo_embeddings: Modelo usado em /api/embed
+        """
+        hosts = hosts or [base_url]
+        self.base_url = hosts[0]
+        self.model = model
+        self.telemetria = telemetria
+        # Compartilhado por todos os clientes dos mesmos servidores no processo
+        self.pool = obter_pool(hosts)
+        self.modelos = {tarefa: model for tarefa in TAREFAS}
+        self.modelos.update(modelos or {})
+        self.modelo_reserva = modelo_reserva
+        self.keep_alive = KEEP_ALIVE_PADRAO
+        self.indice_questoes = indice_questoes
+        self.modelo_embeddings = modelo_embeddings
+        self._cache_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache_embeddings_lock = threading.Lock()
+    
+    def modelo_para(self, tarefa: str) -> str:
+        """Modelo configurado para a tarefa (TAREFA_*)"""
+        return self.modelos.get(tarefa, self.model)
+    
+    def _candidatos(self, tarefa: str) -> List[str]:
+        """
+        Modelos a tentar, em ordem: o da tarefa e depois o de reserva. Se o modelo
+        da tarefa estourou o timeout recentemente, a reserva é tentada primeiro.
+        """
+        principal = self.modelo_para(tarefa)
+        if not self.modelo_reserva or self.modelo_reserva == principal:
+            return [principal]
+        if latencias.degradado(principal):
+            return [self.modelo_reserva, principal]
+        return [principal, self.modelo_reserva]
+    
+    def _payload(self, prompt: str, system: Optional[str] = None, schema: Optional[Dict] = None,
+                 modelo: Optional[str] = None) -> Dict:
+        """Monta o corpo da requisição para /api/generate"""
+        payload = {
+            "model": modelo or self.model,
+            "prompt": prompt,
+            "stream": False,
+            # Com schema, o Ollama restringe a saída à estrutura pedida;
+            # sem schema, apenas força JSON
+            "format": schema if schema is not None else "json",
+            # Mantém o modelo na memória entre as requisições
+            "keep_alive": self.keep_alive
+        }
+        
+        if system:
+            payload["system"] = system
+        
+        return payload
+    
+    def _extract_json(self, text: str):
+        """
+        Extrai JSON da resposta do modelo, mesmo se houver texto adicional
+        
+        Args:
+            text: Texto da resposta do modelo
+        
+        Returns:
+            Dicionário ou Lista Python com os dados JSON
+        """
+        return extract_json(text)
+    
+    def _nova_chamada(self, tarefa: str, modelo: str, tentativa: int = 0) -> Dict:
+        """Registro de telemetria de uma chamada ao modelo (durações em segundos)"""
+        chamada = {
+            'tarefa': tarefa,
+            'modelo': modelo,
+            'host': None,
+            'tentativa': tentativa,
+            'status': STATUS_OK,
+            'erro': None,
+            'latencia': None,
+            'espera_fila': 0.0,
+            'prompt_eval_count': None,
+            'eval_count': None,
+        }
+        chamada.update(dict.fromkeys(_DURACOES_OLLAMA))
+        return chamada
+    
+    def _completar_chamada(self, chamada: Dict, dados: Dict, latencia: float):
+        """Copia da resposta do Ollama as durações (ns -> s) e contagens de tokens"""
+        chamada['latencia'] = latencia
+        for campo in _DURACOES_OLLAMA:
+            if isinstance(dados.get(campo), (int, float)):
+                chamada[campo] = dados[campo] / 1e9
+        for campo in ('prompt_eval_count', 'eval_count'):
+            if isinstance(dados.get(campo), int):
+                chamada[campo] = dados[campo]
+    
+    def _registrar_chamada(self, chamada: Dict, status: Optional[str] = None, erro: Optional[str] = None):
+        """Grava a chamada na telemetria (falhas na gravação nunca interrompem a requisição)"""
+        if status is not None:
+            chamada['status'] = status
+        if erro is not None:
+            chamada['erro'] = erro[:500]
+        if self.telemetria is None:
+            return
+        try:
+            self.telemetria.registrar_metrica(chamada)
+        except Exception:
+            logger.warning("Falha ao registrar telemetria da chamada ao modelo", exc_info=True)
+    
+    def _registrar_resposta_http(self, host: HostOllama, response, erro: str) -> bool:
+        """
+        Informa ao servidor uma resposta de erro HTTP: 5xx é falha do servidor; 4xx mostra que ele responde
+        
+        Returns:
+            True se foi falha do servidor (a requisição pode ir para outro servidor do pool)
+        """
+        if response is None or response.status_code >= 500:
+            host.registrar_falha(FALHA_SERVIDOR, erro)
+            return True
+        host.registrar_sucesso()
+        return False
+    
+    def _timeout(self, modelo: str, tamanho: int) -> float:
+        """Timeout (segundos) de uma requisição, a partir das latências observadas do modelo"""
+        return latencias.timeout(modelo, tamanho)
+    
+    def _roteiro_geracao(self, prompt: str, system: Optional[str] = None, schema: Optional[Dict] = None,
+                         tarefa: str = TAREFA_GERACAO, tentativa: int = 0, espera_fila: float = 0.0):
+        """
+        Roteiro de uma requisição a /api/generate, independente do transporte HTTP
+        
+        O timeout vem das latências observadas para o modelo e o tamanho do prompt.
+        Se o modelo da tarefa estourar o timeout (ou não existir no servidor), a
+        requisição é repetida com o modelo de reserva. Com vários servidores, o pool
+        escolhe o servidor; se ele não conectar, responder 5xx ou não tiver o modelo,
+        a requisição vai para o próximo.
+        
+        É um gerador conduzido por _conduzir(): cada envio é produzido como o passo
+        ('_enviar', (url, payload, timeout)) e o transporte devolve (resposta JSON,
+        duração) com send() ou a falha com throw() (ConnectionError, TimeoutError,
+        _RespostaHTTPError ou outra exceção).
+        
+        Returns:
+            (resposta do modelo como string, registro da chamada). O registro traz o
+            'modelo' que respondeu e é gravado na telemetria por _interpretar();
+            chamadas que falham são gravadas aqui.
+        """
+        tamanho_prompt = len(prompt) + len(system or '')
+        erros = []
+        # Servidores que falharam (conexão, timeout, HTTP 5xx) durante esta requisição
+        falhos = set()
+        
+        for modelo in self._candidatos(tarefa):
+            payload = self._payload(prompt, system, schema, modelo)
+            timeout = self._timeout(modelo, tamanho_prompt)
+            sem_modelo = set()
+            
+            while True:
+                reserva = self.pool.reservar(modelo, falhos | sem_modelo)
+                if reserva is None:
+                    erros.append(self.pool.recusa(modelo, falhos | sem_modelo))
+                    break
+                host, teste = reserva
+                chamada = self._nova_chamada(tarefa, modelo, tentativa)
+                chamada['host'] = host.base_url
+                chamada['espera_fila'], espera_fila = espera_fila, 0.0
+                try:
+                    dados, duracao = yield '_enviar', (f"{host.base_url}/api/generate", payload, timeout)
+                    host.registrar_sucesso(duracao)
+                    latencias.registrar(modelo, tamanho_prompt, duracao)
+                    self._completar_chamada(chamada, dados, duracao)
+                    return dados.get("response", ""), chamada
+                except ConnectionError:
+                    host.registrar_falha(FALHA_CONEXAO, "Sem conexão com o Ollama")
+                    self._registrar_chamada(chamada, STATUS_ERRO, "Sem conexão com o Ollama")
+                    falhos.add(host)
+                    erros.append(ConnectionError(
+                        f"Erro: Não foi possível conectar ao Ollama em {host.base_url}. "
+                        "Certifique-se de que o Ollama está rodando."
+                    ))
+                except TimeoutError:
+                    host.registrar_falha(FALHA_TIMEOUT, f"Timeout de {timeout:.0f}s (modelo {modelo})")
+                    latencias.registrar_timeout(modelo)
+                    chamada['latencia'] = timeout
+                    self._registrar_chamada(chamada, STATUS_TIMEOUT, f"Timeout de {timeout:.0f}s")
+                    falhos.add(host)
+                    erros.append(TimeoutError(
+                        f"Erro: Timeout ({timeout:.0f}s) ao comunicar com o Ollama (modelo {modelo})."
+                    ))
+                    # Outro servidor com o mesmo modelo dobraria a espera: passa ao modelo de reserva
+                    break
+                except _RespostaHTTPError as e:
+                    if self._registrar_resposta_http(host, e.response, str(e)):
+                        self._registrar_chamada(chamada, STATUS_ERRO, str(e))
+                        falhos.add(host)
+                        erros.append(Exception(f"Erro ao comunicar com Ollama: {str(e)}"))
+                    elif e.response.status_code == 404:
+                        host.registrar_modelo_ausente(modelo)
+                        sem_modelo.add(host)
+                        self._registrar_chamada(chamada, STATUS_MODELO_AUSENTE, str(e))
+                        erros.append(Exception(f"Erro: Modelo {modelo} não encontrado no Ollama."))
+                    else:
+                        self._registrar_chamada(chamada, STATUS_ERRO, str(e))
+                        raise Exception(f"Erro ao comunicar com Ollama: {str(e)}")
+                except GeneratorExit:
+                    # Requisição abandonada pelo transporte (ex.: tarefa asyncio cancelada)
+                    if teste:
+                        host.disjuntor.liberar()
+                    raise
+                except Exception as e:
+                    if teste:
+                        host.disjuntor.liberar()
+                    self._registrar_chamada(chamada, STATUS_ERRO, str(e))
+                    raise Exception(f"Erro ao comunicar com Ollama: {str(e)}")
+                finally:
+                    self.pool.liberar(host)
+        
+        # Nenhum servidor respondeu com os modelos: reporta o primeiro erro (o do modelo da tarefa)
+        raise erros[0]
+    
+    def _roteiro_embeddings(self, textos: List[str], espera_fila: float = 0.0):
+        """
+        Roteiro de uma requisição a /api/embed com todos os textos, no mesmo formato
+        de _roteiro_geracao()
+        
+        Returns:
+            Os vetores devolvidos pelo Ollama
+        """
+        # Servidores que falharam (conexão, HTTP 5xx): a requisição passa para o próximo
+        falhos = set()
+        ultimo_erro: Optional[Exception] = None
+        # Mesma política de timeout das demais tarefas: adaptada às latências observadas
+        # do modelo de embeddings para lotes de tamanho semelhante
+        tamanho_lote = sum(len(t) for t in textos)
+        payload = {"model": self.modelo_embeddings, "input": textos, "keep_alive": self.keep_alive}
+        while True:
+            reserva = self.pool.reservar(self.modelo_embeddings, falhos)
+            if reserva is None:
+                erro = self.pool.recusa(self.modelo_embeddings, falhos)
+                if isinstance(erro, ServidorIndisponivelError) and ultimo_erro is not None:
+                    raise ultimo_erro
+                raise erro
+            host, teste = reserva
+            chamada = self._nova_chamada('embeddings', self.modelo_embeddings)
+            chamada['host'] = host.base_url
+            chamada['espera_fila'], espera_fila = espera_fila, 0.0
+            timeout = self._timeout(self.modelo_embeddings, tamanho_lote)
+            try:
+                dados, duracao = yield '_enviar', (f"{host.base_url}/api/embed", payload, timeout)
+                host.registrar_sucesso()
+                latencias.registrar(self.modelo_embeddings, tamanho_lote, duracao)
+                self._completar_chamada(chamada, dados, duracao)
+                self._registrar_chamada(chamada)
+                return dados.get("embeddings", [])
+            except ConnectionError:
+                host.registrar_falha(FALHA_CONEXAO, "Sem conexão com o Ollama")
+                self._registrar_chamada(chamada, STATUS_ERRO, "Sem conexão com o Ollama")
+                falhos.add(host)
+                ultimo_erro = ConnectionError(
+                    f"Erro: Não foi possível conectar ao Ollama em {host.base_url}. "
+                    "Certifique-se de que o Ollama está rodando."
+                )
+            except TimeoutError:
+                host.registrar_falha(FALHA_TIMEOUT, f"Timeout de {timeout:.0f}s ao calcular embeddings")
+                latencias.registrar_timeout(self.modelo_embeddings)
+                chamada['latencia'] = timeout
+                self._registrar_chamada(chamada, STATUS_TIMEOUT, f"Timeout de {timeout:.0f}s")
+                raise TimeoutError("Erro: Timeout ao calcular embeddings no Ollama.")
+            except GeneratorExit:
+                if teste:
+                    host.disjuntor.liberar()
+                raise
+            except Exception as e:
+                if isinstance(e, _RespostaHTTPError):
+                    if self._registrar_resposta_http(host, e.response, str(e)):
+                        self._registrar_chamada(chamada, STATUS_ERRO, str(e))
+                        falhos.add(host)
+                        ultimo_erro = Exception(
+                            f"Erro ao calcular embeddings com o modelo {self.modelo_embeddings}: {str(e)}"
+                        )
+                        continue
+                elif teste:
+                    host.disjuntor.liberar()
+                self._registrar_chamada(chamada, STATUS_ERRO, str(e))
+                raise Exception(f"Erro ao calcular embeddings com o modelo {self.modelo_embeddings}: {str(e)}")
+            finally:
+                self.pool.liberar(host)
+    
+    def _embeddings_em_cache(self, textos: List[str]) -> Tuple[Dict[str, List[float]], List[str]]:
+        """
+        Separa os textos com embedding em cache dos que precisam ser calculados
+        
+        Returns:
+            (vetores encontrados por texto, textos faltantes sem repetição)
+        """
+        with self._cache_embeddings_lock:
+            encontrados = {t: self._cache_embeddings[t] for t in textos if t in self._cache_embeddings}
+        return encontrados, [t for t in dict.fromkeys(textos) if t not in encontrados]
+    
+    def _guardar_embeddings(self, encontrados: Dict[str, List[float]], faltantes: List[str],
+                            vetores: List[List[float]]):
+        """
+        Junta os vetores calculados aos encontrados e os guarda no cache (os 512 mais recentes)
+        
+        Raises:
+            ValueError: se o Ollama devolveu um número de vetores diferente do pedido
+        """
+        if len(vetores) != len(faltantes):
+            raise ValueError("O Ollama retornou um número de embeddings diferente do pedido")
+        
+        encontrados.update(zip(faltantes, vetores))
+        with self._cache_embeddings_lock:
+            for texto, vetor in zip(faltantes, vetores):
+                self._cache_embeddings[texto] = vetor
+            while len(self._cache_embeddings) > 512:
+                self._cache_embeddings.popitem(last=False)
+    
+    def _filtrar_parafrases(self, questoes: List[Dict], vetores: List[List[float]]) -> List[Dict]:
+        """Remove as questões quase iguais (similaridade >= LIMIAR_DUPLICATA) entre si ou às já salvas"""
+        aceitas = filtrar_similares(vetores, LIMIAR_DUPLICATA, self.indice_questoes)
+        return [questoes[i] for i in aceitas]
+    
+    def _roteiro_questoes(self, disciplina: str, topico: str, num_questoes: int,
+                          prioridade: int = PRIORIDADE_PROFESSOR,
+                          progresso: Optional[Callable[[List[Dict]], None]] = None):
+        """
+        Roteiro de gerar_questoes(), compartilhado pelos dois clientes: até 3 tentativas,
+        pedido das questões restantes quando o modelo devolve só uma, e remoção de
+        repetidas e paráfrases a cada resposta
+        
+        Gerador conduzido por _conduzir(), como _roteiro_geracao(): os passos são
+        ('_make_request', (prompt, system, prioridade, schema, tarefa, tentativa)) e
+        ('_deduplicar', (questoes, prioridade)), executados pelo cliente.
+        
+        Returns:
+            As questões (ver OllamaClient.gerar_questoes)
+        """
+        system_prompt, user_prompt = self._prompts_questoes(disciplina, topico, num_questoes)
+        schema = schema_questoes(num_questoes)
+        
+        # Tenta gerar questões (com retry e geração incremental se necessário)
+        max_tentativas = 3
+        questoes_formatadas_final = []
+        
+        for tentativa in range(max_tentativas):
+            if tentativa > 0:
+                estatisticas_geracao.registrar(self.modelo_para(TAREFA_GERACAO), 'retentativas')
+            try:
+                response, chamada = yield '_make_request', (
+                    user_prompt, system_prompt, prioridade, schema, TAREFA_GERACAO, tentativa
+                )
+                # Mesmo fora do schema, aproveita o que for possível antes de repetir a geração
+                data, _ = self._interpretar(response, schema, chamada)
+                questoes_formatadas = normalizar_questoes(data)
+                
+                # Se gerou questões válidas, adiciona à lista final (sem repetidas nem paráfrases)
+                if len(questoes_formatadas) > 0:
+                    questoes_formatadas_final = yield '_deduplicar', (
+                        questoes_formatadas_final + questoes_formatadas, prioridade
+                    )
+                    if progresso:
+                        progresso(questoes_formatadas_final[:num_questoes])
+                    
+                    # Se já tem questões suficientes, para
+                    if len(questoes_formatadas_final) >= num_questoes:
+                        break
+                    
+                    # Se gerou apenas 1 questão e precisa de mais, tenta gerar as restantes
+                    if len(questoes_formatadas) == 1:
+                        questoes_restantes = num_questoes - len(questoes_formatadas_final)
+                        schema_inc = schema_questoes(questoes_restantes)
+                        estatisticas_geracao.registrar(chamada['modelo'], 'retentativas')
+                        try:
+                            response_inc, chamada_inc = yield '_make_request', (
+                                self._prompt_incremental(disciplina, topico, questoes_restantes),
+                                system_prompt,
+                                prioridade,
+                                schema_inc,
+                                TAREFA_GERACAO,
+                                tentativa + 1
+                            )
+                            data_inc, _ = self._interpretar(response_inc, schema_inc, chamada_inc)
+                            questoes_formatadas_final = yield '_deduplicar', (
+                                questoes_formatadas_final + normalizar_questoes(data_inc), prioridade
+                            )
+                            if progresso:
+                                progresso(questoes_formatadas_final[:num_questoes])
+                        except (FilaCheiaError, ServidorIndisponivelError):
+                            raise
+                        except Exception:
+                            pass  # Se falhar, continua com o que tem
+            
+            except (FilaCheiaError, ConnectionError, TimeoutError):
+                # Servidor sobrecarregado, fora do ar ou sem responder no prazo (o modelo de
+                # reserva já foi tentado): não adianta repetir
+                raise
+            except Exception:
+                if tentativa < max_tentativas - 1:
+                    continue  # Tenta novamente
+                raise  # Re-raise na última tentativa
+        
+        return self._finalizar_questoes(questoes_formatadas_final, num_questoes)
+    
+    def _interpretar(self, response: str, schema: Dict, chamada: Optional[Dict] = None):
+        """
+        Extrai o JSON da resposta e valida contra o schema, registrando as estatísticas
+        e a telemetria da chamada
+        
+        Args:
+            response: Texto da resposta
+            schema: JSON Schema esperado
+            chamada: Registro da chamada devolvido por _make_request() (opcional)
+        
+        Returns:
+            (data, valido): o JSON decodificado e se ele segue o schema
+        
+        Raises:
+            ValueError: se a resposta não contém JSON
+        """
+        modelo = chamada['modelo'] if chamada else self.model
+        estatisticas_geracao.registrar(modelo, 'respostas')
+        try:
+            data = self._extract_json(response)
+        except ValueError:
+            estatisticas_geracao.registrar(modelo, 'falhas_parse')
+            if chamada:
+                self._registrar_chamada(chamada, STATUS_FALHA_PARSE)
+            raise
+        
+        valido = not validar_schema(data, schema)
+        if not valido:
+            estatisticas_geracao.registrar(modelo, 'falhas_schema')
+        if chamada:
+            self._registrar_chamada(chamada, STATUS_OK if valido else STATUS_FORA_SCHEMA)
+        return data, valido
+    
+    def _exemplo_questoes(self, topico: str, num_exemplos: int) -> str:
+        """Exemplo de resposta (JSON válido) incluído nos prompts de geração"""
+        ordinais = ['Primeira', 'Segunda', 'Terceira']
+        exemplo = {"questoes": [
+            {
+                "pergunta": f"{ordinais[i]} pergunta sobre {topico}",
+                "opcoes": ["Opção A", "Opção B", "Opção C", "Opção D"],
+                "correta": LETRAS_OPCOES[i]
+            }
+            for i in range(min(num_exemplos, 3))
+        ]}
+        return json.dumps(exemplo, ensure_ascii=False)
+    
+    # ==================== GERAÇÃO DE QUESTÕES ====================
+    
+    def _prompts_questoes(self, disciplina: str, topico: str, num_questoes: int) -> Tuple[str, str]:
+        """Retorna (system_prompt, user_prompt) para gerar_questoes()"""
+        system_prompt = (
+            "Você é um professor especialista. Sua tarefa é criar questões de múltipla escolha "
+            "educacionais e didáticas. SEMPRE responda APENAS com um JSON válido, sem texto adicional."
+        )
+        
+        # O schema enviado em 'format' garante a estrutura; o exemplo orienta o conteúdo
+        user_prompt = (
+            f"Crie EXATAMENTE {num_questoes} questões de múltipla escolha sobre '{topico}' na disciplina '{disciplina}'. "
+            f"Cada questão é diferente das outras e tem 4 opções, sem letras no início do texto. "
+            f"\n\nResponda com um objeto JSON cuja chave \"questoes\" contém a lista com as {num_questoes} questões. "
+            f"Exemplo do formato:\n{self._exemplo_questoes(topico, num_questoes)}"
+        )
+        
+        return system_prompt, user_prompt
+    
+    def _prompt_incremental(self, disciplina: str, topico: str, questoes_restantes: int) -> str:
+        """Prompt para completar as questões que faltaram na primeira resposta"""
+        return (
+            f"Crie EXATAMENTE {questoes_restantes} questões de múltipla escolha sobre '{topico}' na disciplina '{disciplina}', "
+            f"diferentes das anteriores. Responda com um objeto JSON cuja chave \"questoes\" contém a lista. "
+            f"Exemplo do formato:\n{self._exemplo_questoes(topico, 1)}"
+        )
+    
+    def _remover_repetidas(self, questoes: List[Dict]) -> List[Dict]:
+        """Remove perguntas idênticas, mantendo a ordem"""
+        questoes_unicas = []
+        perguntas_vistas = set()
+        for q in questoes:
+            pergunta_hash = hash(q.get('pergunta', ''))
+            if pergunta_hash not in perguntas_vistas:
+                perguntas_vistas.add(pergunta_hash)
+                questoes_unicas.append(q)
+        return questoes_unicas
+    
+    def _finalizar_questoes(self, questoes: List[Dict], num_questoes: int) -> List[Dict]:
+        """Remove duplicatas mantendo a ordem e corta no número pedido"""
+        questoes_unicas = self._remover_repetidas(questoes)
+        
+        if len(questoes_unicas) == 0:
+            raise ValueError("Nenhuma questão válida foi gerada após múltiplas tentativas. Tente novamente.")
+        
+        # Retorna as questões formatadas
+        return questoes_unicas[:num_questoes]
+    
+    # ==================== ANÁLISE DE RESPOSTAS ====================
+    
+    def _corrigir(self, questoes: List[Dict], respostas_aluno: List[str]) -> Tuple[int, List[Dict], float]:
+        """Calcula localmente acertos, questões erradas e nota (0-100)"""
+        acertos = 0
+        questoes_erradas = []
+        
+        for i, (questao, resposta) in enumerate(zip(questoes, respostas_aluno)):
+            if resposta.upper() == questao['correta'].upper():
+                acertos += 1
+            else:
+                questoes_erradas.append({
+                    'indice': i + 1,
+                    'pergunta': questao['pergunta'],
+                    'resposta_errada': resposta,
+                    'resposta_correta': questao['correta']
+                })
+        
+        nota = (acertos / len(questoes)) * 100
+        return acertos, questoes_erradas, nota
+    
+    def corrigir_respostas(self, questoes: List[Dict], respostas_aluno: List[str], topico: str) -> Dict:
+        """
+        Corrige as respostas localmente, sem chamar o modelo
+        
+        A análise devolvida tem o mesmo formato de analisar_respostas(), com os
+        comentários básicos e 'status_analise' = 'pendente'. Os comentários da IA
+        são preenchidos depois, em segundo plano (ver tasks.analisar_resultado).
+        
+        Args:
+            questoes: Lista de questões do questionário
+            respostas_aluno: Lista com as respostas do aluno (ex: ['A', 'B', 'C'])
+            topico: Tópico do questionário
+        
+        Returns:
+            Dicionário com nota, acertos, erros, questões erradas e análise básica
+        """
+        acertos, questoes_erradas, nota = self._corrigir(questoes, respostas_aluno)
+        analise_basica = self._analise_basica(topico, nota, acertos, len(questoes), questoes_erradas)
+        
+        analise = self._montar_analise(topico, nota, acertos, questoes_erradas, analise_basica)
+        analise['status_analise'] = 'pendente'
+        return analise
+    
+    def chave_analise(self, id_questionario, questoes: List[Dict], respostas_aluno: List[str]) -> str:
+        """
+        Chave do cache de análises: (questionário, modelo da tarefa, questões erradas e alternativas escolhidas)
+        
+        Alunos com o mesmo padrão de erros no mesmo questionário recebem a mesma chave.
+        
+        Args:
+            id_questionario: ID do questionário (se None, usa o conteúdo das questões)
+            questoes: Lista de questões do questionário
+            respostas_aluno: Lista com as respostas do aluno
+        
+        Returns:
+            Hash hexadecimal identificando o padrão
+        """
+        _, questoes_erradas, _ = self._corrigir(questoes, respostas_aluno)
+        padrao = sorted((q['indice'], q['resposta_errada'].upper()) for q in questoes_erradas)
+        if id_questionario is None:
+            id_questionario = json.dumps(questoes, ensure_ascii=False, sort_keys=True)
+        chave = json.dumps(
+            [id_questionario, len(questoes), self.modelo_para(TAREFA_ANALISE), padrao], ensure_ascii=False
+        )
+        return hashlib.sha256(chave.encode('utf-8')).hexdigest()
+    
+    def _renderizar_comentarios(self, analise_ia: Dict, nome_aluno: str) -> Dict:
+        """Substitui o marcador do aluno pelo nome real nos textos da análise"""
+        return {
+            campo: valor.replace(MARCADOR_ALUNO, nome_aluno) if isinstance(valor, str) else valor
+            for campo, valor in analise_ia.items()
+        }
+    
+    def _prompts_analise(self, disciplina: str, topico: str, nota: float,
+                         acertos: int, total: int, questoes_erradas: List[Dict]) -> Tuple[str, str]:
+        """Retorna (system_prompt, user_prompt) para analisar_respostas(), sem o nome do aluno"""
+        system_prompt = (
+            "Você é um professor especialista em análise pedagógica. "
+            "Analise o desempenho do aluno e forneça insights educacionais. "
+            "SEMPRE responda APENAS com um JSON válido, sem texto adicional."
+        )
+        
+        questoes_erradas_str = "\n".join([
+            f"Q{i+1}: {q['pergunta']} (Resposta do aluno: {q['resposta_errada']}, Correta: {q['resposta_correta']})"
+            for i, q in enumerate(questoes_erradas)
+        ])
+        
+        user_prompt = (
+            f"Analise o desempenho de um aluno em um questionário sobre '{topico}' "
+            f"na disciplina de '{disciplina}'. "
+            f"Sempre que precisar citar o nome do aluno, escreva exatamente {MARCADOR_ALUNO}. "
+            f"Nota: {nota:.1f}% ({acertos}/{total} acertos). "
+            f"Questões erradas:\n{questoes_erradas_str if questoes_erradas else 'Nenhuma'}\n\n"
+            f"Responda com um objeto JSON com os campos: "
+            f"\"nivel_dominio\" (um de \"Iniciante\", \"Básico\", \"Intermediário\", \"Avançado\"), "
+            f"\"topicos_dificuldade\" (lista de tópicos), "
+            f"\"recomendacoes\" (texto com recomendações pedagógicas) e "
+            f"\"pontos_fortes\" (texto sobre pontos fortes do aluno). "
+            f"Não escreva introduções ou explicações. Apenas o JSON."
+        )
+        
+        return system_prompt, user_prompt
+    
+    def _analise_basica(self, topico: str, nota: float, acertos: int, total: int,
+                        questoes_erradas: List[Dict]) -> Dict:
+        """Análise sem IA, usada quando o modelo falha"""
+        return {
+            'nivel_dominio': 'Básico' if nota < 70 else 'Intermediário' if nota < 90 else 'Avançado',
+            'topicos_dificuldade': [topico] if questoes_erradas else [],
+            'recomendacoes': f"Focar em revisão do tópico '{topico}'" if questoes_erradas else "Bom desempenho!",
+            'pontos_fortes': f"Acertou {acertos} de {total} questões."
+        }
+    
+    def _montar_analise(self, topico: str, nota: float, acertos: int,
+                        questoes_erradas: List[Dict], analise_ia: Dict) -> Dict:
+        """Combina a correção local com os comentários da IA no formato de analisar_respostas()"""
+        return {
+            'nota': round(nota, 1),
+            'acertos': acertos,
+            'erros': len(questoes_erradas),
+            'questoes_erradas': questoes_erradas,
+            'nivel_dominio': analise_ia.get('nivel_dominio', 'Básico'),
+            'topicos_dificuldade': analise_ia.get('topicos_dificuldade', [topico] if questoes_erradas else []),
+            'recomendacoes': analise_ia.get('recomendacoes', ''),
+            'pontos_fortes': analise_ia.get('pontos_fortes', '')
+        }
+    
+    # ==================== REFORÇO ====================
+    
+    def _prompts_reforco(self, topicos_dificuldade: List[str], disciplina: str,
+                         num_questoes: int) -> Tuple[str, str]:
+        """Retorna (system_prompt, user_prompt) para gerar_reforco()"""
+        topicos_str = ", ".join(topicos_dificuldade)
+        
+        system_prompt = (
+            "Você é um professor especialista em reforço escolar. "
+            "Crie questões de reforço focadas em ajudar o aluno a superar dificuldades específicas. "
+            "SEMPRE responda APENAS com um JSON válido, sem texto adicional."
+        )
+        
+        user_prompt = (
+            f"O aluno teve dificuldades nos seguintes tópicos: {topicos_str} na disciplina de '{disciplina}'. "
+            f"Gere {num_questoes} questões de reforço focadas EXCLUSIVAMENTE nestes tópicos. "
+            f"As questões devem ser mais didáticas e explicativas, ajudando o aluno a compreender melhor. "
+            f"Responda com um objeto JSON cuja chave \"questoes\" contém a lista de questões, "
+            f"cada uma com 4 opções sem letras no início do texto. "
+            f"Exemplo do formato:\n{self._exemplo_questoes(topicos_dificuldade[0] if topicos_dificuldade else disciplina, 1)}"
+        )
+        
+        return system_prompt, user_prompt
+
+
+class OllamaClient(_OllamaBase):
+    """Cliente síncrono (bloqueante), usado pela interface Streamlit"""
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3",
+                 cache_analises=None, modelos: Optional[Dict[str, str]] = None,
+                 modelo_reserva: Optional[str] = None,
+                 indice_questoes: Optional[IndiceVetorial] = None,
+                 modelo_embeddings: str = MODELO_EMBEDDINGS, telemetria=None,
+                 hosts: Optional[List[str]] = None):
         """
         Inicializa o cliente Ollama
         
         Args:
             base_url: URL base da API do Ollama (padrão: http://localhost:11434)
-            model: Nome do modelo a ser usado (padrão: llama3)
+            model: Nome do modelo padrão (padrão: llama3)
+            modelos: Modelo por tarefa (TAREFA_*); tarefas ausentes usam o modelo padrão
+            modelo_reserva: Modelo menor usado quando o da tarefa estoura o timeout
+            cache_analises: Objeto com obter_analise_cache(chave) e
+                            salvar_analise_cache(chave, analise, id_questionario, modelo),
+                            como o Database. Se informado, alunos com o mesmo padrão de
+                            erros reaproveitam a mesma análise da IA.
+            indice_questoes: Índice com os embeddings das questões já salvas. Se
+                             informado, gerar_questoes() descarta paráfrases (dentro
+                             do questionário e em relação aos existentes), e não
+                             apenas perguntas idênticas.
+            modelo_embeddings: Modelo usado em /api/embed
+            telemetria: Objeto com registrar_metrica(chamada), como o Database, que
+                        recebe a latência, os tokens e o desfecho de cada chamada
+            hosts: Vários servidores Ollama (ex.: hosts_configurados()), no lugar de
+                   base_url: cada requisição vai para o menos ocupado que tem o modelo
         """
-        self.base_url = base_url
-        self.model = model
-        self.api_url = f"{base_url}/api/generate"
+        super().__init__(base_url, model, modelos, modelo_reserva, telemetria, hosts,
+                         indice_questoes, modelo_embeddings)
+        # Conexões HTTP reaproveitadas (keep-alive) por todas as threads que usam o cliente
+        self._http = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(
+            pool_connections=len(self.pool.hosts), pool_maxsize=max(10, 2 * self.pool.capacidade())
+        )
+        self._http.mount('http://', adaptador)
+        self._http.mount('https://', adaptador)
+        self.cache_analises = cache_analises
     
-    def _make_request(self, prompt: str, system: Optional[str] = None) -> str:
+    def iniciar_aquecimento(self):
         """
-        Faz uma requisição à API do Ollama
-        
-        Args:
-            prompt: Prompt para enviar ao modelo
-            system: Prompt do sistema (opcional)
+        Carrega os modelos das tarefas em segundo plano na partida e os mantém carregados
+        (verificações periódicas compartilhadas por todos os clientes do processo)
+        """
+        for host in self.pool.hosts:
+            for modelo in sorted(set(self.modelos.values())):
+                obter_aquecedor(host.base_url, modelo).iniciar()
+    
+    def estado_prontidao(self) -> Dict:
+        """
+        Prontidão dos modelos das tarefas para a interface (o pior estado entre eles).
+        Com vários servidores, vale o melhor estado de cada modelo entre os servidores.
         
         Returns:
-            Resposta do modelo como string
+            Dicionário com 'estado' (PRONTIDAO_*), 'mensagem', 'verificado_em'
+            e 'duracao_carga' (segundos da última carga, se houve)
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "format": "json"  # Força resposta em JSON
-        }
+        gravidade = [PRONTIDAO_PRONTO, PRONTIDAO_DESCONHECIDA, PRONTIDAO_CARREGANDO,
+                     PRONTIDAO_MODELO_AUSENTE, PRONTIDAO_INDISPONIVEL]
+        estados = []
+        for modelo in sorted(set(self.modelos.values())):
+            por_host = [obter_aquecedor(host.base_url, modelo).estado() for host in self.pool.hosts]
+            melhor = min(por_host, key=lambda e: gravidade.index(e['estado']))
+            if len(por_host) > 1:
+                prontos = sum(1 for e in por_host if e['estado'] == PRONTIDAO_PRONTO)
+                melhor = dict(melhor, mensagem=f"{melhor['mensagem']} ({prontos} de {len(por_host)} servidores)")
+            estados.append(melhor)
+        return max(estados, key=lambda e: gravidade.index(e['estado']))
+    
+    def _enviar(self, url: str, payload: Dict, timeout: float) -> Tuple[Dict, float]:
+        """
+        Envia uma requisição pelo pool de conexões do requests
         
-        if system:
-            payload["system"] = system
+        Returns:
+            (resposta JSON, duração em segundos)
         
+        Raises:
+            ConnectionError, TimeoutError ou _RespostaHTTPError, como esperado pelos roteiros
+        """
         try:
-            response = requests.post(self.api_url, json=payload, timeout=300)
+            inicio = time.monotonic()
+            response = self._http.post(url, json=payload, timeout=timeout)
+            duracao = time.monotonic() - inicio
             response.raise_for_status()
-            return response.json().get("response", "")
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError(
-                f"Erro: Não foi possível conectar ao Ollama em {self.base_url}. "
-                "Certifique-se de que o Ollama está rodando."
-            )
-        except requests.exceptions.Timeout:
-            raise TimeoutError("Erro: Timeout ao comunicar com o Ollama.")
-        except Exception as e:
-            raise Exception(f"Erro ao comunicar com Ollama: {str(e)}")
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            # Sem conexão ou conexão cortada no meio da resposta (ex.: Ollama reiniciado)
+            raise ConnectionError(str(e)) from e
+        except requests.exceptions.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        except requests.exceptions.HTTPError as e:
+            raise _RespostaHTTPError(e.response, str(e)) from e
+        return response.json(), duracao
     
-    def _extract_json(self, text: str):
+    def _conduzir(self, roteiro):
         """
-        Extrai JSON da resposta do modelo, mesmo se houver texto adicional
+        Executa um roteiro de _OllamaBase (_roteiro_geracao, _roteiro_embeddings,
+        _roteiro_questoes): cada passo (método, argumentos) é chamado neste cliente e
+        o resultado, ou a exceção, volta ao roteiro
+        
+        Returns:
+            O valor retornado pelo roteiro
+        """
+        try:
+            passo = next(roteiro)
+            while True:
+                metodo, argumentos = passo
+                try:
+                    resultado = getattr(self, metodo)(*argumentos)
+                except Exception as e:
+                    passo = roteiro.throw(e)
+                else:
+                    passo = roteiro.send(resultado)
+        except StopIteration as fim:
+            return fim.value
+        finally:
+            roteiro.close()
+    
+    def _make_request(self, prompt: str, system: Optional[str] = None,
+                      prioridade: int = PRIORIDADE_INTERATIVA, schema: Optional[Dict] = None,
+                      tarefa: str = TAREFA_GERACAO, tentativa: int = 0) -> Tuple[str, Dict]:
+        """
+        Faz uma requisição à API do Ollama, passando pelo escalonador do processo
+        (escolha de modelo e servidor e timeouts em _roteiro_geracao())
         
         Args:
-            text: Texto da resposta do modelo
+            prompt: Prompt para enviar ao modelo
+            system: Prompt do sistema (opcional)
+            prioridade: Classe de prioridade da requisição (PRIORIDADE_*)
+            schema: JSON Schema da resposta (opcional; sem ele, apenas força JSON)
+            tarefa: Tarefa (TAREFA_*), que define o modelo usado
+            tentativa: Número da tentativa (0 = primeira), registrado na telemetria
         
         Returns:
-            Dicionário ou Lista Python com os dados JSON
+            (resposta do modelo como string, registro da chamada com o 'modelo' que respondeu)
+        """
+        # Com todos os servidores fora do ar, falha antes de entrar na fila
+        self.pool.verificar()
+        pedido = time.monotonic()
+        with obter_scheduler().slot(prioridade):
+            return self._conduzir(self._roteiro_geracao(
+                prompt, system, schema, tarefa, tentativa, espera_fila=time.monotonic() - pedido
+            ))
+    
+    def embeddings(self, textos: List[str], prioridade: int = PRIORIDADE_PROFESSOR) -> List[List[float]]:
         """
-        # Tenta encontrar JSON no texto
-        text = text.strip()
+        Calcula os embeddings dos textos com /api/embed (em uma única requisição)
         
-        # Remove markdown code blocks se existirem
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
+        Os vetores mais recentes ficam em cache, de modo que as perguntas avaliadas
+        na geração não são recalculadas ao indexar o questionário salvo.
         
-        # Tenta encontrar JSON array primeiro (lista começa com [)
-        if text.startswith('['):
-            end_idx = text.rfind(']')
-            if end_idx != -1:
-                json_str = text[:end_idx + 1]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass
+        Args:
+            textos: Textos a converter
+            prioridade: Classe de prioridade no escalonador
+        
+        Returns:
+            Um vetor por texto, na mesma ordem
+        """
+        encontrados, faltantes = self._embeddings_em_cache(textos)
+        if faltantes:
+            self.pool.verificar()
+            pedido = time.monotonic()
+            with obter_scheduler().slot(prioridade):
+                vetores = self._conduzir(self._roteiro_embeddings(
+                    faltantes, espera_fila=time.monotonic() - pedido
+                ))
+            self._guardar_embeddings(encontrados, faltantes, vetores)
         
-        # Tenta encontrar JSON object (começa com {)
-        start_idx = text.find('{')
-        end_idx = text.rfind('}')
+        return [encontrados[t] for t in textos]
+    
+    def _deduplicar(self, questoes: List[Dict], prioridade: int = PRIORIDADE_PROFESSOR) -> List[Dict]:
+        """
+        Remove perguntas idênticas e, havendo índice de questões, também as quase
+        iguais (similaridade >= LIMIAR_DUPLICATA) entre si ou a questões já salvas.
+        Se os embeddings não estiverem disponíveis, fica apenas com a remoção de idênticas.
+        """
+        questoes = self._remover_repetidas(questoes)
+        if self.indice_questoes is None or not questoes:
+            return questoes
         
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            json_str = text[start_idx:end_idx + 1]
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
-        
-        # Tenta encontrar JSON array em qualquer lugar do texto
-        start_idx = text.find('[')
-        end_idx = text.rfind(']')
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            json_str = text[start_idx:end_idx + 1]
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
+        try:
+            vetores = self.embeddings([q['pergunta'] for q in questoes], prioridade)
+        except FilaCheiaError:
+            raise
+        except Exception:
+            return questoes
+        
+        return self._filtrar_parafrases(questoes, vetores)
+    
+    def questoes_similares(self, pergunta: str, k: int = 3, limiar: float = LIMIAR_SEMELHANTE,
+                           excluir_questionario: Optional[int] = None) -> List[Dict]:
+        """
+        Sugere questões já salvas semelhantes a uma pergunta
+        
+        Args:
+            pergunta: Texto da pergunta
+            k: Número máximo de sugestões
+            limiar: Similaridade mínima (cosseno)
+            excluir_questionario: ID de questionário a ignorar (ex.: o próprio)
+        
+        Returns:
+            Lista de {'id_questionario', 'indice', 'similaridade'}, da mais para a menos
+            semelhante (vazia se não houver índice ou embeddings disponíveis)
+        """
+        if self.indice_questoes is None or len(self.indice_questoes) == 0:
+            return []
         
-        # Se não encontrou JSON válido, tenta parsear o texto inteiro
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            raise ValueError(f"Não foi possível extrair JSON válido da resposta: {text[:500]}")
+            vetor = self.embeddings([pergunta])[0]
+        except Exception:
+            return []
+        
+        similares = []
+        for (id_questionario, indice), similaridade in self.indice_questoes.buscar(vetor, k + 10, limiar):
+            if id_questionario == excluir_questionario:
+                continue
+            similares.append({
+                'id_questionario': id_questionario,
+                'indice': indice,
+                'similaridade': similaridade
+            })
+        return similares[:k]
     
-    def gerar_questoes(self, disciplina: str, topico: str, num_questoes: int = 5) -> List[Dict]:
+    def gerar_questoes(self, disciplina: str, topico: str, num_questoes: int = 5,
+                       prioridade: int = PRIORIDADE_PROFESSOR,
+                       progresso: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
         """
         Gera questões de múltipla escolha sobre um tópico
         
@@ -118,6 +1999,9 @@ class OllamaClient:
             disciplina: Nome da disciplina (ex: "Inglês")
             topico: Tópico específico (ex: "Verbo To Be")
             num_questoes: Número de questões a gerar (padrão: 5)
+            prioridade: Classe de prioridade no escalonador (padrão: professor)
+            progresso: Chamada com as questões já aceitas a cada resposta do modelo
+                       (ex.: para mostrar questões parciais); não deve lançar exceções
         
         Returns:
             Lista de dicionários com as questões no formato:
@@ -127,224 +2011,33 @@ class OllamaClient:
                 'correta': 'A'
             }]
         """
-        system_prompt = (
-            "Você é um professor especialista. Sua tarefa é criar questões de múltipla escolha "
-            "educacionais e didáticas. SEMPRE responda APENAS com um JSON válido, sem texto adicional. "
-            "CRÍTICO: Você DEVE retornar uma LISTA/ARRAY JSON, nunca um objeto único."
-        )
-        
-        # Cria exemplo completo para o modelo entender melhor
-        exemplo_questoes = ", ".join([
-            f"{{'pergunta': 'Questão {i+1} sobre {topico}', 'opcoes': ['A) Opção A da questão {i+1}', 'B) Opção B da questão {i+1}', 'C) Opção C da questão {i+1}', 'D) Opção D da questão {i+1}'], 'correta': '{chr(65+i)}'}}"
-            for i in range(min(3, num_questoes))
-        ])
+        return self._conduzir(self._roteiro_questoes(disciplina, topico, num_questoes, prioridade, progresso))
+    
+    def _comentar(self, disciplina: str, topico: str, nota: float, acertos: int,
+                  total: int, questoes_erradas: List[Dict],
+                  prioridade: int = PRIORIDADE_INTERATIVA) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Pede ao modelo os comentários da análise (com o marcador do aluno)
         
-        # Prompt mais direto e enfático
-        user_prompt = (
-            f"Você DEVE criar EXATAMENTE {num_questoes} questões de múltipla escolha sobre '{topico}' na disciplina '{disciplina}'. "
-            f"\n\nCRÍTICO: Retorne UM ARRAY JSON com {num_questoes} questões. NÃO retorne apenas 1 questão. "
-            f"\n\nFormato obrigatório (comece com [ e termine com ]):\n"
-            f"[\n"
-            f"  {{'pergunta': 'Primeira pergunta sobre {topico}', 'opcoes': ['A) Opção A', 'B) Opção B', 'C) Opção C', 'D) Opção D'], 'correta': 'A'}},\n"
-            f"  {{'pergunta': 'Segunda pergunta sobre {topico}', 'opcoes': ['A) Opção A', 'B) Opção B', 'C) Opção C', 'D) Opção D'], 'correta': 'B'}},\n"
-            f"  {{'pergunta': 'Terceira pergunta sobre {topico}', 'opcoes': ['A) Opção A', 'B) Opção B', 'C) Opção C', 'D) Opção D'], 'correta': 'C'}}"
-            + (f",\n  ... mais {num_questoes - 3} questões" if num_questoes > 3 else "") +
-            f"\n]\n\n"
-            f"IMPORTANTE: O array deve ter {num_questoes} objetos. Cada objeto é uma questão diferente. "
-            f"NÃO retorne apenas 1 questão. Retorne {num_questoes} questões no array."
+        Returns:
+            (comentários, modelo que respondeu), ou (None, None) se falhar
+        """
+        system_prompt, user_prompt = self._prompts_analise(
+            disciplina, topico, nota, acertos, total, questoes_erradas
         )
         
-        # Tenta gerar questões (com retry e geração incremental se necessário)
-        max_tentativas = 3
-        questoes_formatadas_final = []
-        
-        for tentativa in range(max_tentativas):
-            try:
-                response = self._make_request(user_prompt, system_prompt)
-                data = self._extract_json(response)
-                
-                # Garante que é uma lista - trata diferentes formatos de resposta
-                questoes = None
-                if isinstance(data, list):
-                    questoes = data
-                elif isinstance(data, dict):
-                    # Tenta diferentes chaves possíveis
-                    if 'questoes' in data:
-                        questoes = data['questoes']
-                    elif 'questions' in data:
-                        questoes = data['questions']
-                    elif len(data) == 1 and isinstance(list(data.values())[0], list):
-                        # Se o dict tem apenas uma chave e o valor é uma lista
-                        questoes = list(data.values())[0]
-                    elif any(key.startswith('questao') for key in data.keys()):
-                        # Formato com chaves questao1, questao2, etc. - ordena numericamente
-                        questoes_numeradas = []
-                        chaves_ordenadas = sorted(
-                            [k for k in data.keys() if k.startswith('questao')],
-                            key=lambda x: int(''.join(filter(str.isdigit, x)) or 999)
-                        )
-                        for key in chaves_ordenadas:
-                            questoes_numeradas.append(data[key])
-                        questoes = questoes_numeradas
-                    elif any(key.startswith('q') and len(key) > 1 and key[1:].isdigit() for key in data.keys()):
-                        # Formato com chaves q1, q2, q3, etc.
-                        questoes_numeradas = []
-                        chaves_ordenadas = sorted(
-                            [k for k in data.keys() if k.startswith('q') and len(k) > 1 and k[1:].isdigit()],
-                            key=lambda x: int(x[1:]) if x[1:].isdigit() else 999
-                        )
-                        for key in chaves_ordenadas:
-                            questoes_numeradas.append(data[key])
-                        questoes = questoes_numeradas
-                    elif all(isinstance(v, dict) for v in data.values()):
-                        # Se todos os valores são dicionários (questões), converte para lista
-                        questoes = list(data.values())
-                    else:
-                        # Se o dict tem estrutura de questão única, tenta converter
-                        if 'pergunta' in data or 'question' in data:
-                            questoes = [data]
-                        else:
-                            if tentativa < max_tentativas - 1:
-                                continue  # Tenta novamente
-                            raise ValueError(f"Formato de resposta inesperado: dict com chaves {list(data.keys())[:10]}")
-                else:
-                    if tentativa < max_tentativas - 1:
-                        continue  # Tenta novamente
-                    raise ValueError(f"Formato de resposta inesperado: {type(data)}")
-                
-                if not questoes or not isinstance(questoes, list):
-                    if tentativa < max_tentativas - 1:
-                        continue  # Tenta novamente
-                    raise ValueError(f"Não foi possível extrair lista de questões")
-                
-                # Valida e formata as questões
-                questoes_formatadas = []
-                for i, q in enumerate(questoes):
-                    if not isinstance(q, dict):
-                        continue
-                    
-                    pergunta = q.get('pergunta', '') or q.get('question', '') or q.get('texto', '')
-                    opcoes = q.get('opcoes', []) or q.get('options', []) or q.get('alternativas', [])
-                    correta = q.get('correta', '').upper() or q.get('correct', '').upper() or q.get('resposta_correta', '').upper()
-                    
-                    # Validação básica
-                    if not pergunta:
-                        continue
-                    
-                    # Normaliza opções - remove prefixos A), B), etc. se existirem
-                    opcoes_normalizadas = []
-                    for opcao in opcoes:
-                        if isinstance(opcao, str):
-                            opcao_limpa = opcao.strip()
-                            if len(opcao_limpa) > 2 and opcao_limpa[1] in [')', '.', ':']:
-                                opcao_limpa = opcao_limpa[2:].strip()
-                            opcoes_normalizadas.append(opcao_limpa)
-                        else:
-                            opcoes_normalizadas.append(str(opcao))
-                    
-                    # Se não tem 4 opções, completa
-                    if len(opcoes_normalizadas) < 4:
-                        while len(opcoes_normalizadas) < 4:
-                            opcoes_normalizadas.append("Opção não disponível")
-                    elif len(opcoes_normalizadas) > 4:
-                        opcoes_normalizadas = opcoes_normalizadas[:4]
-                    
-                    # Normaliza resposta correta
-                    if not correta or correta not in ['A', 'B', 'C', 'D']:
-                        correta = 'A'
-                    
-                    questoes_formatadas.append({
-                        'pergunta': pergunta,
-                        'opcoes': opcoes_normalizadas,
-                        'correta': correta
-                    })
-                
-                # Se gerou questões válidas, adiciona à lista final
-                if len(questoes_formatadas) > 0:
-                    questoes_formatadas_final.extend(questoes_formatadas)
-                    
-                    # Se já tem questões suficientes, para
-                    if len(questoes_formatadas_final) >= num_questoes:
-                        break
-                    
-                    # Se gerou apenas 1 questão e precisa de mais, tenta gerar as restantes
-                    if len(questoes_formatadas) == 1 and len(questoes_formatadas_final) < num_questoes:
-                        questoes_restantes = num_questoes - len(questoes_formatadas_final)
-                        # Gera as questões restantes em uma nova requisição
-                        try:
-                            prompt_incremental = (
-                                f"Você DEVE criar EXATAMENTE {questoes_restantes} questões de múltipla escolha sobre '{topico}' na disciplina '{disciplina}'. "
-                                f"Retorne UM ARRAY JSON com {questoes_restantes} questões diferentes das anteriores. "
-                                f"Formato: [{{'pergunta': '...', 'opcoes': ['A) ...', 'B) ...', 'C) ...', 'D) ...'], 'correta': 'A'}}, ...]"
-                            )
-                            response_inc = self._make_request(prompt_incremental, system_prompt)
-                            data_inc = self._extract_json(response_inc)
-                            
-                            # Processa questões incrementais
-                            questoes_inc = None
-                            if isinstance(data_inc, list):
-                                questoes_inc = data_inc
-                            elif isinstance(data_inc, dict):
-                                if 'questoes' in data_inc or 'questions' in data_inc:
-                                    questoes_inc = data_inc.get('questoes') or data_inc.get('questions')
-                                elif all(isinstance(v, dict) for v in data_inc.values()):
-                                    questoes_inc = list(data_inc.values())
-                            
-                            if questoes_inc and isinstance(questoes_inc, list):
-                                # Formata questões incrementais
-                                for q in questoes_inc:
-                                    if isinstance(q, dict):
-                                        pergunta = q.get('pergunta', '') or q.get('question', '')
-                                        opcoes = q.get('opcoes', []) or q.get('options', [])
-                                        correta = q.get('correta', 'A').upper()
-                                        
-                                        if pergunta:
-                                            opcoes_norm = []
-                                            for op in opcoes[:4]:
-                                                if isinstance(op, str):
-                                                    op_limpa = op.strip()
-                                                    if len(op_limpa) > 2 and op_limpa[1] in [')', '.', ':']:
-                                                        op_limpa = op_limpa[2:].strip()
-                                                    opcoes_norm.append(op_limpa)
-                                                else:
-                                                    opcoes_norm.append(str(op))
-                                            
-                                            while len(opcoes_norm) < 4:
-                                                opcoes_norm.append("Opção não disponível")
-                                            
-                                            questoes_formatadas_final.append({
-                                                'pergunta': pergunta,
-                                                'opcoes': opcoes_norm[:4],
-                                                'correta': correta if correta in ['A', 'B', 'C', 'D'] else 'A'
-                                            })
-                                            
-                                            if len(questoes_formatadas_final) >= num_questoes:
-                                                break
-                        except:
-                            pass  # Se falhar, continua com o que tem
-                        
-            except Exception as e:
-                if tentativa < max_tentativas - 1:
-                    continue  # Tenta novamente
-                raise  # Re-raise na última tentativa
-        
-        # Remove duplicatas mantendo ordem
-        questoes_unicas = []
-        perguntas_vistas = set()
-        for q in questoes_formatadas_final:
-            pergunta_hash = hash(q.get('pergunta', ''))
-            if pergunta_hash not in perguntas_vistas:
-                perguntas_vistas.add(pergunta_hash)
-                questoes_unicas.append(q)
-        
-        if len(questoes_unicas) == 0:
-            raise ValueError("Nenhuma questão válida foi gerada após múltiplas tentativas. Tente novamente.")
+        try:
+            response, chamada = self._make_request(user_prompt, system_prompt, prioridade, SCHEMA_ANALISE, TAREFA_ANALISE)
+            analise_ia, valido = self._interpretar(response, SCHEMA_ANALISE, chamada)
+        except Exception:
+            return None, None
         
-        # Retorna as questões formatadas
-        return questoes_unicas[:num_questoes]
+        return (analise_ia, chamada['modelo']) if valido else (None, None)
     
-    def analisar_respostas(self, questoes: List[Dict], respostas_aluno: List[str], 
-                          nome_aluno: str, disciplina: str, topico: str) -> Dict:
+    def analisar_respostas(self, questoes: List[Dict], respostas_aluno: List[str],
+                          nome_aluno: str, disciplina: str, topico: str,
+                          id_questionario: Optional[int] = None,
+                          prioridade: int = PRIORIDADE_INTERATIVA) -> Dict:
         """
         Analisa as respostas do aluno e identifica dificuldades
         
@@ -354,6 +2047,8 @@ class OllamaClient:
             nome_aluno: Nome do aluno
             disciplina: Disciplina do questionário
             topico: Tópico do questionário
+            id_questionario: ID do questionário, usado na chave do cache de análises
+            prioridade: Classe de prioridade no escalonador (padrão: interativa)
         
         Returns:
             Dicionário com análise contendo:
@@ -367,71 +2062,31 @@ class OllamaClient:
             }
         """
         # Calcula nota básica
-        acertos = 0
-        questoes_erradas = []
-        
-        for i, (questao, resposta) in enumerate(zip(questoes, respostas_aluno)):
-            if resposta.upper() == questao['correta'].upper():
-                acertos += 1
-            else:
-                questoes_erradas.append({
-                    'indice': i + 1,
-                    'pergunta': questao['pergunta'],
-                    'resposta_errada': resposta,
-                    'resposta_correta': questao['correta']
-                })
-        
-        nota = (acertos / len(questoes)) * 100
-        
-        # Usa IA para análise mais detalhada
-        system_prompt = (
-            "Você é um professor especialista em análise pedagógica. "
-            "Analise o desempenho do aluno e forneça insights educacionais. "
-            "SEMPRE responda APENAS com um JSON válido, sem texto adicional."
-        )
-        
-        questoes_erradas_str = "\n".join([
-            f"Q{i+1}: {q['pergunta']} (Resposta do aluno: {q['resposta_errada']}, Correta: {q['resposta_correta']})"
-            for i, q in enumerate(questoes_erradas)
-        ])
+        acertos, questoes_erradas, nota = self._corrigir(questoes, respostas_aluno)
         
-        user_prompt = (
-            f"Analise o desempenho do aluno {nome_aluno} em um questionário sobre '{topico}' "
-            f"na disciplina de '{disciplina}'. "
-            f"Nota: {nota:.1f}% ({acertos}/{len(questoes)} acertos). "
-            f"Questões erradas:\n{questoes_erradas_str if questoes_erradas else 'Nenhuma'}\n\n"
-            f"Formate a resposta EXCLUSIVAMENTE como um JSON válido com a seguinte estrutura: "
-            f"{{'nivel_dominio': 'Iniciante'|'Básico'|'Intermediário'|'Avançado', "
-            f"'topicos_dificuldade': ['tópico1', 'tópico2'], "
-            f"'recomendacoes': 'texto com recomendações pedagógicas', "
-            f"'pontos_fortes': 'texto sobre pontos fortes do aluno'}}. "
-            f"Não escreva introduções ou explicações. Apenas o JSON."
-        )
+        # Usa IA para análise mais detalhada (uma geração por padrão de erros, se houver cache)
+        if self.cache_analises is None:
+            analise_ia, _ = self._comentar(disciplina, topico, nota, acertos, len(questoes), questoes_erradas, prioridade)
+        else:
+            chave = self.chave_analise(id_questionario, questoes, respostas_aluno)
+            with _lock_analise(chave):
+                analise_ia = self.cache_analises.obter_analise_cache(chave)
+                if analise_ia is None:
+                    analise_ia, modelo = self._comentar(disciplina, topico, nota, acertos, len(questoes), questoes_erradas, prioridade)
+                    # A chave é a do modelo da tarefa: a resposta do modelo de reserva não vai
+                    # para o cache, para não ser servida no lugar da do modelo principal
+                    if analise_ia is not None and modelo == self.modelo_para(TAREFA_ANALISE):
+                        self.cache_analises.salvar_analise_cache(chave, analise_ia, id_questionario, modelo)
         
-        try:
-            response = self._make_request(user_prompt, system_prompt)
-            analise_ia = self._extract_json(response)
-        except Exception as e:
-            # Se a análise IA falhar, usa análise básica
-            analise_ia = {
-                'nivel_dominio': 'Básico' if nota < 70 else 'Intermediário' if nota < 90 else 'Avançado',
-                'topicos_dificuldade': [topico] if questoes_erradas else [],
-                'recomendacoes': f"Focar em revisão do tópico '{topico}'" if questoes_erradas else "Bom desempenho!",
-                'pontos_fortes': f"Acertou {acertos} de {len(questoes)} questões."
-            }
+        if analise_ia is None:
+            # Se a análise IA falhar, usa análise básica (não vai para o cache)
+            analise_ia = self._analise_basica(topico, nota, acertos, len(questoes), questoes_erradas)
         
-        return {
-            'nota': round(nota, 1),
-            'acertos': acertos,
-            'erros': len(questoes_erradas),
-            'questoes_erradas': questoes_erradas,
-            'nivel_dominio': analise_ia.get('nivel_dominio', 'Básico'),
-            'topicos_dificuldade': analise_ia.get('topicos_dificuldade', [topico] if questoes_erradas else []),
-            'recomendacoes': analise_ia.get('recomendacoes', ''),
-            'pontos_fortes': analise_ia.get('pontos_fortes', '')
-        }
+        analise_ia = self._renderizar_comentarios(analise_ia, nome_aluno)
+        return self._montar_analise(topico, nota, acertos, questoes_erradas, analise_ia)
     
-    def gerar_reforco(self, topicos_dificuldade: List[str], disciplina: str, num_questoes: int = 3) -> List[Dict]:
+    def gerar_reforco(self, topicos_dificuldade: List[str], disciplina: str, num_questoes: int = 3,
+                      prioridade: int = PRIORIDADE_INTERATIVA) -> List[Dict]:
         """
         Gera questões de reforço focadas nos tópicos de dificuldade
         
@@ -439,83 +2094,186 @@ class OllamaClient:
             topicos_dificuldade: Lista de tópicos onde o aluno teve dificuldade
             disciplina: Nome da disciplina
             num_questoes: Número de questões a gerar (padrão: 3)
+            prioridade: Classe de prioridade no escalonador (padrão: interativa)
         
         Returns:
             Lista de questões de reforço no mesmo formato de gerar_questoes()
         """
-        topicos_str = ", ".join(topicos_dificuldade)
+        system_prompt, user_prompt = self._prompts_reforco(topicos_dificuldade, disciplina, num_questoes)
         
-        system_prompt = (
-            "Você é um professor especialista em reforço escolar. "
-            "Crie questões de reforço focadas em ajudar o aluno a superar dificuldades específicas. "
-            "SEMPRE responda APENAS com um JSON válido, sem texto adicional."
+        schema = schema_questoes(num_questoes)
+        response, chamada = self._make_request(user_prompt, system_prompt, prioridade, schema, TAREFA_REFORCO)
+        data, _ = self._interpretar(response, schema, chamada)
+        
+        # Reforço só usa questões completas (4 opções e letra correta válida)
+        return normalizar_questoes(data, estrito=True)[:num_questoes]
+
+
+class AsyncOllamaClient(_OllamaBase):
+    """
+    Cliente assíncrono (asyncio) com a mesma interface do OllamaClient.
+    
+    Usa um único httpx.AsyncClient, de modo que todas as chamadas compartilham
+    o pool de conexões. Cada requisição é cancelada ao estourar o timeout.
+    Não passa pelo RequestScheduler (que é baseado em threads); limite a
+    concorrência com max_conexoes.
+    
+    Exemplo:
+        async with AsyncOllamaClient(model="llama3.2:3b") as cliente:
+            analises = await asyncio.gather(*[
+                cliente.analisar_respostas(questoes, r, nome, disciplina, topico)
+                for nome, r in respostas_turma
+            ])
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3",
+                 timeout: float = 300, max_conexoes: int = 10,
+                 modelos: Optional[Dict[str, str]] = None, modelo_reserva: Optional[str] = None,
+                 telemetria=None, hosts: Optional[List[str]] = None,
+                 indice_questoes: Optional[IndiceVetorial] = None,
+                 modelo_embeddings: str = MODELO_EMBEDDINGS):
+        """
+        Inicializa o cliente assíncrono
+        
+        Args:
+            base_url: URL base da API do Ollama (padrão: http://localhost:11434)
+            model: Nome do modelo padrão (padrão: llama3)
+            timeout: Tempo máximo (segundos) de cada requisição ao modelo; o timeout
+                     derivado das latências observadas é usado quando for menor
+            max_conexoes: Tamanho do pool de conexões compartilhado
+            modelos: Modelo por tarefa (TAREFA_*); tarefas ausentes usam o modelo padrão
+            modelo_reserva: Modelo menor usado quando o da tarefa estoura o timeout
+            telemetria: Objeto com registrar_metrica(chamada), como o Database (opcional)
+            hosts: Vários servidores Ollama, no lugar de base_url (ver OllamaClient)
+            indice_questoes: Índice das questões já salvas; se informado, gerar_questoes()
+                             descarta paráfrases (ver OllamaClient)
+            modelo_embeddings: Modelo usado em /api/embed
+        """
+        super().__init__(base_url, model, modelos, modelo_reserva, telemetria, hosts,
+                         indice_questoes, modelo_embeddings)
+        self.timeout = timeout
+        self._client = httpx.AsyncClient(
+            timeout=None,  # o prazo é controlado por asyncio.wait_for
+            limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes)
+        )
+    
+    async def aclose(self):
+        """Fecha o pool de conexões"""
+        await self._client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def _timeout(self, modelo: str, tamanho: int) -> float:
+        """Timeout adaptativo, limitado pelo timeout do cliente"""
+        return min(self.timeout, super()._timeout(modelo, tamanho))
+    
+    async def _enviar(self, url: str, payload: Dict, timeout: float) -> Tuple[Dict, float]:
+        """Versão assíncrona de OllamaClient._enviar(), cancelada com asyncio.wait_for"""
+        try:
+            inicio = time.monotonic()
+            response = await asyncio.wait_for(self._client.post(url, json=payload), timeout=timeout)
+            duracao = time.monotonic() - inicio
+            response.raise_for_status()
+        except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+            raise TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            # Sem conexão ou conexão cortada no meio da resposta (ex.: Ollama reiniciado)
+            raise ConnectionError(str(e)) from e
+        except httpx.HTTPStatusError as e:
+            raise _RespostaHTTPError(e.response, str(e)) from e
+        return response.json(), duracao
+    
+    async def _conduzir(self, roteiro):
+        """Versão assíncrona de OllamaClient._conduzir()"""
+        try:
+            passo = next(roteiro)
+            while True:
+                metodo, argumentos = passo
+                try:
+                    resultado = await getattr(self, metodo)(*argumentos)
+                except Exception as e:
+                    passo = roteiro.throw(e)
+                else:
+                    passo = roteiro.send(resultado)
+        except StopIteration as fim:
+            return fim.value
+        finally:
+            roteiro.close()
+    
+    async def _make_request(self, prompt: str, system: Optional[str] = None,
+                            prioridade: int = PRIORIDADE_INTERATIVA, schema: Optional[Dict] = None,
+                            tarefa: str = TAREFA_GERACAO, tentativa: int = 0) -> Tuple[str, Dict]:
+        """
+        Faz uma requisição à API do Ollama sem bloquear o event loop
+        (mesmo roteiro de OllamaClient._make_request(), sem o escalonador: a
+        prioridade é aceita pela mesma assinatura, mas não tem efeito)
+        """
+        return await self._conduzir(self._roteiro_geracao(prompt, system, schema, tarefa, tentativa))
+    
+    async def embeddings(self, textos: List[str]) -> List[List[float]]:
+        """Versão assíncrona de OllamaClient.embeddings()"""
+        encontrados, faltantes = self._embeddings_em_cache(textos)
+        if faltantes:
+            vetores = await self._conduzir(self._roteiro_embeddings(faltantes))
+            self._guardar_embeddings(encontrados, faltantes, vetores)
+        
+        return [encontrados[t] for t in textos]
+    
+    async def _deduplicar(self, questoes: List[Dict], prioridade: int = PRIORIDADE_PROFESSOR) -> List[Dict]:
+        """Versão assíncrona de OllamaClient._deduplicar()"""
+        questoes = self._remover_repetidas(questoes)
+        if self.indice_questoes is None or not questoes:
+            return questoes
+        
+        try:
+            vetores = await self.embeddings([q['pergunta'] for q in questoes])
+        except Exception:
+            return questoes
+        
+        return self._filtrar_parafrases(questoes, vetores)
+    
+    async def gerar_questoes(self, disciplina: str, topico: str, num_questoes: int = 5,
+                             progresso: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Versão assíncrona de OllamaClient.gerar_questoes()"""
+        return await self._conduzir(
+            self._roteiro_questoes(disciplina, topico, num_questoes, progresso=progresso)
         )
+    
+    async def analisar_respostas(self, questoes: List[Dict], respostas_aluno: List[str],
+                                 nome_aluno: str, disciplina: str, topico: str) -> Dict:
+        """Versão assíncrona de OllamaClient.analisar_respostas()"""
+        acertos, questoes_erradas, nota = self._corrigir(questoes, respostas_aluno)
         
-        user_prompt = (
-            f"O aluno teve dificuldades nos seguintes tópicos: {topicos_str} na disciplina de '{disciplina}'. "
-            f"Gere {num_questoes} questões de reforço focadas EXCLUSIVAMENTE nestes tópicos. "
-            f"As questões devem ser mais didáticas e explicativas, ajudando o aluno a compreender melhor. "
-            f"Formate a resposta EXCLUSIVAMENTE como um JSON válido com a seguinte estrutura: "
-            f"[{{'pergunta': 'texto da pergunta', 'opcoes': ['A) opção A', 'B) opção B', 'C) opção C', 'D) opção D'], 'correta': 'A'}}]. "
-            f"Não escreva introduções ou explicações. Apenas o JSON."
+        system_prompt, user_prompt = self._prompts_analise(
+            disciplina, topico, nota, acertos, len(questoes), questoes_erradas
         )
         
-        response = self._make_request(user_prompt, system_prompt)
-        data = self._extract_json(response)
-        
-        # Garante que é uma lista - trata diferentes formatos de resposta
-        questoes = None
-        if isinstance(data, list):
-            questoes = data
-        elif isinstance(data, dict):
-            # Tenta diferentes chaves possíveis
-            if 'questoes' in data:
-                questoes = data['questoes']
-            elif 'questions' in data:
-                questoes = data['questions']
-            elif 'questoes_reforco' in data:
-                questoes = data['questoes_reforco']
-            elif len(data) == 1 and isinstance(list(data.values())[0], list):
-                # Se o dict tem apenas uma chave e o valor é uma lista
-                questoes = list(data.values())[0]
-            elif any(key.startswith('questao') for key in data.keys()):
-                # Formato com chaves questao1, questao2, etc.
-                questoes = [data[key] for key in sorted(data.keys()) if key.startswith('questao')]
-            elif all(isinstance(v, dict) for v in data.values()):
-                # Se todos os valores são dicionários (questões), converte para lista
-                questoes = list(data.values())
-            else:
-                # Se o dict tem estrutura de questão única, tenta converter
-                if 'pergunta' in data or 'question' in data:
-                    questoes = [data]
-                else:
-                    raise ValueError(f"Formato de resposta inesperado: dict com chaves {list(data.keys())}")
-        else:
-            raise ValueError(f"Formato de resposta inesperado: {type(data)}")
+        try:
+            response, chamada = await self._make_request(
+                user_prompt, system_prompt, schema=SCHEMA_ANALISE, tarefa=TAREFA_ANALISE
+            )
+            analise_ia, valido = self._interpretar(response, SCHEMA_ANALISE, chamada)
+        except Exception:
+            analise_ia, valido = None, False
         
-        if not questoes or not isinstance(questoes, list):
-            raise ValueError(f"Não foi possível extrair lista de questões do formato: {type(data)}")
+        if not valido:
+            analise_ia = self._analise_basica(topico, nota, acertos, len(questoes), questoes_erradas)
         
-        # Valida e formata as questões
-        questoes_formatadas = []
-        for q in questoes:
-            if not isinstance(q, dict):
-                continue
-            
-            pergunta = q.get('pergunta', '')
-            opcoes = q.get('opcoes', [])
-            correta = q.get('correta', '').upper()
-            
-            if not pergunta or len(opcoes) != 4 or correta not in ['A', 'B', 'C', 'D']:
-                continue
-            
-            questoes_formatadas.append({
-                'pergunta': pergunta,
-                'opcoes': opcoes,
-                'correta': correta
-            })
+        analise_ia = self._renderizar_comentarios(analise_ia, nome_aluno)
+        return self._montar_analise(topico, nota, acertos, questoes_erradas, analise_ia)
+    
+    async def gerar_reforco(self, topicos_dificuldade: List[str], disciplina: str,
+                            num_questoes: int = 3) -> List[Dict]:
+        """Versão assíncrona de OllamaClient.gerar_reforco()"""
+        system_prompt, user_prompt = self._prompts_reforco(topicos_dificuldade, disciplina, num_questoes)
         
-        return questoes_formatadas[:num_questoes]
-
-
-
+        schema = schema_questoes(num_questoes)
+        response, chamada = await self._make_request(user_prompt, system_prompt, schema=schema, tarefa=TAREFA_REFORCO)
+        data, _ = self._interpretar(response, schema, chamada)
+        
+        # Reforço só usa questões completas (4 opções e letra correta válida)
+        return normalizar_questoes(data, estrito=True)[:num_questoes]
@@ -0,0 +1,5 @@
+"""
+Páginas do app.py, uma área por módulo (aluno, professor). O app.py importa cada
+módulo só quando o perfil correspondente é escolhido, de modo que a tela inicial
+não carrega o pandas nem o cliente de IA.
+"""
@@ -0,0 +1,543 @@
+"""
+Páginas da área do aluno: autenticação, início, responder questionário e reforço personalizado
+"""
+import streamlit as st
+
+from ollama_client import PRIORIDADE_INTERATIVA, PRIORIDADE_SEGUNDO_PLANO
+from paginas.comum import (
+    iniciar_sessao, registrar_execucao, questionarios_disponiveis, questionario_em_cache,
+    texto_com_espera
+)
+from tasks import (
+    obter_fila, analisar_resultado, gerar_reforco, enfileirar_reforco, FALHAS_TEMPORARIAS,
+    ESPERA_REAGENDAMENTO_REFORCO
+)
+
+# Intervalo (segundos) entre consultas enquanto a análise da IA de um envio está pendente
+INTERVALO_ATUALIZACAO_ANALISE = 3
+
+# Intervalo (segundos) entre consultas enquanto há reforços sendo preparados em segundo plano
+INTERVALO_ATUALIZACAO_REFORCO = 5
+
+
+def exibir_questao(i: int, questao: dict, chave: str) -> str:
+    """Enunciado, opções e escolha da resposta de uma questão; retorna a letra escolhida"""
+    st.markdown(f"### Questão {i + 1}")
+    st.markdown(f"**{questao['pergunta']}**")
+    
+    opcao_selecionada = st.radio(
+        "Selecione sua resposta:",
+        options=['A', 'B', 'C', 'D'],
+        key=chave,
+        horizontal=True
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**A)** {questao['opcoes'][0]}")
+        st.markdown(f"**B)** {questao['opcoes'][1]}")
+    with col2:
+        st.markdown(f"**C)** {questao['opcoes'][2]}")
+        st.markdown(f"**D)** {questao['opcoes'][3]}")
+    
+    st.divider()
+    return opcao_selecionada
+
+
+def painel_analise(resultado_id: int, total_questoes: int, aguardando: bool = False):
+    """Mostra nota e comentários da IA de um resultado; com aguardando=True roda como fragmento periódico"""
+    resultado = st.session_state.db.obter_resultado(resultado_id)
+    if resultado is None:
+        return
+    analise = resultado['analise']
+    pendente = analise.get('status_analise') == 'pendente'
+    
+    if aguardando and not pendente:
+        # A análise chegou: recarrega a página para parar a consulta periódica
+        st.rerun()
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Nota", f"{analise['nota']:.1f}%")
+    with col2:
+        st.metric("Acertos", f"{analise['acertos']}/{total_questoes}")
+    with col3:
+        st.metric("Nível de Domínio", "⏳ Em análise" if pendente else analise['nivel_dominio'])
+    
+    if pendente:
+        st.info(texto_com_espera(
+            "🤖 A IA está analisando suas respostas. Os comentários aparecerão aqui automaticamente.",
+            PRIORIDADE_INTERATIVA
+        ))
+    else:
+        st.markdown(f"**Pontos Fortes:** {analise['pontos_fortes']}")
+        st.markdown(f"**Recomendações:** {analise['recomendacoes']}")
+
+
+def exibir_resultado(resultado_id: int, total_questoes: int):
+    """Exibe o resultado de um envio, consultando o banco até a análise da IA terminar"""
+    resultado = st.session_state.db.obter_resultado(resultado_id)
+    if resultado is None:
+        return
+    analise = resultado['analise']
+    
+    st.subheader("📊 Resultado")
+    if analise.get('status_analise') == 'pendente':
+        st.fragment(painel_analise, run_every=INTERVALO_ATUALIZACAO_ANALISE)(
+            resultado_id, total_questoes, aguardando=True
+        )
+    else:
+        painel_analise(resultado_id, total_questoes)
+    
+    if analise['questoes_erradas']:
+        st.markdown("### ❌ Questões Erradas")
+        for q_errada in analise['questoes_erradas']:
+            with st.expander(f"Questão {q_errada['indice']}"):
+                st.markdown(f"**{q_errada['pergunta']}**")
+                st.error(f"Sua resposta: {q_errada['resposta_errada']}")
+                st.success(f"Resposta correta: {q_errada['resposta_correta']}")
+
+
+def autenticacao():
+    """Entrada do aluno pelo nome ou matrícula, com cadastro de quem ainda não existe"""
+    st.title("👨‍🎓 Área do Aluno")
+    st.markdown("### 🔐 Autenticação")
+    
+    with st.form("form_autenticacao_aluno"):
+        identificador = st.text_input(
+            "Nome ou Matrícula",
+            placeholder="Digite seu nome ou número de matrícula",
+            help="Você pode usar seu nome completo ou número de matrícula"
+        )
+        
+        submitted = st.form_submit_button("Entrar", type="primary")
+        
+        if submitted:
+            if not identificador:
+                st.error("⚠️ Por favor, informe seu nome ou matrícula.")
+            else:
+                # Tenta autenticar
+                aluno = st.session_state.db.autenticar_aluno(identificador.strip())
+                
+                if aluno:
+                    st.session_state.aluno_autenticado = aluno
+                    st.success(f"✅ Bem-vindo, {aluno['nome']}!")
+                    st.rerun()
+                else:
+                    # Aluno não encontrado - oferece cadastro
+                    st.warning("⚠️ Aluno não encontrado. Deseja se cadastrar?")
+                    
+                    with st.form("form_cadastro_aluno"):
+                        nome = st.text_input("Nome Completo", value=identificador if not identificador.isdigit() else "")
+                        matricula = st.text_input("Matrícula (opcional)", value=identificador if identificador.isdigit() else "")
+                        cadastrar = st.form_submit_button("Cadastrar", type="primary")
+                        
+                        if cadastrar:
+                            if not nome:
+                                st.error("⚠️ O nome é obrigatório.")
+                            else:
+                                try:
+                                    aluno_id = st.session_state.db.criar_aluno(nome, matricula if matricula else None)
+                                    aluno = st.session_state.db.autenticar_aluno(nome if nome else matricula)
+                                    st.session_state.aluno_autenticado = aluno
+                                    st.success(f"✅ Cadastro realizado! Bem-vindo, {aluno['nome']}!")
+                                    st.rerun()
+                                except ValueError as e:
+                                    st.error(f"❌ {str(e)}")
+    
+    st.sidebar.markdown("---")
+    if st.sidebar.button("← Voltar"):
+        st.session_state.perfil = None
+        st.rerun()
+
+
+def pagina_inicio(aluno: dict):
+    """Resumo do desempenho e histórico do aluno"""
+    st.header(f"Bem-vindo, {aluno['nome']}!")
+    
+    # Estatísticas do aluno
+    resultados_aluno = st.session_state.db.obter_resultados_aluno(
+        nome_aluno=aluno['nome'],
+        matricula=aluno['matricula']
+    )
+    
+    if resultados_aluno:
+        st.subheader("📊 Seu Desempenho")
+        col1, col2, col3 = st.columns(3)
+        
+        nota_media = sum(r['nota'] for r in resultados_aluno) / len(resultados_aluno)
+        melhor_nota = max(r['nota'] for r in resultados_aluno)
+        total_avaliacoes = len(resultados_aluno)
+        
+        with col1:
+            st.metric("Nota Média", f"{nota_media:.1f}%")
+        with col2:
+            st.metric("Melhor Nota", f"{melhor_nota:.1f}%")
+        with col3:
+            st.metric("Total de Avaliações", total_avaliacoes)
+        
+        st.divider()
+        
+        st.subheader("📋 Histórico de Avaliações")
+        dados_historico = []
+        for r in resultados_aluno:
+            dados_historico.append({
+                'Disciplina': r['disciplina'],
+                'Tópico': r['topico'],
+                'Nota': f"{r['nota']:.1f}%",
+                'Nível': r['analise']['nivel_dominio'],
+                'Data': r['data_resposta']
+            })
+        
+        # Lista de dicionários direto no st.dataframe: a página não importa o pandas
+        st.dataframe(dados_historico, use_container_width=True, hide_index=True)
+    else:
+        st.info("📝 Você ainda não respondeu nenhum questionário. Acesse 'Responder Questionário' para começar!")
+
+
+def pagina_responder_questionario(aluno: dict):
+    """Escolha, resposta e correção de um questionário"""
+    st.header("Responder Questionário")
+    
+    versao_questionarios = st.session_state.db.versao_dados('questionarios')
+    questionarios = questionarios_disponiveis(st.session_state.db, versao_questionarios)
+    
+    if not questionarios:
+        st.warning("⚠️ Nenhum questionário disponível no momento.")
+    else:
+        questionario_opcoes = {
+            f"{q['disciplina']} - {q['topico']} (ID: {q['id']})": q['id']
+            for q in questionarios
+        }
+        
+        questionario_selecionado = st.selectbox(
+            "Selecione o Questionário",
+            options=list(questionario_opcoes.keys())
+        )
+        
+        if questionario_selecionado:
+            questionario_id = questionario_opcoes[questionario_selecionado]
+            questionario = questionario_em_cache(st.session_state.db, questionario_id, versao_questionarios)
+            
+            if questionario:
+                st.info(f"**Disciplina:** {questionario['disciplina']} | **Tópico:** {questionario['topico']}")
+                st.divider()
+                
+                # Formulário de respostas: as escolhas ficam no navegador e o script
+                # só roda de novo no envio (e não a cada clique em uma opção)
+                questoes = questionario['questoes']
+                with st.form(f"form_respostas_{questionario_id}"):
+                    respostas = [
+                        exibir_questao(i, questao, f"q_{questionario_id}_{i}")
+                        for i, questao in enumerate(questoes)
+                    ]
+                    enviar = st.form_submit_button("📤 Enviar Respostas", type="primary")
+                
+                if enviar:
+                    registrar_execucao('envio_respostas')
+                    try:
+                        # A nota é calculada localmente; os comentários da IA
+                        # são preenchidos em segundo plano
+                        analise = st.session_state.ollama.corrigir_respostas(
+                            questoes=questoes,
+                            respostas_aluno=respostas,
+                            topico=questionario['topico']
+                        )
+                        
+                        # Salva resultado
+                        resultado_id = st.session_state.db.salvar_resultado(
+                            id_questionario=questionario_id,
+                            nome_aluno=aluno['nome'],
+                            respostas=respostas,
+                            nota=analise['nota'],
+                            analise=analise,
+                            matricula_aluno=aluno['matricula']
+                        )
+                        
+                        obter_fila().submit(
+                            analisar_resultado,
+                            st.session_state.db,
+                            st.session_state.ollama,
+                            resultado_id
+                        )
+                        
+                        st.session_state['resultado_enviado'] = {
+                            'id': resultado_id,
+                            'id_questionario': questionario_id
+                        }
+                        st.success("✅ Respostas salvas com sucesso!")
+                    except Exception as e:
+                        st.error(f"❌ Erro ao salvar respostas: {str(e)}")
+                
+                # Mostra resultado do último envio deste questionário
+                resultado_enviado = st.session_state.get('resultado_enviado')
+                if resultado_enviado and resultado_enviado['id_questionario'] == questionario_id:
+                    exibir_resultado(resultado_enviado['id'], len(questoes))
+
+
+def rotulo_reforco(reforco: dict) -> str:
+    """Texto de um conjunto de reforço na lista de escolha"""
+    if reforco['tentativas']:
+        situacao = f"melhor nota {reforco['melhor_nota']:.0f}% em {reforco['tentativas']} tentativa(s)"
+    else:
+        situacao = "🆕 não respondido"
+    return (f"{reforco['disciplina']} — {', '.join(reforco['topicos'])} "
+            f"({len(reforco['questoes'])} questões, {str(reforco['data_criacao'])[:10]}) · {situacao}")
+
+
+def aviso_reforcos_pendentes(aluno: dict, pendentes: int):
+    """Aviso dos reforços em preparo; roda como fragmento periódico e recarrega a página quando algum fica pronto"""
+    reforcos = st.session_state.db.listar_reforcos_aluno(nome_aluno=aluno['nome'], matricula=aluno['matricula'])
+    agora = sum(1 for r in reforcos if r['status'] == 'pendente')
+    if agora < pendentes:
+        st.rerun()
+    
+    st.info(texto_com_espera(
+        f"⏳ {agora} reforço(s) sendo preparado(s) a partir das suas últimas notas. "
+        "Eles aparecerão aqui automaticamente.",
+        PRIORIDADE_SEGUNDO_PLANO
+    ))
+
+
+def exibir_resultado_reforco(reforco: dict, tentativa: dict):
+    """Nota, acertos e questões erradas de uma tentativa de reforço"""
+    questoes = reforco['questoes']
+    
+    st.subheader("📊 Resultado do Reforço")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Nota", f"{tentativa['nota']:.1f}%")
+    with col2:
+        st.metric("Acertos", f"{tentativa['acertos']}/{len(questoes)}")
+    with col3:
+        if tentativa['nota'] >= 70:
+            st.metric("Status", "✅ Aprovado")
+        else:
+            st.metric("Status", "⚠️ Precisa estudar mais")
+    
+    questoes_erradas = [
+        (i, questao, resposta)
+        for i, (questao, resposta) in enumerate(zip(questoes, tentativa['respostas']))
+        if resposta.upper() != questao['correta'].upper()
+    ]
+    if questoes_erradas:
+        st.markdown("### ❌ Questões Erradas")
+        for i, questao, resposta in questoes_erradas:
+            with st.expander(f"Questão {i + 1}"):
+                st.markdown(f"**{questao['pergunta']}**")
+                st.error(f"Sua resposta: {resposta}")
+                st.success(f"Resposta correta: {questao['correta']}")
+    else:
+        st.success("🎉 Parabéns! Você acertou todas as questões!")
+
+
+def pagina_reforco(aluno: dict):
+    """
+    Questões de reforço nos tópicos em que o aluno teve nota abaixo de 70%
+    
+    Os conjuntos ficam salvos no banco: os preparados em segundo plano após cada nota
+    baixa (tasks.agendar_reforco) e os gerados aqui; cada resposta é salva como tentativa.
+    """
+    st.header("🎯 Meu Reforço Personalizado")
+    db = st.session_state.db
+    
+    resultados_aluno = db.obter_resultados_aluno(
+        nome_aluno=aluno['nome'],
+        matricula=aluno['matricula']
+    )
+    reforcos = db.listar_reforcos_aluno(nome_aluno=aluno['nome'], matricula=aluno['matricula'])
+    
+    pendentes = sum(1 for r in reforcos if r['status'] == 'pendente')
+    if pendentes:
+        st.fragment(aviso_reforcos_pendentes, run_every=INTERVALO_ATUALIZACAO_REFORCO)(aluno, pendentes)
+    
+    if not resultados_aluno:
+        st.info("📝 Você ainda não possui resultados. Responda questionários para gerar reforço personalizado.")
+    else:
+        # Identifica dificuldades
+        todas_dificuldades = []
+        disciplinas_dificuldade = set()
+        
+        for r in resultados_aluno:
+            if r['nota'] < 70:  # Nota abaixo de 70%
+                topicos = r['analise'].get('topicos_dificuldade', [])
+                todas_dificuldades.extend(topicos)
+                disciplinas_dificuldade.add(r['disciplina'])
+        
+        if not todas_dificuldades:
+            st.success("✅ Parabéns! Você não possui dificuldades identificadas (todas as notas acima de 70%).")
+        else:
+            st.subheader("⚠️ Suas Dificuldades Identificadas")
+            topicos_unicos = list(set(todas_dificuldades))
+            
+            for topico in topicos_unicos:
+                st.markdown(f"- {topico}")
+            
+            st.divider()
+            
+            if disciplinas_dificuldade:
+                disciplina_reforco = st.selectbox(
+                    "Disciplina para Reforço",
+                    options=sorted(disciplinas_dificuldade)
+                )
+                
+                num_questoes_reforco = st.slider(
+                    "Número de Questões de Reforço",
+                    min_value=3,
+                    max_value=10,
+                    value=5
+                )
+                
+                if st.button("🎯 Gerar Reforço Personalizado", type="primary"):
+                    with st.spinner(texto_com_espera(
+                        "🤖 Montando o reforço (banco de questões e, se necessário, IA)... Por favor, aguarde...",
+                        PRIORIDADE_INTERATIVA
+                    )):
+                        try:
+                            # Primeiro reaproveita questões já salvas que o aluno ainda não viu;
+                            # a IA só gera as que faltarem. O conjunto fica salvo no banco.
+                            reforco_id = db.criar_reforco(
+                                nome_aluno=aluno['nome'],
+                                disciplina=disciplina_reforco,
+                                topicos=topicos_unicos,
+                                num_questoes=num_questoes_reforco,
+                                matricula_aluno=aluno['matricula']
+                            )
+                            try:
+                                reforco = gerar_reforco(
+                                    db, st.session_state.ollama, reforco_id, prioridade=PRIORIDADE_INTERATIVA
+                                )
+                            except FALHAS_TEMPORARIAS:
+                                # O conjunto continua 'pendente' e é preparado em segundo plano
+                                # quando o servidor de IA voltar a responder
+                                enfileirar_reforco(
+                                    db, st.session_state.ollama, reforco_id, atraso=ESPERA_REAGENDAMENTO_REFORCO
+                                )
+                                raise
+                            
+                            st.success(
+                                f"✅ {len(reforco['questoes'])} questões de reforço prontas "
+                                f"({reforco['do_banco']} do banco de questões, "
+                                f"{len(reforco['questoes']) - reforco['do_banco']} geradas pela IA)!"
+                            )
+                            
+                            # Seleciona o novo conjunto na lista de reforços
+                            st.session_state['reforco_selecionado'] = reforco_id
+                            st.rerun()
+                        except ConnectionError as e:
+                            st.error(f"❌ {str(e)}")
+                            st.info("💡 **Dica:** Certifique-se de que o Ollama está rodando. Execute `ollama serve` em um terminal.")
+                        except TimeoutError as e:
+                            st.error(f"❌ {str(e)}")
+                            st.warning("""
+                            **💡 Dicas para resolver:**
+                            - Tente usar um modelo menor: `ollama pull llama3.2:3b`
+                            - Tente gerar menos questões por vez
+                            - Verifique se há outros processos usando muitos recursos
+                            """)
+                        except Exception as e:
+                            st.error(f"❌ Erro ao gerar reforço: {str(e)}")
+                            st.info("💡 Verifique se o Ollama está rodando e se o modelo está instalado corretamente.")
+    
+    falhos = sum(1 for r in reforcos if r['status'] == 'falhou' and r['id_resultado'] is not None)
+    if falhos:
+        st.caption(f"⚠️ {falhos} reforço(s) não puderam ser preparados automaticamente; gere um acima.")
+    
+    # Exibe formulário de resposta do conjunto escolhido entre os reforços prontos
+    prontos = {r['id']: r for r in reforcos if r['status'] == 'pronto' and r['questoes']}
+    if prontos:
+        st.subheader("📝 Questões de Reforço")
+        if st.session_state.get('reforco_selecionado') not in prontos:
+            # Por padrão, o conjunto mais recente ainda não respondido
+            st.session_state['reforco_selecionado'] = next(
+                (r['id'] for r in prontos.values() if not r['tentativas']), next(iter(prontos))
+            )
+        reforco_id = st.selectbox(
+            "Conjunto de Reforço",
+            options=list(prontos),
+            format_func=lambda id_reforco: rotulo_reforco(prontos[id_reforco]),
+            key='reforco_selecionado'
+        )
+        reforco = prontos[reforco_id]
+        questoes_reforco = reforco['questoes']
+        
+        st.info(f"**Focadas em:** {', '.join(reforco['topicos'])}")
+        st.markdown("**Responda as questões abaixo e depois clique em 'Verificar Respostas' para ver seu desempenho.**")
+        st.divider()
+        
+        # Formulário de respostas (enviado de uma vez, como em Responder Questionário)
+        with st.form("form_reforco"):
+            respostas_reforco = [
+                exibir_questao(i, questao, f"reforco_{reforco_id}_q_{i}")
+                for i, questao in enumerate(questoes_reforco)
+            ]
+            verificar = st.form_submit_button(
+                "✅ Verificar Respostas", type="primary", use_container_width=True
+            )
+        
+        if verificar:
+            registrar_execucao('envio_reforco')
+            # Calcula e salva a tentativa
+            acertos = sum(
+                1 for questao, resposta in zip(questoes_reforco, respostas_reforco)
+                if resposta.upper() == questao['correta'].upper()
+            )
+            nota = (acertos / len(questoes_reforco)) * 100
+            db.salvar_resultado_reforco(reforco_id, respostas_reforco, nota, acertos)
+            st.rerun()
+        
+        # Exibe a última tentativa e o histórico do conjunto
+        tentativas = db.obter_resultados_reforco(reforco_id) if reforco['tentativas'] else []
+        if tentativas:
+            st.divider()
+            exibir_resultado_reforco(reforco, tentativas[0])
+            
+            if len(tentativas) > 1:
+                st.markdown("### 📈 Histórico de Tentativas")
+                st.dataframe(
+                    [
+                        {'Data': t['data_resposta'], 'Nota': f"{t['nota']:.1f}%",
+                         'Acertos': f"{t['acertos']}/{len(questoes_reforco)}"}
+                        for t in tentativas
+                    ],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+
+# Páginas do menu lateral, na ordem exibida
+PAGINAS = {
+    "🏠 Início": pagina_inicio,
+    "✍️ Responder Questionário": pagina_responder_questionario,
+    "🎯 Reforço Personalizado": pagina_reforco,
+}
+
+
+def renderizar():
+    """Área do aluno: a autenticação e, depois dela, a página escolhida no menu lateral"""
+    iniciar_sessao()
+    if st.session_state.aluno_autenticado is None:
+        autenticacao()
+        return
+    
+    aluno = st.session_state.aluno_autenticado
+    
+    st.title("👨‍🎓 Área do Aluno")
+    st.sidebar.title(f"Olá, {aluno['nome']}!")
+    if aluno['matricula']:
+        st.sidebar.markdown(f"**Matrícula:** {aluno['matricula']}")
+    
+    # Menu lateral do aluno
+    pagina_aluno = st.sidebar.radio("Menu", list(PAGINAS))
+    registrar_execucao(pagina_aluno)
+    
+    # Botão de logout
+    st.sidebar.markdown("---")
+    if st.sidebar.button("🚪 Sair"):
+        st.session_state.aluno_autenticado = None
+        st.session_state.perfil = None
+        st.rerun()
+    
+    PAGINAS[pagina_aluno](aluno)
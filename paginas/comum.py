@@ -0,0 +1,145 @@
+"""
+Recursos e componentes compartilhados pelas páginas do aluno e do professor
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+
+import streamlit as st
+
+from database import Database
+from ollama_client import (
+    obter_scheduler, definir_sessao, PRONTIDAO_PRONTO, PRONTIDAO_CARREGANDO, PRONTIDAO_MODELO_AUSENTE,
+    PRONTIDAO_INDISPONIVEL, CIRCUITO_ABERTO, CIRCUITO_SEMIABERTO
+)
+from tasks import criar_cliente, recuperar_analises_pendentes, indexar_questionarios_pendentes
+from worker import iniciar_worker_embutido
+
+logger = logging.getLogger(__name__)
+
+
+@st.cache_resource
+def recursos_compartilhados():
+    """
+    Banco de dados e cliente Ollama do processo, criados uma única vez e compartilhados
+    por todas as sessões (a criação das tabelas, o pool de conexões HTTP, o cache de
+    embeddings e as threads de segundo plano não se repetem a cada novo visitante)
+    
+    Returns:
+        (db, ollama, tempos), em que tempos traz a duração (segundos) de cada etapa da
+        inicialização: 'banco', 'cliente', 'segundo_plano' e 'total'
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+    db = Database()
+    tempos['banco'] = time.perf_counter() - inicio
+    
+    etapa = time.perf_counter()
+    # Usando modelo menor e mais rápido para evitar timeouts (PROFOCO_MODELO, padrão "llama3.2:3b");
+    # com PROFOCO_OLLAMA_HOSTS, as requisições são distribuídas entre vários servidores
+    ollama = criar_cliente(db)
+    tempos['cliente'] = time.perf_counter() - etapa
+    
+    etapa = time.perf_counter()
+    # Carrega o modelo em segundo plano e o mantém carregado,
+    # para que o tempo de carga não recaia sobre a primeira requisição de um usuário
+    ollama.iniciar_aquecimento()
+    
+    # Análises da IA que ficaram pendentes (ex.: app reiniciado) voltam para a fila
+    recuperar_analises_pendentes(db, ollama)
+    
+    # Questionários sem embeddings (ex.: criados antes do índice) são indexados em segundo plano
+    indexar_questionarios_pendentes(db, ollama)
+    
+    # Gerações de questionário rodam como jobs persistidos no banco: sobrevivem ao fechamento
+    # da aba e a reinícios do app (use PROFOCO_WORKER_EMBUTIDO=0 com python worker.py à parte)
+    iniciar_worker_embutido(db, ollama)
+    tempos['segundo_plano'] = time.perf_counter() - etapa
+    
+    tempos['total'] = time.perf_counter() - inicio
+    logger.info(
+        "Recursos do processo inicializados em %.3fs (banco %.3fs, cliente %.3fs, segundo plano %.3fs)",
+        tempos['total'], tempos['banco'], tempos['cliente'], tempos['segundo_plano']
+    )
+    return db, ollama, tempos
+
+
+@st.cache_resource
+def contador_execucoes():
+    """
+    Execuções do script (por página do aluno) e envios de respostas no processo,
+    exibidos na página Desempenho do Sistema como execuções por envio
+    
+    Returns:
+        (Counter, Lock)
+    """
+    return Counter(), threading.Lock()
+
+
+def registrar_execucao(evento: str):
+    """Soma uma ocorrência do evento (nome da página ou do envio) ao contador do processo"""
+    contador, lock = contador_execucoes()
+    with lock:
+        contador[evento] += 1
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def questionarios_disponiveis(_db: Database, versao: tuple) -> list:
+    """listar_questionarios() em cache até a próxima alteração na tabela questionarios"""
+    return _db.listar_questionarios()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def questionario_em_cache(_db: Database, questionario_id: int, versao: tuple) -> dict:
+    """obter_questionario() em cache até a próxima alteração na tabela questionarios"""
+    return _db.obter_questionario(questionario_id)
+
+
+def iniciar_sessao():
+    """Associa a sessão aos recursos do processo e a identifica no escalonador do Ollama"""
+    # Cada sessão apenas referencia os recursos do processo
+    if 'db' not in st.session_state or 'ollama' not in st.session_state:
+        st.session_state.db, st.session_state.ollama, _ = recursos_compartilhados()
+    if 'id_sessao' not in st.session_state:
+        st.session_state.id_sessao = uuid.uuid4().hex
+    
+    # Divisão justa entre sessões no escalonador
+    definir_sessao(st.session_state.id_sessao)
+
+
+def texto_com_espera(texto: str, prioridade: int) -> str:
+    """Acrescenta ao texto a estimativa de espera na fila do servidor de IA"""
+    espera = obter_scheduler().estimar_espera(prioridade)
+    if espera >= 1:
+        texto = f"{texto} (fila do servidor de IA: ~{espera:.0f}s de espera)"
+    if st.session_state.ollama.estado_prontidao()['estado'] == PRONTIDAO_CARREGANDO:
+        texto = f"{texto} — o modelo de IA ainda está sendo carregado"
+    return texto
+
+
+def indicador_prontidao():
+    """Mostra na barra lateral se o modelo de IA está carregado e pronto para responder"""
+    prontidao = st.session_state.ollama.estado_prontidao()
+    icones = {
+        PRONTIDAO_PRONTO: "🟢",
+        PRONTIDAO_CARREGANDO: "🟡",
+        PRONTIDAO_MODELO_AUSENTE: "🔴",
+        PRONTIDAO_INDISPONIVEL: "🔴",
+    }
+    st.sidebar.caption(f"{icones.get(prontidao['estado'], '⚪')} IA: {prontidao['mensagem']}")
+    
+    # Disjuntor: com o servidor fora do ar, as ações de IA falham na hora em vez de esperar o timeout
+    # (com vários servidores, as requisições vão para os que estão respondendo)
+    servidores = st.session_state.ollama.pool.estado()
+    for servidor in servidores:
+        nome = "Servidor de IA" if len(servidores) == 1 else f"Servidor {servidor['base_url']}"
+        disjuntor = servidor['disjuntor']
+        if disjuntor['estado'] == CIRCUITO_ABERTO:
+            st.sidebar.caption(
+                f"🔴 {nome} sem responder ({disjuntor['falhas']} falhas seguidas); "
+                f"nova tentativa em {disjuntor['proximo_teste']:.0f}s"
+            )
+        elif disjuntor['estado'] == CIRCUITO_SEMIABERTO:
+            st.sidebar.caption(f"🟡 {nome}: verificando se voltou a responder")
@@ -0,0 +1,702 @@
+"""
+Páginas da área do professor: início, criar questionário, gerenciar alunos, dashboard
+e desempenho do sistema
+"""
+import math
+
+import pandas as pd
+import streamlit as st
+
+from ollama_client import (
+    estatisticas_geracao, latencias, PRIORIDADE_PROFESSOR, CIRCUITO_FECHADO, CIRCUITO_ABERTO,
+    CIRCUITO_SEMIABERTO
+)
+from paginas.comum import (
+    iniciar_sessao, recursos_compartilhados, contador_execucoes, questionarios_disponiveis,
+    texto_com_espera
+)
+from resumo_turma import ResumoTurma
+from worker import JOB_GERAR_QUESTIONARIO
+
+# Intervalo (segundos) entre consultas ao progresso de um job de geração
+INTERVALO_ATUALIZACAO_JOB = 2
+
+# Intervalo (segundos) entre consultas a novos envios no Dashboard
+INTERVALO_ATUALIZACAO_DASHBOARD = 5
+
+# Linhas por página da tabela de resultados do Dashboard
+TAMANHO_PAGINA_RESULTADOS = 25
+
+# Rótulos das faixas de resumo_turma.faixa_nota()
+FAIXAS_NOTA = [f"{10 * faixa}–{10 * faixa + 9}" for faixa in range(9)] + ["90–100"]
+
+
+def tabela_histograma(histograma: list) -> pd.DataFrame:
+    """
+    DataFrame do gráfico de distribuição de notas: uma linha por faixa (sempre as 10)
+    e uma coluna por disciplina (ou apenas 'Resultados')
+    """
+    df = pd.DataFrame(histograma, columns=['faixa', 'disciplina', 'quantidade'])
+    df['disciplina'] = df['disciplina'].fillna('Resultados')
+    if df.empty:
+        df = pd.DataFrame({'faixa': [0], 'disciplina': ['Resultados'], 'quantidade': [0]})
+    tabela = df.pivot_table(index='faixa', columns='disciplina', values='quantidade', aggfunc='sum', fill_value=0)
+    tabela = tabela.reindex(range(len(FAIXAS_NOTA)), fill_value=0)
+    tabela.index = pd.Index(FAIXAS_NOTA, name='Nota (%)')
+    tabela.columns.name = None
+    return tabela
+
+
+@st.cache_resource
+def resumo_turma() -> ResumoTurma:
+    """
+    Agregados do Dashboard do processo, compartilhados pelos professores conectados:
+    cada atualização lê do banco apenas os envios novos (e as análises concluídas)
+    """
+    return ResumoTurma()
+
+
+def tabela_dificuldades(dificuldades: dict) -> pd.DataFrame:
+    """DataFrame do gráfico de tópicos de dificuldade (mais frequentes primeiro)"""
+    return pd.DataFrame({
+        'Tópico': list(dificuldades.keys()),
+        'Frequência': list(dificuldades.values())
+    }).set_index('Tópico')
+
+
+def painel_turma():
+    """
+    Métricas, distribuição de notas, últimos envios e dificuldades da turma; roda como
+    fragmento periódico, somando aos agregados só o que chegou desde a última consulta
+    """
+    dados = resumo_turma().atualizar(st.session_state.db)
+    
+    if not dados['resultados']:
+        st.warning("⚠️ Nenhum resultado disponível ainda.")
+        return
+    if not st.session_state.get('dashboard_com_resultados', True):
+        # Primeiros resultados: recarrega a página para exibir também os filtros e a tabela
+        st.rerun()
+    
+    # Envios desde a última exibição nesta sessão
+    visto = st.session_state.get('dashboard_ultimo_id', dados['ultimo_id'])
+    st.session_state['dashboard_ultimo_id'] = dados['ultimo_id']
+    recentes = [r for r in dados['recentes'] if r['id'] > visto]
+    
+    # Métricas gerais
+    st.subheader("📈 Métricas Gerais")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Nota Média", f"{dados['nota_media']:.1f}%")
+    with col2:
+        st.metric("Total de Avaliações", dados['resultados'], delta=len(recentes) or None)
+    with col3:
+        st.metric("Alunos Únicos", dados['alunos_unicos'])
+    with col4:
+        st.metric("Taxa de Aprovação", f"{dados['taxa_aprovacao']:.1f}%")
+    
+    st.divider()
+    
+    # Gráfico de notas: 10 faixas, qualquer que seja o histórico
+    st.subheader("📊 Distribuição de Notas")
+    if st.toggle("Separar por disciplina", key='histograma_por_disciplina'):
+        st.bar_chart(tabela_histograma(dados['histograma_disciplinas']), x_label="Nota (%)", y_label="Resultados")
+    else:
+        st.bar_chart(tabela_histograma(dados['histograma']), x_label="Nota (%)", y_label="Resultados")
+    
+    # Últimos envios (os chegados desde a atualização anterior aparecem marcados)
+    st.subheader("🆕 Últimos Envios")
+    df = pd.DataFrame([
+        {
+            '': "🆕" if r['id'] > visto else "",
+            'Aluno': r['nome_aluno'],
+            'Matrícula': r['matricula_aluno'] or 'N/A',
+            'Disciplina': r['disciplina'],
+            'Tópico': r['topico'],
+            'Nota': f"{r['nota']:.1f}%",
+            'Nível': "⏳ Em análise" if r['pendente'] else r['nivel_dominio'],
+            'Data': r['data_resposta']
+        }
+        for r in dados['recentes']
+    ])
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    if dados['pendentes']:
+        st.caption(f"⏳ {dados['pendentes']} envio(s) aguardando a análise da IA")
+    
+    # Análise de dificuldades
+    st.subheader("🎯 Análise de Dificuldades")
+    
+    if dados['dificuldades']:
+        st.bar_chart(tabela_dificuldades(dados['dificuldades']))
+    else:
+        st.info("Nenhuma dificuldade identificada ainda.")
+
+
+def dados_questionario_criado(questionario_id: int) -> dict:
+    """Questionário recém-criado com as questões semelhantes já existentes, para exibição"""
+    questionario = st.session_state.db.obter_questionario(questionario_id)
+    questionario['similares'] = [
+        st.session_state.ollama.questoes_similares(questao['pergunta'], excluir_questionario=questionario_id)
+        for questao in questionario['questoes']
+    ]
+    return questionario
+
+
+def painel_job_questionario(job_id: int):
+    """Progresso de um job de geração (fragmento periódico); ao terminar, mostra o questionário"""
+    job = st.session_state.db.obter_job(job_id)
+    if job is None:
+        st.session_state.pop('job_questionario', None)
+        return
+    
+    parametros = job['parametros']
+    if job['status'] == 'concluido':
+        st.session_state.pop('job_questionario', None)
+        questionario_id = job['resultado']['id_questionario']
+        st.session_state['questionario_criado'] = dados_questionario_criado(questionario_id)
+        if job['resultado']['num_questoes'] < parametros['num_questoes']:
+            st.session_state['aviso_questionario'] = (
+                f"⚠️ Foram geradas {job['resultado']['num_questoes']} questões válidas "
+                f"(esperado: {parametros['num_questoes']}). O questionário foi criado com as questões disponíveis."
+            )
+        st.rerun()
+    
+    if job['status'] == 'falhou':
+        st.error(f"❌ Erro ao gerar questionário: {job['erro']}")
+        st.info("💡 Verifique se o Ollama está rodando e se o modelo está instalado corretamente.")
+        if st.button("OK", key=f"fechar_job_{job_id}"):
+            st.session_state.pop('job_questionario', None)
+            st.rerun()
+        return
+    
+    parciais = (job['progresso'] or {}).get('questoes', [])
+    st.markdown(f"**{parametros['disciplina']} - {parametros['topico']}**")
+    if job['status'] == 'pendente':
+        mensagem = "⏳ Na fila de geração"
+        if job['erro']:
+            mensagem += f" (nova tentativa em breve: {job['erro']})"
+        st.info(texto_com_espera(mensagem, PRIORIDADE_PROFESSOR))
+    else:
+        st.progress(
+            len(parciais) / parametros['num_questoes'],
+            text=f"🤖 Gerando questões com IA... {len(parciais)}/{parametros['num_questoes']}"
+        )
+    st.caption("Você pode sair desta página: a geração continua e o questionário fica salvo ao terminar.")
+    
+    for i, questao in enumerate(parciais, 1):
+        with st.expander(f"Questão {i}", expanded=False):
+            st.markdown(f"**{questao['pergunta']}**")
+            for opcao in questao['opcoes']:
+                st.markdown(f"- {opcao}")
+
+
+def pagina_inicio():
+    """Apresentação da plataforma e estatísticas do servidor de IA"""
+    st.header("Bem-vindo ao PROFOCO!")
+    st.markdown("""
+    ### Sobre a Plataforma
+    
+    O PROFOCO é uma plataforma educacional que utiliza Inteligência Artificial local para:
+    
+    - ✅ **Gerar questionários** personalizados sobre qualquer tópico
+    - ✅ **Avaliar desempenho** dos alunos automaticamente
+    - ✅ **Identificar dificuldades** específicas de cada aluno
+    - ✅ **Gerar reforço** personalizado baseado nas dificuldades identificadas
+    
+    ### Como Usar
+    
+    1. **Criar Questionário**: Configure a disciplina e tópico, gere o questionário via IA
+    2. **Dashboard**: Visualize métricas e desempenho da turma
+    3. **Análise**: Identifique tópicos com maior dificuldade
+    
+    ### Privacidade
+    
+    🔒 **100% Local**: Todos os dados e processamento de IA acontecem localmente no seu computador.
+    Nenhum dado de aluno é enviado para a internet.
+    """)
+    
+    # Estatísticas rápidas
+    st.subheader("📈 Estatísticas Rápidas")
+    col1, col2, col3 = st.columns(3)
+    
+    # Contagens feitas no banco (COUNT/AVG), sem carregar as tabelas a cada execução
+    estatisticas_banco = st.session_state.db.estatisticas_gerais()
+    
+    with col1:
+        st.metric("Questionários Criados", estatisticas_banco['questionarios'])
+    with col2:
+        st.metric("Alunos Avaliados", estatisticas_banco['resultados'])
+    with col3:
+        if estatisticas_banco['resultados']:
+            st.metric("Nota Média Geral", f"{estatisticas_banco['nota_media']:.1f}%")
+        else:
+            st.metric("Nota Média Geral", "N/A")
+    
+    # Taxa de respostas da IA fora do formato esperado (cada retentativa é uma geração desperdiçada)
+    estatisticas = estatisticas_geracao.resumo()
+    if estatisticas:
+        with st.expander("🤖 Estatísticas de Geração da IA"):
+            df_estatisticas = pd.DataFrame([
+                {
+                    'Modelo': modelo,
+                    'Respostas': e['respostas'],
+                    'Novas Tentativas': e['retentativas'],
+                    'Falhas de JSON': e['falhas_parse'],
+                    'Fora do Schema': e['falhas_schema'],
+                    'Taxa de Retentativa': f"{e['taxa_retentativa'] * 100:.1f}%",
+                    'Taxa de Falha': f"{e['taxa_falha_parse'] * 100:.1f}%"
+                }
+                for modelo, e in estatisticas.items()
+            ])
+            st.dataframe(df_estatisticas, use_container_width=True, hide_index=True)
+            
+            # Latências por modelo e tamanho de prompt, que definem o timeout de cada requisição
+            linhas_latencia = latencias.resumo()
+            if linhas_latencia:
+                st.markdown("**Latência por modelo e tamanho do prompt**")
+                df_latencias = pd.DataFrame([
+                    {
+                        'Modelo': linha['modelo'],
+                        'Prompt': linha['faixa'],
+                        'Amostras': linha['amostras'],
+                        'p50 (s)': f"{linha['p50']:.1f}",
+                        'p95 (s)': f"{linha['p95']:.1f}",
+                        'Timeout (s)': f"{linha['timeout']:.0f}",
+                        'Timeouts': linha['timeouts'],
+                        'Lento': "⚠️" if linha['degradado'] else ""
+                    }
+                    for linha in linhas_latencia
+                ])
+                st.dataframe(df_latencias, use_container_width=True, hide_index=True)
+
+
+def pagina_criar_questionario():
+    """Geração de questionários com IA (jobs persistidos)"""
+    st.header("Criar Novo Questionário")
+    
+    with st.form("form_criar_questionario"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            disciplina = st.text_input("Disciplina", placeholder="Ex: Inglês, Matemática, História...")
+        
+        with col2:
+            topico = st.text_input("Tópico", placeholder="Ex: Verbo To Be, Equações do 2º grau...")
+        
+        num_questoes = st.slider("Número de Questões", min_value=3, max_value=10, value=5)
+        
+        submitted = st.form_submit_button("🎲 Gerar Questionário com IA", type="primary")
+        
+        if submitted:
+            if not disciplina or not topico:
+                st.error("⚠️ Por favor, preencha a disciplina e o tópico.")
+            else:
+                # A geração roda no worker; a página só acompanha o progresso do job
+                st.session_state['job_questionario'] = st.session_state.db.criar_job(
+                    JOB_GERAR_QUESTIONARIO,
+                    {'disciplina': disciplina, 'topico': topico, 'num_questoes': num_questoes}
+                )
+                st.session_state.pop('questionario_criado', None)
+                st.session_state.pop('aviso_questionario', None)
+    
+    # Acompanha a geração em andamento
+    if 'job_questionario' in st.session_state:
+        st.fragment(painel_job_questionario, run_every=INTERVALO_ATUALIZACAO_JOB)(
+            st.session_state['job_questionario']
+        )
+    
+    if 'aviso_questionario' in st.session_state:
+        st.warning(st.session_state['aviso_questionario'])
+    
+    # Mostra o questionário criado se existir
+    if 'questionario_criado' in st.session_state:
+        st.subheader("📋 Questionário Gerado")
+        q_data = st.session_state['questionario_criado']
+        
+        st.success(f"✅ Questionário criado com sucesso! ID: {q_data['id']}")
+        st.info(f"**Disciplina:** {q_data['disciplina']} | **Tópico:** {q_data['topico']}")
+        
+        similares_por_questao = q_data.get('similares') or [[] for _ in q_data['questoes']]
+        for i, (questao, similares) in enumerate(zip(q_data['questoes'], similares_por_questao), 1):
+            with st.expander(f"Questão {i}", expanded=False):
+                st.markdown(f"**{questao['pergunta']}**")
+                for opcao in questao['opcoes']:
+                    st.markdown(f"- {opcao}")
+                st.markdown(f"*Resposta correta: {questao['correta']}*")
+                
+                # Questões parecidas de outros questionários (para reaproveitar ou revisar)
+                if similares:
+                    st.markdown("**🔎 Questões semelhantes já existentes:**")
+                    for similar in similares:
+                        existente = st.session_state.db.obter_questionario(similar['id_questionario'])
+                        if existente and similar['indice'] < len(existente['questoes']):
+                            st.caption(
+                                f"{existente['disciplina']} - {existente['topico']} "
+                                f"(ID {existente['id']}, {similar['similaridade'] * 100:.0f}% semelhante): "
+                                f"{existente['questoes'][similar['indice']]['pergunta']}"
+                            )
+    
+    # Gerações recentes (inclusive de sessões anteriores ou de antes de reiniciar o app)
+    jobs = st.session_state.db.listar_jobs(JOB_GERAR_QUESTIONARIO, limite=10)
+    if jobs:
+        with st.expander("🕒 Gerações recentes"):
+            status_jobs = {
+                'pendente': "⏳ Na fila",
+                'executando': "🤖 Gerando",
+                'concluido': "✅ Concluída",
+                'falhou': "❌ Falhou"
+            }
+            st.dataframe(pd.DataFrame([
+                {
+                    'Job': job['id'],
+                    'Disciplina': job['parametros']['disciplina'],
+                    'Tópico': job['parametros']['topico'],
+                    'Status': status_jobs.get(job['status'], job['status']),
+                    'Questionário': (job['resultado'] or {}).get('id_questionario'),
+                    'Criado em': job['data_criacao']
+                }
+                for job in jobs
+            ]), use_container_width=True, hide_index=True)
+            
+            em_andamento = [
+                job for job in jobs
+                if job['status'] in ('pendente', 'executando')
+                and job['id'] != st.session_state.get('job_questionario')
+            ]
+            for job in em_andamento:
+                if st.button(f"Acompanhar geração #{job['id']}", key=f"acompanhar_job_{job['id']}"):
+                    st.session_state['job_questionario'] = job['id']
+                    st.rerun()
+
+
+def pagina_gerenciar_alunos():
+    """Cadastro, listagem e exclusão de alunos"""
+    st.header("👥 Gerenciar Alunos")
+    
+    tab1, tab2 = st.tabs(["➕ Cadastrar Aluno", "📋 Lista de Alunos"])
+    
+    with tab1:
+        st.subheader("Cadastrar Novo Aluno")
+        
+        with st.form("form_cadastrar_aluno_professor"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                nome_aluno = st.text_input("Nome Completo *", placeholder="Ex: João Silva")
+            
+            with col2:
+                matricula_aluno = st.text_input("Matrícula (opcional)", placeholder="Ex: 2024001")
+            
+            submitted = st.form_submit_button("✅ Cadastrar Aluno", type="primary")
+            
+            if submitted:
+                if not nome_aluno:
+                    st.error("⚠️ O nome do aluno é obrigatório.")
+                else:
+                    try:
+                        aluno_id = st.session_state.db.criar_aluno(
+                            nome=nome_aluno.strip(),
+                            matricula=matricula_aluno.strip() if matricula_aluno else None
+                        )
+                        st.success(f"✅ Aluno cadastrado com sucesso! ID: {aluno_id}")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"❌ {str(e)}")
+                    except Exception as e:
+                        st.error(f"❌ Erro ao cadastrar aluno: {str(e)}")
+    
+    with tab2:
+        st.subheader("Alunos Cadastrados")
+        
+        alunos = st.session_state.db.listar_alunos()
+        
+        if not alunos:
+            st.info("📝 Nenhum aluno cadastrado ainda. Use a aba 'Cadastrar Aluno' para adicionar alunos.")
+        else:
+            st.metric("Total de Alunos", len(alunos))
+            st.divider()
+            
+            # Tabela de alunos
+            dados_tabela = []
+            for aluno in alunos:
+                dados_tabela.append({
+                    'ID': aluno['id'],
+                    'Nome': aluno['nome'],
+                    'Matrícula': aluno['matricula'] if aluno['matricula'] else 'N/A',
+                    'Data de Cadastro': aluno['data_cadastro']
+                })
+            
+            df_alunos = pd.DataFrame(dados_tabela)
+            st.dataframe(df_alunos, use_container_width=True, hide_index=True)
+            
+            st.divider()
+            st.subheader("🗑️ Excluir Aluno")
+            
+            aluno_opcoes = {f"{a['nome']} ({a['matricula'] if a['matricula'] else 'Sem matrícula'})": a['id'] 
+                            for a in alunos}
+            
+            aluno_selecionado_excluir = st.selectbox(
+                "Selecione o aluno para excluir",
+                options=list(aluno_opcoes.keys())
+            )
+            
+            if st.button("🗑️ Excluir Aluno", type="secondary"):
+                aluno_id_excluir = aluno_opcoes[aluno_selecionado_excluir]
+                if st.session_state.db.excluir_aluno(aluno_id_excluir):
+                    st.success("✅ Aluno excluído com sucesso!")
+                    st.rerun()
+                else:
+                    st.error("❌ Erro ao excluir aluno.")
+
+
+def pagina_dashboard():
+    """Desempenho da turma: painel ao vivo e resultados filtrados"""
+    st.header("📊 Dashboard de Desempenho")
+    
+    # Com "Ao vivo", o painel consulta novos envios periodicamente sem recarregar a página
+    ao_vivo = st.toggle("🔴 Ao vivo", value=True, key='dashboard_ao_vivo',
+                        help=f"Atualiza métricas e gráficos a cada {INTERVALO_ATUALIZACAO_DASHBOARD}s")
+    st.fragment(painel_turma, run_every=INTERVALO_ATUALIZACAO_DASHBOARD if ao_vivo else None)()
+    
+    dados = resumo_turma().retrato()
+    st.session_state['dashboard_com_resultados'] = bool(dados['resultados'])
+    if dados['resultados']:
+        st.divider()
+        
+        # Tabela de resultados: filtrada e paginada no banco, só a página visível vai ao navegador
+        st.subheader("📋 Resultados Detalhados")
+        
+        # Filtros
+        col1, col2 = st.columns(2)
+        with col1:
+            disciplinas = ['Todas'] + dados['disciplinas']
+            disciplina_filtro = st.selectbox("Filtrar por Disciplina", disciplinas)
+        with col2:
+            questionarios = questionarios_disponiveis(
+                st.session_state.db, st.session_state.db.versao_dados('questionarios')
+            )
+            rotulos = {
+                q['id']: f"{q['disciplina']} - {q['topico']}" for q in questionarios
+                if disciplina_filtro == 'Todas' or q['disciplina'] == disciplina_filtro
+            }
+            questionario_filtro = st.selectbox(
+                "Filtrar por Questionário", [None] + list(rotulos),
+                format_func=lambda id_questionario: 'Todos' if id_questionario is None
+                else f"{rotulos[id_questionario]} (#{id_questionario})"
+            )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            aluno_filtro = st.text_input("Filtrar por Aluno", placeholder="Nome ou matrícula")
+        with col2:
+            data_inicio = st.date_input("De", value=None, format="DD/MM/YYYY")
+        with col3:
+            data_fim = st.date_input("Até", value=None, format="DD/MM/YYYY")
+        
+        filtros = {
+            'disciplina': None if disciplina_filtro == 'Todas' else disciplina_filtro,
+            'id_questionario': questionario_filtro,
+            'aluno': aluno_filtro or None,
+            'data_inicio': data_inicio.isoformat() if data_inicio else None,
+            'data_fim': data_fim.isoformat() if data_fim else None,
+        }
+        total = st.session_state.db.contar_resultados(**filtros)
+        paginas = max(1, math.ceil(total / TAMANHO_PAGINA_RESULTADOS))
+        # Filtros novos voltam à primeira página (a escolhida pode nem existir mais)
+        if (st.session_state.get('filtros_resultados') != filtros
+                or st.session_state.get('pagina_resultados', 1) > paginas):
+            st.session_state['filtros_resultados'] = filtros
+            st.session_state['pagina_resultados'] = 1
+        
+        if total:
+            pagina = st.session_state.get('pagina_resultados', 1)
+            deslocamento = (pagina - 1) * TAMANHO_PAGINA_RESULTADOS
+            resultados_pagina = st.session_state.db.buscar_resultados(
+                **filtros, limite=TAMANHO_PAGINA_RESULTADOS, deslocamento=deslocamento
+            )
+            df = pd.DataFrame([
+                {
+                    'Aluno': r['nome_aluno'],
+                    'Matrícula': r['matricula_aluno'] or 'N/A',
+                    'Disciplina': r['disciplina'],
+                    'Tópico': r['topico'],
+                    'Nota': f"{r['nota']:.1f}%",
+                    'Nível': r['nivel_dominio'],
+                    'Data': r['data_resposta']
+                }
+                for r in resultados_pagina
+            ])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                st.number_input("Página", min_value=1, max_value=paginas, step=1, key='pagina_resultados')
+            with col2:
+                st.caption(
+                    f"Mostrando {deslocamento + 1}–{deslocamento + len(resultados_pagina)} "
+                    f"de {total} resultados (página {pagina} de {paginas})"
+                )
+        else:
+            st.info("Nenhum resultado para os filtros selecionados.")
+
+
+def pagina_desempenho():
+    """Telemetria das chamadas ao modelo de IA"""
+    st.header("⚡ Desempenho do Sistema")
+    st.caption("Telemetria de cada chamada ao modelo de IA: latência, tokens por segundo e falhas.")
+    _, _, tempos = recursos_compartilhados()
+    st.caption(
+        f"Inicialização do processo: {tempos['total']:.2f}s (banco {tempos['banco']:.2f}s, "
+        f"cliente de IA {tempos['cliente']:.2f}s, tarefas em segundo plano {tempos['segundo_plano']:.2f}s)"
+    )
+    
+    # Execuções do script por envio de respostas (cada clique fora de um formulário é uma execução)
+    contador, lock = contador_execucoes()
+    with lock:
+        execucoes = dict(contador)
+    for pagina, envio in (("✍️ Responder Questionário", 'envio_respostas'),
+                          ("🎯 Reforço Personalizado", 'envio_reforco')):
+        if execucoes.get(envio):
+            st.caption(
+                f"{pagina}: {execucoes.get(pagina, 0) / execucoes[envio]:.1f} execuções do script "
+                f"por envio ({execucoes[envio]} envios)"
+            )
+    
+    periodos = {"Última hora": 1, "Últimas 24 horas": 24, "Últimos 7 dias": 24 * 7, "Tudo": None}
+    periodo = st.selectbox("Período", list(periodos.keys()), index=1)
+    metricas = st.session_state.db.obter_metricas(periodos[periodo])
+    
+    if not metricas:
+        st.info("Nenhuma chamada ao modelo registrada no período.")
+    else:
+        df_metricas = pd.DataFrame(metricas)
+        df_metricas['data'] = pd.to_datetime(df_metricas['data'])
+        # Colunas só com NULL (ex.: período só com falhas de conexão) viriam como object
+        colunas_numericas = ['latencia', 'espera_fila', 'load_duration', 'eval_duration', 'eval_count']
+        df_metricas[colunas_numericas] = df_metricas[colunas_numericas].apply(pd.to_numeric)
+        # Tokens gerados por segundo de geração (eval_duration exclui fila, carga e prompt)
+        df_metricas['tokens_s'] = df_metricas['eval_count'] / df_metricas['eval_duration'].where(
+            df_metricas['eval_duration'] > 0
+        )
+        
+        concluidas = df_metricas[df_metricas['latencia'].notna() & (df_metricas['status'] != 'timeout')]
+        sucesso = (df_metricas['status'] == 'ok').mean() * 100
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Chamadas", len(df_metricas))
+            st.metric("Taxa de Sucesso", f"{sucesso:.1f}%")
+        with col2:
+            p50 = concluidas['latencia'].quantile(0.5) if len(concluidas) else None
+            p95 = concluidas['latencia'].quantile(0.95) if len(concluidas) else None
+            st.metric("Latência p50", f"{p50:.1f}s" if p50 is not None else "N/A")
+            st.metric("Latência p95", f"{p95:.1f}s" if p95 is not None else "N/A")
+        with col3:
+            tokens_s = df_metricas['tokens_s'].median()
+            espera = df_metricas['espera_fila'].quantile(0.95)
+            st.metric("Tokens/s (mediana)", f"{tokens_s:.1f}" if pd.notna(tokens_s) else "N/A")
+            st.metric("Espera na Fila p95", f"{espera:.1f}s" if pd.notna(espera) else "N/A")
+        with col4:
+            st.metric("Timeouts", int((df_metricas['status'] == 'timeout').sum()))
+            st.metric("Falhas de JSON/Schema",
+                      int(df_metricas['status'].isin(['falha_parse', 'fora_schema']).sum()))
+        
+        # Por tarefa e modelo
+        st.subheader("Por Tarefa e Modelo")
+        linhas = []
+        for (tarefa, modelo), grupo in df_metricas.groupby(['tarefa', 'modelo']):
+            latencia = grupo.loc[grupo['status'] != 'timeout', 'latencia'].dropna()
+            linhas.append({
+                'Tarefa': tarefa,
+                'Modelo': modelo,
+                'Chamadas': len(grupo),
+                'Sucesso': f"{(grupo['status'] == 'ok').mean() * 100:.0f}%",
+                'p50 (s)': f"{latencia.quantile(0.5):.1f}" if len(latencia) else "N/A",
+                'p95 (s)': f"{latencia.quantile(0.95):.1f}" if len(latencia) else "N/A",
+                'p99 (s)': f"{latencia.quantile(0.99):.1f}" if len(latencia) else "N/A",
+                'Carga (s)': f"{grupo['load_duration'].mean():.1f}" if grupo['load_duration'].notna().any() else "N/A",
+                'Tokens/s': f"{grupo['tokens_s'].median():.1f}" if grupo['tokens_s'].notna().any() else "N/A",
+                'Novas Tentativas': int((grupo['tentativa'] > 0).sum()),
+                'Timeouts': int((grupo['status'] == 'timeout').sum())
+            })
+        st.dataframe(pd.DataFrame(linhas), use_container_width=True, hide_index=True)
+        
+        # Por servidor, quando as requisições são distribuídas entre vários (PROFOCO_OLLAMA_HOSTS)
+        servidores = st.session_state.ollama.pool.estado()
+        if len(servidores) > 1:
+            st.subheader("Por Servidor")
+            situacoes = {
+                CIRCUITO_FECHADO: "🟢 Respondendo",
+                CIRCUITO_SEMIABERTO: "🟡 Em teste",
+                CIRCUITO_ABERTO: "🔴 Sem responder",
+            }
+            linhas = []
+            for servidor in servidores:
+                grupo = df_metricas[df_metricas['host'] == servidor['base_url']]
+                latencia = grupo.loc[grupo['status'] != 'timeout', 'latencia'].dropna()
+                linhas.append({
+                    'Servidor': servidor['base_url'],
+                    'Situação': situacoes.get(servidor['disjuntor']['estado'], servidor['disjuntor']['estado']),
+                    'Em Curso': f"{servidor['ativos']}/{servidor['slots']}",
+                    'Chamadas': len(grupo),
+                    'Sucesso': f"{(grupo['status'] == 'ok').mean() * 100:.0f}%" if len(grupo) else "N/A",
+                    'p50 (s)': f"{latencia.quantile(0.5):.1f}" if len(latencia) else "N/A",
+                    'p95 (s)': f"{latencia.quantile(0.95):.1f}" if len(latencia) else "N/A",
+                    'Tokens/s': f"{grupo['tokens_s'].median():.1f}" if grupo['tokens_s'].notna().any() else "N/A",
+                    'Falhas': int(grupo['status'].isin(['erro', 'timeout']).sum())
+                })
+            st.dataframe(pd.DataFrame(linhas), use_container_width=True, hide_index=True)
+        
+        # Evolução no tempo (por hora)
+        st.subheader("Ao Longo do Tempo")
+        por_hora = df_metricas.set_index('data').resample('h')
+        df_tempo = pd.DataFrame({
+            'Chamadas': por_hora['status'].count(),
+            'Latência p95 (s)': por_hora['latencia'].quantile(0.95),
+            'Tokens/s': por_hora['tokens_s'].median()
+        })
+        st.markdown("**Chamadas por hora**")
+        st.bar_chart(df_tempo['Chamadas'])
+        st.markdown("**Latência p95 e tokens/s por hora**")
+        st.line_chart(df_tempo[['Latência p95 (s)', 'Tokens/s']])
+        
+        # Desfechos
+        st.subheader("Desfechos das Chamadas")
+        df_status = df_metricas['status'].value_counts().rename_axis('Status').reset_index(name='Chamadas')
+        st.dataframe(df_status, use_container_width=True, hide_index=True)
+        
+        erros = df_metricas[df_metricas['erro'].notna()]
+        if not erros.empty:
+            with st.expander(f"Últimos erros ({len(erros)})"):
+                st.dataframe(
+                    erros[['data', 'tarefa', 'modelo', 'host', 'status', 'erro']].tail(20).iloc[::-1],
+                    use_container_width=True, hide_index=True
+                )
+
+
+# Páginas do menu lateral, na ordem exibida
+PAGINAS = {
+    "🏠 Início": pagina_inicio,
+    "📝 Criar Questionário": pagina_criar_questionario,
+    "👥 Gerenciar Alunos": pagina_gerenciar_alunos,
+    "📊 Dashboard": pagina_dashboard,
+    "⚡ Desempenho do Sistema": pagina_desempenho,
+}
+
+
+def renderizar():
+    """Área do professor: a página escolhida no menu lateral"""
+    iniciar_sessao()
+    
+    st.title("👨‍🏫 Área do Professor")
+    
+    # Menu lateral do professor
+    pagina_professor = st.sidebar.radio("Menu", list(PAGINAS))
+    
+    # Botão de logout
+    st.sidebar.markdown("---")
+    if st.sidebar.button("🚪 Sair"):
+        st.session_state.perfil = None
+        st.rerun()
+    
+    PAGINAS[pagina_professor]()
@@ -0,0 +1,191 @@
+"""
+Reforço a partir do banco de questões: reaproveita questões já salvas antes de chamar a IA
+"""
+import logging
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import Database
+from ollama_client import OllamaClient, PRIORIDADE_INTERATIVA
+
+logger = logging.getLogger(__name__)
+
+# Peso da afinidade com os tópicos de dificuldade e da dificuldade da questão na ordenação
+PESO_AFINIDADE = 0.7
+PESO_DIFICULDADE = 0.3
+
+# Afinidade mínima para uma questão do banco ser considerada do mesmo tópico
+AFINIDADE_MINIMA = 0.34
+
+_PALAVRAS_VAZIAS = {
+    'de', 'da', 'do', 'das', 'dos', 'em', 'no', 'na', 'nos', 'nas', 'um', 'uma', 'uns', 'umas',
+    'com', 'por', 'para', 'ao', 'aos', 'as', 'os', 'que', 'se', 'sobre', 'qual', 'quais',
+    'the', 'of', 'and'
+}
+
+
+def _termos(texto: str) -> Set[str]:
+    """Palavras significativas do texto, em minúsculas e sem acentos"""
+    sem_acentos = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return {
+        palavra for palavra in re.findall(r'[a-z0-9]+', sem_acentos.lower())
+        if len(palavra) > 1 and palavra not in _PALAVRAS_VAZIAS
+    }
+
+
+def _afinidade(termos_topicos: List[Set[str]], topico_questionario: str, pergunta: str) -> float:
+    """
+    Quanto uma questão cobre algum dos tópicos de dificuldade (0 a 1): fração dos
+    termos do tópico presentes no tópico do questionário ou, com peso menor, na pergunta
+    """
+    termos_questionario = _termos(topico_questionario)
+    termos_pergunta = _termos(pergunta)
+    melhor = 0.0
+    for termos in termos_topicos:
+        if not termos:
+            continue
+        cobertura_topico = len(termos & termos_questionario) / len(termos)
+        cobertura_pergunta = len(termos & termos_pergunta) / len(termos)
+        melhor = max(melhor, cobertura_topico, 0.6 * cobertura_pergunta)
+    return melhor
+
+
+def dificuldade_itens(questoes: List[Dict], respostas_turma: List[List[str]]) -> List[float]:
+    """
+    Taxa de erro de cada questão entre os alunos que responderam, suavizada
+    ((erros + 1) / (respostas + 2)) para que questões sem respostas fiquem em 0.5
+    
+    Args:
+        questoes: Questões do questionário
+        respostas_turma: Lista com as respostas de cada aluno
+    
+    Returns:
+        Uma dificuldade (0 a 1) por questão
+    """
+    erros = [0] * len(questoes)
+    total = [0] * len(questoes)
+    for respostas in respostas_turma:
+        for i, (questao, resposta) in enumerate(zip(questoes, respostas)):
+            total[i] += 1
+            if str(resposta).upper() != str(questao.get('correta', '')).upper():
+                erros[i] += 1
+    return [(e + 1) / (t + 2) for e, t in zip(erros, total)]
+
+
+def buscar_questoes_banco(db: Database, topicos_dificuldade: List[str], disciplina: str,
+                          nome_aluno: Optional[str] = None, matricula: Optional[str] = None,
+                          limite: int = 5) -> List[Dict]:
+    """
+    Seleciona questões já salvas sobre os tópicos de dificuldade que o aluno ainda não viu
+    
+    As candidatas são as questões da disciplina fora dos questionários que o aluno já
+    respondeu, com afinidade mínima a algum tópico, ordenadas por
+    PESO_AFINIDADE * afinidade + PESO_DIFICULDADE * dificuldade.
+    
+    Args:
+        db: Banco de dados
+        topicos_dificuldade: Tópicos em que o aluno teve dificuldade
+        disciplina: Disciplina do reforço
+        nome_aluno: Nome do aluno (usado se não houver matrícula)
+        matricula: Matrícula do aluno
+        limite: Número máximo de questões
+    
+    Returns:
+        Questões no formato de gerar_questoes(), com a chave adicional 'origem'
+        ({'id_questionario': int, 'indice': int})
+    """
+    termos_topicos = [_termos(topico) for topico in topicos_dificuldade]
+    if limite <= 0 or not any(termos_topicos):
+        return []
+    
+    respondidos = {r['id_questionario'] for r in db.obter_resultados_aluno(nome_aluno, matricula)}
+    questionarios = db.listar_questionarios_disciplina(disciplina)
+    
+    # Perguntas já vistas pelo aluno (a mesma pergunta pode estar em mais de um questionário)
+    perguntas_vistas = {
+        questao['pergunta'].strip().lower()
+        for q in questionarios if q['id'] in respondidos
+        for questao in q['questoes']
+    }
+    
+    candidatos = [q for q in questionarios if q['id'] not in respondidos]
+    respostas = db.obter_respostas_questionarios([q['id'] for q in candidatos])
+    
+    ranqueadas: List[Tuple[float, int, int, Dict]] = []
+    for q in candidatos:
+        dificuldades = dificuldade_itens(q['questoes'], respostas.get(q['id'], []))
+        for i, questao in enumerate(q['questoes']):
+            if questao['pergunta'].strip().lower() in perguntas_vistas:
+                continue
+            afinidade = _afinidade(termos_topicos, q['topico'], questao['pergunta'])
+            if afinidade < AFINIDADE_MINIMA:
+                continue
+            pontuacao = PESO_AFINIDADE * afinidade + PESO_DIFICULDADE * dificuldades[i]
+            ranqueadas.append((pontuacao, q['id'], i, questao))
+    
+    ranqueadas.sort(key=lambda item: item[0], reverse=True)
+    
+    selecionadas = []
+    escolhidas = set()
+    for _, id_questionario, indice, questao in ranqueadas:
+        chave = questao['pergunta'].strip().lower()
+        if chave in escolhidas:
+            continue
+        escolhidas.add(chave)
+        selecionadas.append(dict(questao, origem={'id_questionario': id_questionario, 'indice': indice}))
+        if len(selecionadas) >= limite:
+            break
+    return selecionadas
+
+
+def montar_reforco(db: Database, ollama: OllamaClient, topicos_dificuldade: List[str],
+                   disciplina: str, num_questoes: int = 5, nome_aluno: Optional[str] = None,
+                   matricula: Optional[str] = None,
+                   prioridade: int = PRIORIDADE_INTERATIVA) -> Tuple[List[Dict], int]:
+    """
+    Monta o reforço com questões do banco e pede à IA apenas as que faltarem
+    
+    Args:
+        db: Banco de dados
+        ollama: Cliente Ollama (usado só se o banco não tiver questões suficientes)
+        topicos_dificuldade: Tópicos em que o aluno teve dificuldade
+        disciplina: Disciplina do reforço
+        num_questoes: Número de questões desejado
+        nome_aluno: Nome do aluno
+        matricula: Matrícula do aluno
+        prioridade: Classe de prioridade da geração no escalonador
+    
+    Returns:
+        (questões, quantas vieram do banco). Se a IA falhar e o banco tiver fornecido
+        alguma questão, retorna apenas as do banco; sem nenhuma, o erro é propagado.
+    
+    Raises:
+        ValueError: se nem o banco nem a IA forneceram alguma questão (ex.: todas as
+                    geradas estavam incompletas)
+    """
+    questoes = buscar_questoes_banco(
+        db, topicos_dificuldade, disciplina, nome_aluno, matricula, limite=num_questoes
+    )
+    do_banco = len(questoes)
+    
+    faltam = num_questoes - do_banco
+    if faltam > 0:
+        try:
+            geradas = ollama.gerar_reforco(topicos_dificuldade, disciplina, faltam, prioridade)
+        except Exception:
+            if not questoes:
+                raise
+            logger.warning("Falha ao gerar questões de reforço; usando apenas as %d do banco", do_banco, exc_info=True)
+            geradas = []
+        
+        existentes = {q['pergunta'].strip().lower() for q in questoes}
+        for questao in geradas:
+            if questao['pergunta'].strip().lower() not in existentes:
+                existentes.add(questao['pergunta'].strip().lower())
+                questoes.append(questao)
+    
+    if not questoes:
+        raise ValueError("Nenhuma questão de reforço foi obtida do banco de questões nem da IA.")
+    
+    return questoes[:num_questoes], do_banco
@@ -0,0 +1,137 @@
+"""
+Agregados do Dashboard do professor mantidos de forma incremental a partir do feed
+de novos resultados (Database.resultados_desde)
+"""
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict
+
+from database import Database
+
+# Nota mínima (%) para aprovação
+NOTA_APROVACAO = 70
+
+# Resultados lidos por consulta ao feed
+LOTE_FEED = 500
+
+
+def faixa_nota(nota: float) -> int:
+    """Faixa de 10 pontos da nota no histograma (faixa 0 = 0 a 9,9 ... faixa 9 = 90 a 100)"""
+    return min(int(nota // 10), 9)
+
+
+class ResumoTurma:
+    """
+    Métricas, distribuição de notas, tópicos de dificuldade e últimos envios da turma.
+    
+    A primeira atualização lê o histórico uma vez; as seguintes leem apenas os resultados
+    com ID acima da marca (ultimo_id) e os que ainda aguardavam a análise da IA, e os
+    somam aos agregados. O custo de cada atualização é proporcional aos envios novos,
+    não ao total de resultados. Uma instância pode ser compartilhada entre sessões.
+    """
+    
+    def __init__(self, max_recentes: int = 20):
+        """
+        Args:
+            max_recentes: Envios mantidos na lista de últimos envios
+        """
+        self._lock = threading.Lock()
+        self.max_recentes = max_recentes
+        self.ultimo_id = 0
+        self.total = 0
+        self.soma_notas = 0.0
+        self.aprovados = 0
+        self._alunos = set()
+        self._histograma = Counter()
+        self._dificuldades = Counter()
+        self._recentes: OrderedDict = OrderedDict()
+        # ID -> resumo já somado dos resultados com a análise da IA pendente
+        self._pendentes: Dict[int, Dict] = {}
+    
+    def atualizar(self, db: Database) -> Dict:
+        """
+        Soma aos agregados os resultados novos e as análises concluídas desde a última chamada
+        
+        Returns:
+            Retrato dos agregados (ver retrato()) com 'novos': resultados lidos nesta chamada
+        """
+        with self._lock:
+            novos = 0
+            while True:
+                lote = db.resultados_desde(self.ultimo_id, LOTE_FEED)
+                for resultado in lote:
+                    self._somar(resultado)
+                novos += len(lote)
+                if len(lote) < LOTE_FEED:
+                    break
+            
+            # A análise da IA chega depois do envio (UPDATE, sem novo ID): relê só as pendentes
+            if self._pendentes:
+                for resultado in db.resumos_resultados(list(self._pendentes)):
+                    if not resultado['pendente']:
+                        self._concluir_analise(resultado)
+            
+            retrato = self._retrato()
+        retrato['novos'] = novos
+        return retrato
+    
+    def _somar(self, resultado: Dict):
+        self.ultimo_id = max(self.ultimo_id, resultado['id'])
+        self.total += 1
+        self.soma_notas += resultado['nota']
+        if resultado['nota'] >= NOTA_APROVACAO:
+            self.aprovados += 1
+        self._alunos.add(resultado['nome_aluno'])
+        self._histograma[(faixa_nota(resultado['nota']), resultado['disciplina'])] += 1
+        self._dificuldades.update(resultado['topicos_dificuldade'])
+        
+        self._recentes[resultado['id']] = resultado
+        if len(self._recentes) > self.max_recentes:
+            self._recentes.popitem(last=False)
+        if resultado['pendente']:
+            self._pendentes[resultado['id']] = resultado
+    
+    def _concluir_analise(self, resultado: Dict):
+        # Troca os tópicos da análise básica pelos da IA
+        anterior = self._pendentes.pop(resultado['id'])
+        self._dificuldades.subtract(anterior['topicos_dificuldade'])
+        self._dificuldades.update(resultado['topicos_dificuldade'])
+        self._dificuldades = +self._dificuldades
+        if resultado['id'] in self._recentes:
+            self._recentes[resultado['id']] = resultado
+    
+    def _retrato(self) -> Dict:
+        histograma = Counter()
+        for (faixa, _), quantidade in self._histograma.items():
+            histograma[faixa] += quantidade
+        return {
+            'resultados': self.total,
+            'ultimo_id': self.ultimo_id,
+            'nota_media': self.soma_notas / self.total if self.total else 0.0,
+            'alunos_unicos': len(self._alunos),
+            'taxa_aprovacao': self.aprovados / self.total * 100 if self.total else 0.0,
+            'disciplinas': sorted({disciplina for _, disciplina in self._histograma}),
+            'histograma': [
+                {'faixa': faixa, 'quantidade': quantidade} for faixa, quantidade in sorted(histograma.items())
+            ],
+            'histograma_disciplinas': [
+                {'faixa': faixa, 'disciplina': disciplina, 'quantidade': quantidade}
+                for (faixa, disciplina), quantidade in sorted(self._histograma.items())
+            ],
+            'dificuldades': dict(self._dificuldades.most_common()),
+            'pendentes': len(self._pendentes),
+            'recentes': list(reversed(self._recentes.values())),
+        }
+    
+    def retrato(self) -> Dict:
+        """
+        Agregados atuais, sem consultar o banco
+        
+        Returns:
+            Dicionário com resultados, ultimo_id, nota_media, alunos_unicos, taxa_aprovacao,
+            disciplinas, histograma (listas com 'faixa' de faixa_nota() e 'quantidade'),
+            histograma_disciplinas (as mesmas listas com 'disciplina'), dificuldades
+            (tópico -> frequência), pendentes e recentes (últimos envios, mais recente primeiro)
+        """
+        with self._lock:
+            return self._retrato()
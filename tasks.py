@@ -0,0 +1,342 @@
+"""
+Fila de tarefas em segundo plano para o trabalho de IA que não precisa bloquear a interface
+"""
+import contextvars
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+from database import Database
+from ollama_client import (
+    OllamaClient, FilaCheiaError, MODELO_EMBEDDINGS, PRIORIDADE_SEGUNDO_PLANO, hosts_configurados,
+    modelos_configurados, obter_scheduler
+)
+from reforco import montar_reforco
+from vector_index import IndiceVetorial, blob_para_vetor, vetor_para_blob
+
+logger = logging.getLogger(__name__)
+
+# Nota (%) abaixo da qual um reforço é preparado em segundo plano após a análise
+NOTA_MINIMA_REFORCO = 70
+
+# Questões de cada reforço preparado em segundo plano
+QUESTOES_REFORCO = 5
+
+# Tentativas de um reforço em segundo plano e espera (segundos) antes de repetir
+# quando o servidor está sobrecarregado ou fora do ar
+MAX_TENTATIVAS_REFORCO = 5
+ESPERA_REAGENDAMENTO_REFORCO = 30
+
+# Falhas temporárias do Ollama (fila cheia, disjuntor aberto, sem conexão, timeout):
+# o reforço continua 'pendente' e é tentado de novo
+FALHAS_TEMPORARIAS = (FilaCheiaError, ConnectionError, TimeoutError)
+
+
+class TaskQueue:
+    def __init__(self, num_workers: int = 1):
+        """
+        Inicializa a fila e as threads de trabalho
+        
+        Args:
+            num_workers: Número de threads consumindo a fila (padrão: 1, pois o
+                         Ollama local atende poucas requisições em paralelo)
+        """
+        self._fila = queue.Queue()
+        self._workers = []
+        self._workers_lock = threading.Lock()
+        self.ampliar(num_workers)
+    
+    def ampliar(self, num_workers: int):
+        """Cria threads até haver num_workers consumindo a fila (nunca reduz)"""
+        with self._workers_lock:
+            for i in range(len(self._workers), num_workers):
+                worker = threading.Thread(target=self._executar, name=f"profoco-task-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+    
+    def submit(self, func: Callable, *args, **kwargs):
+        """
+        Enfileira func(*args, **kwargs) para execução em segundo plano
+        
+        A tarefa roda com uma cópia do contexto de quem a enfileirou, de modo que
+        a sessão registrada no escalonador do Ollama (definir_sessao) é preservada.
+        """
+        self._fila.put((contextvars.copy_context(), func, args, kwargs))
+    
+    def pendentes(self) -> int:
+        """Número aproximado de tarefas aguardando execução"""
+        return self._fila.qsize()
+    
+    def _executar(self):
+        while True:
+            contexto, func, args, kwargs = self._fila.get()
+            try:
+                contexto.run(func, *args, **kwargs)
+            except Exception:
+                logger.exception("Falha ao executar tarefa em segundo plano %s", getattr(func, '__name__', func))
+            finally:
+                self._fila.task_done()
+
+
+_fila_global: Optional[TaskQueue] = None
+_fila_reforco: Optional[TaskQueue] = None
+_fila_lock = threading.Lock()
+_pendentes_recuperados = False
+_indices: Dict[str, IndiceVetorial] = {}
+_indexacao_iniciada = False
+
+
+def obter_fila() -> TaskQueue:
+    """
+    Retorna a fila de tarefas do processo (criada na primeira chamada), com uma
+    thread por slot do escalonador: com vários servidores Ollama, as análises de
+    uma turma inteira rodam em paralelo, uma em cada servidor livre
+    """
+    global _fila_global
+    with _fila_lock:
+        if _fila_global is None:
+            _fila_global = TaskQueue()
+        _fila_global.ampliar(obter_scheduler().slots)
+        return _fila_global
+
+
+def obter_fila_reforco() -> TaskQueue:
+    """
+    Retorna a fila dos reforços preparados em segundo plano (criada na primeira chamada)
+    
+    É separada da fila das análises: a análise do próximo aluno não espera atrás dos
+    reforços já enfileirados, e só então o escalonador aplica PRIORIDADE_SEGUNDO_PLANO.
+    Uma thread basta, pois os reforços não têm pressa.
+    """
+    global _fila_reforco
+    with _fila_lock:
+        if _fila_reforco is None:
+            _fila_reforco = TaskQueue()
+        return _fila_reforco
+
+
+def analisar_resultado(db: Database, ollama: OllamaClient, resultado_id: int):
+    """
+    Preenche com a IA os comentários (nível de domínio, recomendações, pontos fortes)
+    de um resultado salvo com 'status_analise' = 'pendente'
+    """
+    resultado = db.obter_resultado(resultado_id)
+    if resultado is None or resultado['analise'].get('status_analise') != 'pendente':
+        return
+    
+    questionario = db.obter_questionario(resultado['id_questionario'])
+    if questionario is None:
+        return
+    
+    # analisar_respostas já recorre à análise básica se o modelo falhar,
+    # então o resultado nunca fica pendente para sempre
+    analise = ollama.analisar_respostas(
+        questoes=questionario['questoes'],
+        respostas_aluno=resultado['respostas'],
+        nome_aluno=resultado['nome_aluno'],
+        disciplina=questionario['disciplina'],
+        topico=questionario['topico'],
+        id_questionario=questionario['id']
+    )
+    analise['status_analise'] = 'concluida'
+    
+    db.atualizar_analise(resultado_id, analise)
+    agendar_reforco(db, ollama, dict(resultado, analise=analise))
+
+
+def agendar_reforco(db: Database, ollama: OllamaClient, resultado: Dict) -> Optional[int]:
+    """
+    Registra e enfileira o reforço de um resultado com nota abaixo de NOTA_MINIMA_REFORCO,
+    sobre os tópicos de dificuldade da análise, para que o conjunto já esteja pronto
+    quando o aluno abrir a página de reforço
+    
+    Returns:
+        ID do reforço, ou None se a nota não pede reforço ou o resultado já tem um
+    """
+    if resultado['nota'] >= NOTA_MINIMA_REFORCO:
+        return None
+    
+    reforco_id = db.criar_reforco(
+        nome_aluno=resultado['nome_aluno'],
+        disciplina=resultado['disciplina'],
+        topicos=resultado['analise'].get('topicos_dificuldade') or [resultado['topico']],
+        num_questoes=QUESTOES_REFORCO,
+        matricula_aluno=resultado['matricula_aluno'],
+        id_resultado=resultado['id']
+    )
+    if reforco_id is not None:
+        enfileirar_reforco(db, ollama, reforco_id)
+    return reforco_id
+
+
+def enfileirar_reforco(db: Database, ollama: OllamaClient, reforco_id: int,
+                       tentativa: int = 1, atraso: float = 0):
+    """
+    Enfileira a preparação de um reforço 'pendente' na fila de reforços
+    
+    Args:
+        db: Banco de dados
+        ollama: Cliente Ollama
+        reforco_id: ID do reforço
+        tentativa: Número da tentativa (até MAX_TENTATIVAS_REFORCO)
+        atraso: Segundos de espera antes de enfileirar (ex.: servidor fora do ar)
+    """
+    fila = obter_fila_reforco()
+    if atraso <= 0:
+        fila.submit(_preparar_reforco, db, ollama, reforco_id, tentativa)
+        return
+    # Enfileira com o contexto (sessão do escalonador) de quem reagendou
+    contexto = contextvars.copy_context()
+    temporizador = threading.Timer(
+        atraso, contexto.run, args=(fila.submit, _preparar_reforco, db, ollama, reforco_id, tentativa)
+    )
+    temporizador.daemon = True
+    temporizador.start()
+
+
+def _preparar_reforco(db: Database, ollama: OllamaClient, reforco_id: int, tentativa: int):
+    """Executa gerar_reforco() em segundo plano, reagendando-o após falhas temporárias do Ollama"""
+    try:
+        gerar_reforco(db, ollama, reforco_id)
+    except FALHAS_TEMPORARIAS as e:
+        if tentativa >= MAX_TENTATIVAS_REFORCO:
+            db.falhar_reforco(reforco_id, str(e))
+            return
+        logger.warning("Reforço %s adiado (tentativa %d de %d): %s",
+                       reforco_id, tentativa, MAX_TENTATIVAS_REFORCO, e)
+        enfileirar_reforco(db, ollama, reforco_id, tentativa + 1, ESPERA_REAGENDAMENTO_REFORCO)
+
+
+def gerar_reforco(db: Database, ollama: OllamaClient, reforco_id: int,
+                  prioridade: int = PRIORIDADE_SEGUNDO_PLANO) -> Optional[Dict]:
+    """
+    Monta as questões de um reforço com status 'pendente' (banco de questões e IA)
+    e as grava no banco; se nenhuma questão for obtida, o reforço é marcado como 'falhou'
+    e o erro é propagado. Após uma falha temporária do Ollama (FALHAS_TEMPORARIAS) o
+    reforço continua 'pendente', para ser tentado de novo.
+    
+    Args:
+        db: Banco de dados
+        ollama: Cliente Ollama
+        reforco_id: ID do reforço (ver Database.criar_reforco)
+        prioridade: Classe de prioridade da geração no escalonador
+    
+    Returns:
+        O reforço atualizado (ver Database.obter_reforco), ou None se não existir
+    """
+    reforco = db.obter_reforco(reforco_id)
+    if reforco is None or reforco['status'] != 'pendente':
+        return reforco
+    
+    try:
+        questoes, do_banco = montar_reforco(
+            db, ollama,
+            topicos_dificuldade=reforco['topicos'],
+            disciplina=reforco['disciplina'],
+            num_questoes=reforco['num_questoes'],
+            nome_aluno=reforco['nome_aluno'],
+            matricula=reforco['matricula_aluno'],
+            prioridade=prioridade
+        )
+    except FALHAS_TEMPORARIAS:
+        raise
+    except Exception as e:
+        db.falhar_reforco(reforco_id, str(e))
+        raise
+    
+    db.concluir_reforco(reforco_id, questoes, do_banco)
+    return db.obter_reforco(reforco_id)
+
+
+def recuperar_analises_pendentes(db: Database, ollama: OllamaClient):
+    """
+    Reenfileira as análises e os reforços que ficaram pendentes (ex.: a aplicação foi
+    reiniciada antes de a fila terminar). Executa apenas uma vez por processo.
+    """
+    global _pendentes_recuperados
+    with _fila_lock:
+        if _pendentes_recuperados:
+            return
+        _pendentes_recuperados = True
+    
+    fila = obter_fila()
+    for resultado_id in db.listar_analises_pendentes():
+        fila.submit(analisar_resultado, db, ollama, resultado_id)
+    for reforco_id in db.listar_reforcos_pendentes():
+        enfileirar_reforco(db, ollama, reforco_id)
+
+
+def obter_indice_questoes(db: Database, modelo_embeddings: str) -> IndiceVetorial:
+    """
+    Retorna o índice de similaridade das questões salvas para o modelo de embeddings,
+    carregado do banco na primeira chamada do processo (sem chamar o modelo)
+    """
+    with _fila_lock:
+        if modelo_embeddings not in _indices:
+            indice = IndiceVetorial()
+            for id_questionario, indice_questao, vetor in db.listar_embeddings(modelo_embeddings):
+                indice.adicionar((id_questionario, indice_questao), blob_para_vetor(vetor))
+            _indices[modelo_embeddings] = indice
+        return _indices[modelo_embeddings]
+
+
+def criar_cliente(db: Database, hosts: Optional[List[str]] = None,
+                  model: Optional[str] = None) -> OllamaClient:
+    """
+    Cliente Ollama configurado pelo ambiente, como usado pelo app, pela API e pelos scripts
+    
+    Cada tarefa (geração, análise, reforço) pode usar outro modelo via PROFOCO_MODELO_<TAREFA>;
+    se o modelo da tarefa ficar lento (timeout), a requisição passa para o modelo de reserva
+    (PROFOCO_MODELO_RESERVA). O cache de análises e a telemetria das chamadas ficam no banco,
+    e o índice de embeddings do processo descarta questões quase iguais às já existentes.
+    
+    Args:
+        db: Banco de dados (cache de análises, telemetria e embeddings salvos)
+        hosts: Servidores Ollama (padrão: PROFOCO_OLLAMA_HOSTS)
+        model: Modelo padrão (padrão: PROFOCO_MODELO ou llama3.2:3b)
+    
+    Returns:
+        OllamaClient (o aquecimento do modelo não é iniciado)
+    """
+    return OllamaClient(
+        hosts=hosts or hosts_configurados(),
+        model=model or os.environ.get('PROFOCO_MODELO', "llama3.2:3b"),
+        cache_analises=db,
+        modelos=modelos_configurados(),
+        modelo_reserva=os.environ.get('PROFOCO_MODELO_RESERVA', "llama3.2:1b") or None,
+        indice_questoes=obter_indice_questoes(db, MODELO_EMBEDDINGS),
+        modelo_embeddings=MODELO_EMBEDDINGS,
+        telemetria=db
+    )
+
+
+def indexar_questionario(db: Database, ollama: OllamaClient, id_questionario: int):
+    """Calcula, grava e adiciona ao índice os embeddings das questões de um questionário"""
+    questionario = db.obter_questionario(id_questionario)
+    if questionario is None or not questionario['questoes'] or ollama.indice_questoes is None:
+        return
+    
+    vetores = ollama.embeddings(
+        [q['pergunta'] for q in questionario['questoes']], prioridade=PRIORIDADE_SEGUNDO_PLANO
+    )
+    db.salvar_embeddings(id_questionario, ollama.modelo_embeddings, [vetor_para_blob(v) for v in vetores])
+    for indice_questao, vetor in enumerate(vetores):
+        ollama.indice_questoes.adicionar((id_questionario, indice_questao), vetor)
+
+
+def indexar_questionarios_pendentes(db: Database, ollama: OllamaClient):
+    """
+    Enfileira a indexação dos questionários ainda sem embeddings (ex.: criados antes
+    do índice existir). Executa apenas uma vez por processo.
+    """
+    global _indexacao_iniciada
+    with _fila_lock:
+        if _indexacao_iniciada:
+            return
+        _indexacao_iniciada = True
+    
+    fila = obter_fila()
+    for id_questionario in db.listar_questionarios_sem_embeddings(ollama.modelo_embeddings):
+        fila.submit(indexar_questionario, db, ollama, id_questionario)
@@ -0,0 +1,9 @@
+"""
+Configuração comum dos testes: torna os módulos da raiz do projeto importáveis
+"""
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,150 @@
+"""
+Testes das transições de estado do disjuntor do servidor Ollama (DisjuntorOllama)
+"""
+import pytest
+
+import ollama_client
+from ollama_client import (
+    CIRCUITO_ABERTO, CIRCUITO_FECHADO, CIRCUITO_SEMIABERTO, FALHA_CONEXAO, FALHA_SERVIDOR,
+    FALHA_TIMEOUT, DisjuntorOllama, ServidorIndisponivelError
+)
+
+
+class Relogio:
+    """Substitui time.monotonic() para avançar o tempo sem esperar"""
+    
+    def __init__(self):
+        self.agora = 1000.0
+    
+    def __call__(self):
+        return self.agora
+    
+    def avancar(self, segundos):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(ollama_client.time, 'monotonic', relogio)
+    return relogio
+
+
+@pytest.fixture
+def disjuntor(relogio):
+    return DisjuntorOllama('http://ollama:11434', limite_falhas=3, espera=30, espera_maxima=100,
+                           duracao_maxima_teste=60)
+
+
+def abrir(disjuntor):
+    for _ in range(disjuntor.limite_falhas):
+        disjuntor.registrar_falha(FALHA_TIMEOUT, 'timeout')
+
+
+def test_fechado_abre_apos_o_limite_de_falhas(disjuntor):
+    disjuntor.registrar_falha(FALHA_SERVIDOR)
+    disjuntor.registrar_falha(FALHA_TIMEOUT)
+    assert disjuntor.estado()['estado'] == CIRCUITO_FECHADO
+    assert disjuntor.permitir() is False
+    
+    disjuntor.registrar_falha(FALHA_CONEXAO, 'recusada')
+    estado = disjuntor.estado()
+    assert estado['estado'] == CIRCUITO_ABERTO
+    assert estado['falhas'] == 3 and estado['ultimo_erro'] == 'recusada'
+    assert estado['proximo_teste'] == pytest.approx(30)
+
+
+def test_sucesso_zera_as_falhas_seguidas(disjuntor):
+    disjuntor.registrar_falha(FALHA_TIMEOUT)
+    disjuntor.registrar_falha(FALHA_TIMEOUT)
+    disjuntor.registrar_sucesso()
+    disjuntor.registrar_falha(FALHA_TIMEOUT)
+    disjuntor.registrar_falha(FALHA_TIMEOUT)
+    assert disjuntor.estado()['estado'] == CIRCUITO_FECHADO
+
+
+def test_aberto_recusa_ate_a_espera_passar(disjuntor, relogio):
+    abrir(disjuntor)
+    assert not disjuntor.disponivel()
+    with pytest.raises(ServidorIndisponivelError):
+        disjuntor.verificar()
+    with pytest.raises(ServidorIndisponivelError):
+        disjuntor.permitir()
+    
+    relogio.avancar(30)
+    assert disjuntor.disponivel()
+    assert disjuntor.estado()['estado'] == CIRCUITO_SEMIABERTO
+
+
+def test_semiaberto_deixa_passar_um_unico_teste(disjuntor, relogio):
+    abrir(disjuntor)
+    relogio.avancar(30)
+    assert disjuntor.permitir() is True
+    assert disjuntor.estado()['estado'] == CIRCUITO_SEMIABERTO
+    with pytest.raises(ServidorIndisponivelError):
+        disjuntor.permitir()
+    
+    disjuntor.registrar_sucesso()
+    estado = disjuntor.estado()
+    assert estado['estado'] == CIRCUITO_FECHADO and estado['falhas'] == 0
+    assert disjuntor.permitir() is False
+
+
+def test_teste_que_falha_reabre_com_o_dobro_da_espera(disjuntor, relogio):
+    abrir(disjuntor)
+    esperas = []
+    for _ in range(3):
+        relogio.avancar(disjuntor.estado()['proximo_teste'])
+        assert disjuntor.permitir() is True
+        disjuntor.registrar_falha(FALHA_TIMEOUT)
+        assert disjuntor.estado()['estado'] == CIRCUITO_ABERTO
+        esperas.append(disjuntor.estado()['proximo_teste'])
+    assert esperas == [pytest.approx(60), pytest.approx(100), pytest.approx(100)]
+    
+    # Depois de fechar, a espera volta à inicial
+    relogio.avancar(100)
+    disjuntor.permitir()
+    disjuntor.registrar_sucesso()
+    abrir(disjuntor)
+    assert disjuntor.estado()['proximo_teste'] == pytest.approx(30)
+
+
+def test_liberar_devolve_o_teste(disjuntor, relogio):
+    abrir(disjuntor)
+    relogio.avancar(30)
+    assert disjuntor.permitir() is True
+    disjuntor.liberar()
+    assert disjuntor.estado()['estado'] == CIRCUITO_SEMIABERTO
+    assert disjuntor.permitir() is True
+
+
+def test_teste_sem_desfecho_expira(disjuntor, relogio):
+    abrir(disjuntor)
+    relogio.avancar(30)
+    assert disjuntor.permitir() is True
+    relogio.avancar(60)
+    assert not disjuntor.disponivel()
+    relogio.avancar(1)
+    assert disjuntor.permitir() is True
+
+
+def test_sondas_de_saude(disjuntor, relogio):
+    # Servidor fora do ar: sonda sem resposta adia o teste
+    for _ in range(3):
+        disjuntor.registrar_sonda(False, 'sem conexão')
+    assert disjuntor.estado()['estado'] == CIRCUITO_ABERTO
+    relogio.avancar(25)
+    disjuntor.registrar_sonda(False, 'sem conexão')
+    assert disjuntor.estado()['proximo_teste'] == pytest.approx(15)
+    
+    # Voltou a responder: o teste pode ser feito na hora
+    disjuntor.registrar_sonda(True)
+    assert disjuntor.permitir() is True
+
+
+def test_sonda_nao_antecipa_teste_apos_falha_do_servidor(disjuntor):
+    for _ in range(3):
+        disjuntor.registrar_falha(FALHA_SERVIDOR, 'HTTP 500')
+    disjuntor.registrar_sonda(True)
+    with pytest.raises(ServidorIndisponivelError):
+        disjuntor.permitir()
@@ -0,0 +1,131 @@
+"""
+Testes dos jobs persistidos: reserva, heartbeat, conclusão e geração idempotente (worker.py)
+"""
+import sqlite3
+
+import pytest
+
+from database import Database
+from worker import JOB_GERAR_QUESTIONARIO, Worker
+
+QUESTOES = [{'pergunta': f'Pergunta {i}?', 'opcoes': ['a', 'b', 'c', 'd'], 'correta': 'A'} for i in range(3)]
+PARAMETROS = {'disciplina': 'Matemática', 'topico': 'Frações', 'num_questoes': 3}
+
+
+class OllamaFalso:
+    """Cliente com a interface usada pelo worker, sem servidor"""
+    indice_questoes = None
+    
+    def __init__(self, falha=None):
+        self.chamadas = 0
+        self.falha = falha
+    
+    def gerar_questoes(self, disciplina, topico, num_questoes, prioridade, progresso=None):
+        self.chamadas += 1
+        if self.falha is not None:
+            raise self.falha
+        return list(QUESTOES)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'profoco.db'))
+
+
+def expirar_heartbeat(db, job_id):
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE jobs SET heartbeat = datetime('now', '-1 hour') WHERE id = ?", (job_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_reserva_e_conclusao(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    
+    job = db.reivindicar_job('w1')
+    assert job['id'] == job_id and job['status'] == 'executando' and job['tentativas'] == 1
+    assert job['parametros'] == PARAMETROS
+    # Um job em execução com heartbeat em dia não é reservado por outro worker
+    assert db.reivindicar_job('w2') is None
+    
+    assert db.renovar_job(job_id, 'w1', {'questoes': [], 'total': 3})
+    assert db.concluir_job(job_id, 'w1', {'id_questionario': 7})
+    job = db.obter_job(job_id)
+    assert job['status'] == 'concluido' and job['resultado'] == {'id_questionario': 7}
+    assert db.reivindicar_job('w2') is None
+
+
+def test_job_abandonado_e_retomado_por_outro_worker(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    db.reivindicar_job('w1')
+    expirar_heartbeat(db, job_id)
+    
+    job = db.reivindicar_job('w2')
+    assert job['id'] == job_id and job['worker'] == 'w2' and job['tentativas'] == 2
+    # O worker original perdeu a reserva: não renova nem conclui
+    assert not db.renovar_job(job_id, 'w1')
+    assert not db.concluir_job(job_id, 'w1', {})
+    assert db.concluir_job(job_id, 'w2', {})
+
+
+def test_job_abandonado_muitas_vezes_falha(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    db.reivindicar_job('w1', max_tentativas=1)
+    expirar_heartbeat(db, job_id)
+    
+    assert db.reivindicar_job('w2', max_tentativas=1) is None
+    assert db.obter_job(job_id)['status'] == 'falhou'
+
+
+def test_reagendado_volta_para_a_fila_depois_do_atraso(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    db.reivindicar_job('w1')
+    assert db.reagendar_job(job_id, 'w1', 'servidor fora do ar', atraso=3600)
+    assert db.reivindicar_job('w2') is None
+    assert db.reagendar_job(job_id, 'w1', 'x', 0) is False  # não está mais reservado
+
+
+def test_worker_gera_salva_e_conclui(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    ollama = OllamaFalso()
+    
+    assert Worker(db, ollama, nome='w1').executar_proximo()
+    job = db.obter_job(job_id)
+    assert job['status'] == 'concluido'
+    questionario = db.obter_questionario(job['resultado']['id_questionario'])
+    assert questionario['questoes'] == QUESTOES
+    assert not Worker(db, ollama, nome='w1').executar_proximo()
+
+
+def test_retomada_reaproveita_questionario_ja_salvo(db):
+    # Worker interrompido entre salvar o questionário e concluir o job
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    db.reivindicar_job('w1')
+    questionario_id = db.criar_questionario_job(job_id, 'w1', 'Matemática', 'Frações', QUESTOES)
+    expirar_heartbeat(db, job_id)
+    
+    ollama = OllamaFalso()
+    assert Worker(db, ollama, nome='w2').executar_proximo()
+    assert ollama.chamadas == 0
+    assert db.obter_job(job_id)['resultado']['id_questionario'] == questionario_id
+    assert len(db.listar_questionarios()) == 1
+    # Uma nova gravação para o mesmo job devolve o mesmo questionário
+    assert db.criar_questionario_job(job_id, 'w2', 'Matemática', 'Frações', QUESTOES) == questionario_id
+
+
+def test_worker_que_perdeu_o_job_nao_salva(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    db.reivindicar_job('w1')
+    expirar_heartbeat(db, job_id)
+    db.reivindicar_job('w2')
+    
+    assert db.criar_questionario_job(job_id, 'w1', 'Matemática', 'Frações', QUESTOES) is None
+    assert db.listar_questionarios() == []
+
+
+def test_servidor_fora_do_ar_reagenda(db):
+    job_id = db.criar_job(JOB_GERAR_QUESTIONARIO, PARAMETROS)
+    
+    assert Worker(db, OllamaFalso(falha=ConnectionError("sem conexão")), nome='w1').executar_proximo()
+    job = db.obter_job(job_id)
+    assert job['status'] == 'pendente' and job['erro'] == 'sem conexão' and job['worker'] is None
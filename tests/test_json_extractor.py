@@ -0,0 +1,66 @@
+"""
+Testes do extrator tolerante de JSON (json_extractor.py)
+"""
+import json
+import os
+
+import pytest
+
+from json_extractor import extract_json, normalizar_questoes
+
+QUESTAO = {'pergunta': 'Quanto é 2 + 2?', 'opcoes': ['3', '4', '5', '6'], 'correta': 'B'}
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      'benchmarks', 'corpus_respostas.jsonl')
+
+
+def test_json_puro():
+    assert extract_json(json.dumps({'questoes': [QUESTAO]})) == {'questoes': [QUESTAO]}
+
+
+@pytest.mark.parametrize('texto', [
+    f"Aqui estão as questões:\n{json.dumps([QUESTAO])}\nEspero que ajude!",
+    f"```json\n{json.dumps([QUESTAO])}\n```",
+    f"Veja [abaixo] e [1]: {json.dumps([QUESTAO])}",
+])
+def test_json_valido_com_texto_ao_redor(texto):
+    assert extract_json(texto) == [QUESTAO]
+
+
+def test_aspas_simples_virgulas_sobrando_e_literais_python():
+    texto = "[{'pergunta': 'Quanto é 2 + 2?', 'opcoes': ['3', '4', '5', '6',], 'correta': 'B', 'revisada': True,},]"
+    assert extract_json(texto) == [dict(QUESTAO, revisada=True)]
+
+
+def test_chaves_sem_aspas():
+    assert extract_json('{nivel_dominio: "Básico", acertos: 2}') == {'nivel_dominio': 'Básico', 'acertos': 2}
+
+
+def test_resposta_truncada_preserva_questoes_completas():
+    completo = json.dumps({'questoes': [QUESTAO, QUESTAO]})
+    truncado = completo[:completo.rindex('"correta"')]
+    questoes = normalizar_questoes(extract_json(truncado), estrito=True)
+    assert questoes == [QUESTAO]
+
+
+def test_escapes_em_strings():
+    assert extract_json('{"pergunta": "Diga \\"olá\\" \\u00e0 turma"}') == {'pergunta': 'Diga "olá" à turma'}
+
+
+def test_sem_json_levanta_value_error():
+    with pytest.raises(ValueError):
+        extract_json("Desculpe, não posso ajudar com isso.")
+
+
+def test_corpus_do_benchmark():
+    with open(CORPUS, encoding='utf-8') as f:
+        casos = [json.loads(linha) for linha in f if linha.strip()]
+    for caso in casos:
+        if caso['esperado'] == 0:
+            with pytest.raises(ValueError):
+                extract_json(caso['texto'])
+            continue
+        data = extract_json(caso['texto'])
+        if caso['tarefa'] == 'analise':
+            assert 'nivel_dominio' in data, caso['descricao']
+        else:
+            assert len(normalizar_questoes(data)) >= caso['esperado'], caso['descricao']
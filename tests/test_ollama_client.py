@@ -0,0 +1,155 @@
+"""
+Testes dos clientes Ollama (síncrono e assíncrono) contra o Ollama falso de benchmarks/
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+from ollama_client import AsyncOllamaClient, OllamaClient, obter_disjuntor
+from vector_index import IndiceVetorial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import fake_ollama  # noqa: E402
+
+QUESTOES = [{'pergunta': f'Pergunta {i}?', 'opcoes': ['A) a', 'B) b', 'C) c', 'D) d'], 'correta': 'A'}
+            for i in range(3)]
+
+
+@pytest.fixture
+def servidor():
+    servidor = fake_ollama.iniciar(porta=0, latencia=0.0, tokens_por_s=1e6, variacao=0.0, semente=1)
+    yield servidor
+    servidor.shutdown()
+
+
+def url(servidor):
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def porta_fechada():
+    """URL em que nada escuta (a porta foi liberada logo após ser reservada)"""
+    servidor = fake_ollama.iniciar(porta=0)
+    endereco = url(servidor)
+    servidor.shutdown()
+    servidor.server_close()
+    return endereco
+
+
+@pytest.mark.parametrize('assincrono', [False, True])
+def test_gerar_questoes_com_progresso(servidor, assincrono):
+    parciais = []
+    if assincrono:
+        async def gerar():
+            async with AsyncOllamaClient(url(servidor), model='falso-gerar') as cliente:
+                return await cliente.gerar_questoes('Matemática', 'Frações', 4, progresso=parciais.append)
+        questoes = asyncio.run(gerar())
+    else:
+        cliente = OllamaClient(url(servidor), model='falso-gerar')
+        questoes = cliente.gerar_questoes('Matemática', 'Frações', 4, progresso=parciais.append)
+    
+    assert len(questoes) == 4
+    assert all(q['correta'] in 'ABCD' and len(q['opcoes']) == 4 for q in questoes)
+    assert parciais and parciais[-1] == questoes
+
+
+def test_analise_e_reforco_assincronos(servidor):
+    async def executar():
+        async with AsyncOllamaClient(url(servidor), model='falso-analise') as cliente:
+            analise = await cliente.analisar_respostas(QUESTOES, ['A', 'B', 'A'], 'Ana', 'Matemática', 'Frações')
+            reforco = await cliente.gerar_reforco(['frações'], 'Matemática', 2)
+        return analise, reforco
+    analise, reforco = asyncio.run(executar())
+    
+    assert analise['acertos'] == 2 and analise['erros'] == 1
+    assert analise['nota'] == 66.7
+    assert len(reforco) == 2
+    assert servidor.estatisticas()['geracoes'] == 2
+
+
+def test_deduplicacao_assincrona_usa_o_indice(servidor):
+    salva = 'Qual é a soma de frações com denominadores iguais?'
+    indice = IndiceVetorial()
+    indice.adicionar((1, 0), fake_ollama._embedding(salva))
+    nova = {'pergunta': 'Como multiplicar números primos?', 'opcoes': [], 'correta': 'A'}
+    
+    async def deduplicar():
+        async with AsyncOllamaClient(url(servidor), model='falso-dedup', indice_questoes=indice,
+                                     modelo_embeddings='falso-embed') as cliente:
+            return await cliente._deduplicar([
+                {'pergunta': salva.upper(), 'opcoes': [], 'correta': 'B'},
+                nova,
+                dict(nova)
+            ])
+    assert asyncio.run(deduplicar()) == [nova]
+    assert servidor.estatisticas()['embeddings'] == 1
+
+
+def test_pool_passa_ao_proximo_servidor(servidor):
+    fora = porta_fechada()
+    
+    async def gerar():
+        async with AsyncOllamaClient(hosts=[fora, url(servidor)], model='falso-pool') as cliente:
+            return await cliente.gerar_reforco(['frações'], 'Matemática', 1)
+    # O servidor fora do ar pode ou não ser o escolhido primeiro; a resposta vem do outro
+    assert len(asyncio.run(gerar())) == 1
+
+
+def test_sem_conexao_registra_falha_no_disjuntor():
+    fora = porta_fechada()
+    
+    async def gerar():
+        async with AsyncOllamaClient(fora, model='falso-fora') as cliente:
+            return await cliente.gerar_reforco(['frações'], 'Matemática', 1)
+    with pytest.raises(ConnectionError):
+        asyncio.run(gerar())
+    assert obter_disjuntor(fora).estado()['falhas'] == 1
+
+
+def test_timeout_cancela_a_requisicao():
+    lento = fake_ollama.iniciar(porta=0, latencia=2.0, variacao=0.0)
+    try:
+        async def gerar():
+            async with AsyncOllamaClient(url(lento), model='falso-lento', timeout=0.2) as cliente:
+                return await cliente.gerar_reforco(['frações'], 'Matemática', 1)
+        with pytest.raises(TimeoutError):
+            asyncio.run(gerar())
+        assert obter_disjuntor(url(lento)).estado()['ultimo_erro'].startswith('Timeout')
+    finally:
+        lento.shutdown()
+
+
+def test_erro_http_500_nao_e_repetido_no_mesmo_servidor():
+    falho = fake_ollama.iniciar(porta=0, latencia=0.0, erros=1.0)
+    try:
+        cliente = OllamaClient(url(falho), model='falso-500')
+        with pytest.raises(Exception, match='Erro ao comunicar com Ollama'):
+            cliente.gerar_reforco(['frações'], 'Matemática', 1)
+        assert falho.estatisticas()['requisicoes'] == 1
+    finally:
+        falho.shutdown()
+
+
+@pytest.mark.parametrize('assincrono', [False, True])
+def test_conexao_cortada_conta_como_falha_de_conexao(servidor, assincrono):
+    cortado = fake_ollama.iniciar(porta=0, latencia=0.0, cortadas=1.0)
+    
+    def reforco(hosts):
+        if assincrono:
+            async def gerar():
+                async with AsyncOllamaClient(hosts=hosts, model='falso-cortado') as cliente:
+                    return await cliente.gerar_reforco(['frações'], 'Matemática', 1)
+            return asyncio.run(gerar())
+        return OllamaClient(hosts=hosts, model='falso-cortado').gerar_reforco(['frações'], 'Matemática', 1)
+    
+    try:
+        with pytest.raises(ConnectionError):
+            reforco([url(cortado)])
+        assert cortado.estatisticas()['cortadas'] == 1
+        assert obter_disjuntor(url(cortado)).estado()['falhas'] == 1
+        
+        # Com outro servidor no pool, a requisição passa a ele
+        assert len(reforco([url(cortado), url(servidor)])) == 1
+    finally:
+        cortado.shutdown()
@@ -0,0 +1,125 @@
+"""
+Testes da preparação dos reforços (reforco.montar_reforco e tasks.gerar_reforco)
+"""
+import pytest
+
+import tasks
+from database import Database
+from ollama_client import FilaCheiaError, ServidorIndisponivelError
+from reforco import montar_reforco
+from tasks import gerar_reforco
+
+QUESTAO = {'pergunta': 'Quanto é 1/2 + 1/2?', 'opcoes': ['A) 1', 'B) 2', 'C) 1/4', 'D) 0'], 'correta': 'A'}
+
+
+class OllamaFalso:
+    """Cliente com o gerar_reforco do OllamaClient, sem servidor"""
+    
+    def __init__(self, questoes=None, falha=None):
+        self.questoes = questoes or []
+        self.falha = falha
+        self.chamadas = 0
+    
+    def gerar_reforco(self, topicos_dificuldade, disciplina, num_questoes, prioridade):
+        self.chamadas += 1
+        if self.falha is not None:
+            raise self.falha
+        return list(self.questoes)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'profoco.db'))
+
+
+def criar_reforco(db):
+    return db.criar_reforco('Ana', 'Matemática', ['frações'], 3, matricula_aluno='123', id_resultado=1)
+
+
+def test_montar_reforco_sem_questoes_falha(db):
+    # A IA devolveu só questões incompletas (descartadas por normalizar_questoes estrito)
+    with pytest.raises(ValueError):
+        montar_reforco(db, OllamaFalso(), ['frações'], 'Matemática', 3, 'Ana', '123')
+
+
+def test_reforco_vazio_e_marcado_como_falho(db):
+    reforco_id = criar_reforco(db)
+    with pytest.raises(ValueError):
+        gerar_reforco(db, OllamaFalso(), reforco_id)
+    
+    reforco = db.obter_reforco(reforco_id)
+    assert reforco['status'] == 'falhou' and reforco['questoes'] == []
+    assert 'Nenhuma questão' in reforco['erro']
+
+
+def test_reforco_com_questoes_fica_pronto(db):
+    reforco_id = criar_reforco(db)
+    reforco = gerar_reforco(db, OllamaFalso([QUESTAO]), reforco_id)
+    assert reforco['status'] == 'pronto'
+    assert reforco['questoes'] == [QUESTAO] and reforco['do_banco'] == 0
+
+
+class FilaFalsa:
+    def __init__(self):
+        self.tarefas = []
+    
+    def submit(self, func, *args):
+        self.tarefas.append((func, args))
+
+
+def test_reforco_vai_para_a_fila_propria(db, monkeypatch):
+    fila_analises, fila_reforco = FilaFalsa(), FilaFalsa()
+    monkeypatch.setattr(tasks, 'obter_fila', lambda: fila_analises)
+    monkeypatch.setattr(tasks, 'obter_fila_reforco', lambda: fila_reforco)
+    resultado = {'id': 7, 'nota': 40.0, 'nome_aluno': 'Ana', 'matricula_aluno': '123',
+                 'disciplina': 'Matemática', 'topico': 'Frações',
+                 'analise': {'topicos_dificuldade': ['soma de frações']}}
+    
+    reforco_id = tasks.agendar_reforco(db, OllamaFalso(), resultado)
+    assert fila_analises.tarefas == []
+    assert [(func, args[2]) for func, args in fila_reforco.tarefas] == [(tasks._preparar_reforco, reforco_id)]
+    # Um reforço por resultado
+    assert tasks.agendar_reforco(db, OllamaFalso(), resultado) is None
+
+
+@pytest.mark.parametrize('falha', [TimeoutError('timeout'), ConnectionError('sem conexão'),
+                                   ServidorIndisponivelError('disjuntor aberto'), FilaCheiaError('fila cheia')])
+def test_falha_temporaria_mantem_o_reforco_pendente(db, falha):
+    reforco_id = criar_reforco(db)
+    with pytest.raises(type(falha)):
+        gerar_reforco(db, OllamaFalso(falha=falha), reforco_id)
+    assert db.obter_reforco(reforco_id)['status'] == 'pendente'
+
+
+def test_falha_temporaria_reagenda_em_segundo_plano(db, monkeypatch):
+    reagendados = []
+    monkeypatch.setattr(tasks, 'enfileirar_reforco',
+                        lambda db, ollama, reforco_id, tentativa=1, atraso=0: reagendados.append((tentativa, atraso)))
+    reforco_id = criar_reforco(db)
+    ollama = OllamaFalso(falha=TimeoutError('timeout'))
+    
+    tasks._preparar_reforco(db, ollama, reforco_id, 1)
+    assert reagendados == [(2, tasks.ESPERA_REAGENDAMENTO_REFORCO)]
+    assert db.obter_reforco(reforco_id)['status'] == 'pendente'
+    
+    # Na última tentativa, desiste
+    tasks._preparar_reforco(db, ollama, reforco_id, tasks.MAX_TENTATIVAS_REFORCO)
+    assert len(reagendados) == 1
+    assert db.obter_reforco(reforco_id)['status'] == 'falhou'
+
+
+def test_reforco_reagendado_fica_pronto_quando_o_servidor_volta(db, monkeypatch):
+    fila = FilaFalsa()
+    monkeypatch.setattr(tasks, 'obter_fila_reforco', lambda: fila)
+    monkeypatch.setattr(tasks, 'ESPERA_REAGENDAMENTO_REFORCO', 0)
+    reforco_id = criar_reforco(db)
+    ollama = OllamaFalso([QUESTAO], falha=ConnectionError('sem conexão'))
+    
+    tasks.enfileirar_reforco(db, ollama, reforco_id)
+    func, args = fila.tarefas.pop(0)
+    func(*args)
+    ollama.falha = None
+    func, args = fila.tarefas.pop(0)
+    assert args[3] == 2
+    func(*args)
+    assert db.obter_reforco(reforco_id)['status'] == 'pronto'
@@ -0,0 +1,111 @@
+"""
+Testes dos agregados incrementais do Dashboard (resumo_turma.py)
+"""
+import pytest
+
+import resumo_turma
+from database import Database
+from resumo_turma import ResumoTurma, faixa_nota
+
+QUESTOES = [{'pergunta': 'P?', 'opcoes': ['a', 'b', 'c', 'd'], 'correta': 'A'}]
+
+
+def analise(topicos, pendente=False):
+    return {
+        'nivel_dominio': 'Básico',
+        'topicos_dificuldade': topicos,
+        'status_analise': 'pendente' if pendente else 'concluida',
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'profoco.db'))
+    db.mat = db.criar_questionario('Matemática', 'Frações', QUESTOES)
+    db.ing = db.criar_questionario('Inglês', 'Verbo To Be', QUESTOES)
+    return db
+
+
+def salvar(db, id_questionario, aluno, nota, topicos=(), pendente=False):
+    return db.salvar_resultado(id_questionario, aluno, ['A'], nota, analise(list(topicos), pendente))
+
+
+@pytest.mark.parametrize('nota, faixa', [(0, 0), (9.9, 0), (10, 1), (69.9, 6), (70, 7), (99, 9), (100, 9)])
+def test_faixa_nota(nota, faixa):
+    assert faixa_nota(nota) == faixa
+
+
+def test_primeira_atualizacao_le_o_historico(db):
+    salvar(db, db.mat, 'Ana', 40, ['frações'])
+    salvar(db, db.mat, 'Bia', 80)
+    salvar(db, db.ing, 'Ana', 100)
+    
+    retrato = ResumoTurma().atualizar(db)
+    assert retrato['novos'] == 3 and retrato['resultados'] == 3
+    assert retrato['nota_media'] == pytest.approx((40 + 80 + 100) / 3)
+    assert retrato['alunos_unicos'] == 2
+    assert retrato['taxa_aprovacao'] == pytest.approx(200 / 3)
+    assert retrato['disciplinas'] == ['Inglês', 'Matemática']
+    assert retrato['histograma'] == [{'faixa': 4, 'quantidade': 1}, {'faixa': 8, 'quantidade': 1},
+                                     {'faixa': 9, 'quantidade': 1}]
+    assert {'faixa': 9, 'disciplina': 'Inglês', 'quantidade': 1} in retrato['histograma_disciplinas']
+    assert retrato['dificuldades'] == {'frações': 1}
+    assert [r['nome_aluno'] for r in retrato['recentes']] == ['Ana', 'Bia', 'Ana']
+
+
+def test_atualizacoes_seguintes_somam_so_os_novos(db):
+    resumo = ResumoTurma()
+    salvar(db, db.mat, 'Ana', 50)
+    resumo.atualizar(db)
+    
+    assert resumo.atualizar(db)['novos'] == 0
+    ultimo = salvar(db, db.ing, 'Caio', 90)
+    retrato = resumo.atualizar(db)
+    assert retrato['novos'] == 1 and retrato['resultados'] == 2 and retrato['ultimo_id'] == ultimo
+    assert retrato['nota_media'] == pytest.approx(70)
+
+
+def test_feed_lido_em_lotes(db, monkeypatch):
+    monkeypatch.setattr(resumo_turma, 'LOTE_FEED', 2)
+    for i in range(5):
+        salvar(db, db.mat, f'Aluno {i}', 10 * i)
+    assert ResumoTurma().atualizar(db)['resultados'] == 5
+
+
+def test_analise_concluida_troca_os_topicos(db):
+    resumo = ResumoTurma()
+    resultado_id = salvar(db, db.mat, 'Ana', 30, ['Frações'], pendente=True)
+    retrato = resumo.atualizar(db)
+    assert retrato['pendentes'] == 1 and retrato['dificuldades'] == {'Frações': 1}
+    
+    db.atualizar_analise(resultado_id, analise(['soma de frações', 'simplificação']))
+    retrato = resumo.atualizar(db)
+    assert retrato['novos'] == 0 and retrato['pendentes'] == 0
+    assert retrato['dificuldades'] == {'soma de frações': 1, 'simplificação': 1}
+    assert retrato['recentes'][0]['topicos_dificuldade'] == ['soma de frações', 'simplificação']
+
+
+def test_recentes_limitados(db):
+    for i in range(5):
+        salvar(db, db.mat, f'Aluno {i}', 50)
+    retrato = ResumoTurma(max_recentes=3).atualizar(db)
+    assert [r['nome_aluno'] for r in retrato['recentes']] == ['Aluno 4', 'Aluno 3', 'Aluno 2']
+
+
+def test_agregados_iguais_aos_do_banco(db):
+    for i in range(40):
+        salvar(db, db.mat if i % 3 else db.ing, f'Aluno {i % 7}', (i * 37) % 101)
+    retrato = ResumoTurma().atualizar(db)
+    
+    conn = db.get_connection()
+    total, media, aprovados = conn.execute(
+        "SELECT COUNT(*), AVG(nota), SUM(nota >= 70) FROM resultados"
+    ).fetchone()
+    faixas = dict(conn.execute(
+        "SELECT MIN(CAST(nota / 10 AS INTEGER), 9) AS faixa, COUNT(*) FROM resultados GROUP BY faixa"
+    ).fetchall())
+    conn.close()
+    assert retrato['resultados'] == total
+    assert retrato['nota_media'] == pytest.approx(media)
+    assert retrato['taxa_aprovacao'] == pytest.approx(aprovados / total * 100)
+    assert {h['faixa']: h['quantidade'] for h in retrato['histograma']} == faixas
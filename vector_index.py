@@ -0,0 +1,144 @@
+"""
+Índice vetorial (NumPy) para busca de questões semelhantes por similaridade de cosseno
+"""
+import threading
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalizar(vetor: Sequence[float]) -> np.ndarray:
+    """Converte para float32 com norma 1 (o produto escalar passa a ser o cosseno)"""
+    v = np.asarray(vetor, dtype=np.float32)
+    norma = float(np.linalg.norm(v))
+    return v / norma if norma > 0 else v
+
+
+def vetor_para_blob(vetor: Sequence[float]) -> bytes:
+    """Serializa um vetor para gravação em uma coluna BLOB do SQLite"""
+    return np.asarray(vetor, dtype=np.float32).tobytes()
+
+
+def blob_para_vetor(blob: bytes) -> np.ndarray:
+    """Inverso de vetor_para_blob()"""
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class IndiceVetorial:
+    """
+    Índice em memória com busca exata (força bruta) por similaridade de cosseno.
+    
+    Os vetores ficam normalizados em uma única matriz float32, de modo que a busca
+    é um produto matriz-vetor. Para os volumes de uma escola (milhares de questões)
+    isso responde em poucos milissegundos, sem dependências além do NumPy.
+    """
+    
+    def __init__(self, capacidade_inicial: int = 256):
+        self._lock = threading.Lock()
+        self._capacidade_inicial = capacidade_inicial
+        self._matriz: Optional[np.ndarray] = None
+        self._chaves: List[Hashable] = []
+        self._posicoes = {}
+    
+    def __len__(self) -> int:
+        return len(self._chaves)
+    
+    @property
+    def dimensao(self) -> Optional[int]:
+        return None if self._matriz is None else self._matriz.shape[1]
+    
+    def __contains__(self, chave: Hashable) -> bool:
+        return chave in self._posicoes
+    
+    def adicionar(self, chave: Hashable, vetor: Sequence[float]):
+        """
+        Adiciona (ou substitui) o vetor associado à chave
+        
+        Args:
+            chave: Identificador do item (ex.: (id_questionario, indice_questao))
+            vetor: Embedding do item
+        
+        Raises:
+            ValueError: se a dimensão não for a mesma dos vetores já indexados
+        """
+        v = normalizar(vetor)
+        with self._lock:
+            if self._matriz is None:
+                self._matriz = np.zeros((self._capacidade_inicial, v.shape[0]), dtype=np.float32)
+            elif v.shape[0] != self._matriz.shape[1]:
+                raise ValueError(
+                    f"Dimensão do vetor ({v.shape[0]}) diferente da do índice ({self._matriz.shape[1]})"
+                )
+            
+            if chave in self._posicoes:
+                self._matriz[self._posicoes[chave]] = v
+                return
+            
+            n = len(self._chaves)
+            if n == self._matriz.shape[0]:
+                # Dobra a capacidade para manter a inserção amortizada O(1)
+                nova = np.zeros((n * 2, self._matriz.shape[1]), dtype=np.float32)
+                nova[:n] = self._matriz
+                self._matriz = nova
+            self._matriz[n] = v
+            self._chaves.append(chave)
+            self._posicoes[chave] = n
+    
+    def buscar(self, vetor: Sequence[float], k: int = 5, limiar: float = -1.0) -> List[Tuple[Hashable, float]]:
+        """
+        Itens mais semelhantes ao vetor
+        
+        Args:
+            vetor: Embedding da consulta
+            k: Número máximo de resultados
+            limiar: Similaridade mínima (cosseno, entre -1 e 1)
+        
+        Returns:
+            Lista de (chave, similaridade), da mais para a menos semelhante
+        """
+        with self._lock:
+            n = len(self._chaves)
+            if n == 0 or k <= 0:
+                return []
+            v = normalizar(vetor)
+            if v.shape[0] != self._matriz.shape[1]:
+                return []
+            similaridades = self._matriz[:n] @ v
+            chaves = list(self._chaves)
+        
+        k = min(k, n)
+        melhores = np.argpartition(-similaridades, k - 1)[:k]
+        melhores = melhores[np.argsort(-similaridades[melhores])]
+        return [(chaves[i], float(similaridades[i])) for i in melhores if similaridades[i] >= limiar]
+    
+    def maior_similaridade(self, vetor: Sequence[float]) -> float:
+        """Similaridade com o item mais próximo (-1.0 se o índice estiver vazio)"""
+        resultado = self.buscar(vetor, k=1)
+        return resultado[0][1] if resultado else -1.0
+
+
+def filtrar_similares(vetores: List[Sequence[float]], limiar: float,
+                      indice: Optional[IndiceVetorial] = None) -> List[int]:
+    """
+    Seleciona, em ordem, os vetores que não são quase iguais a um anterior da lista
+    nem a um item do índice
+    
+    Args:
+        vetores: Embeddings candidatos
+        limiar: Similaridade (cosseno) a partir da qual dois itens são duplicatas
+        indice: Índice com os itens já existentes (opcional)
+    
+    Returns:
+        Posições dos vetores aceitos
+    """
+    aceitos: List[int] = []
+    matriz_aceitos: List[np.ndarray] = []
+    for i, vetor in enumerate(vetores):
+        v = normalizar(vetor)
+        if matriz_aceitos and float(np.max(np.stack(matriz_aceitos) @ v)) >= limiar:
+            continue
+        if indice is not None and indice.maior_similaridade(v) >= limiar:
+            continue
+        aceitos.append(i)
+        matriz_aceitos.append(v)
+    return aceitos
@@ -0,0 +1,218 @@
+"""
+Worker dos jobs persistidos no banco (tabela jobs): geração de questionários com IA
+
+Pode rodar como processo separado (python worker.py) ou embutido no app
+(iniciar_worker_embutido). Os jobs sobrevivem a reinícios: cada job em execução
+renova seu heartbeat e, se o worker parar, outro worker o reivindica.
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from database import Database
+from ollama_client import (
+    OllamaClient, FilaCheiaError, ServidorIndisponivelError, PRIORIDADE_PROFESSOR, definir_sessao
+)
+from tasks import criar_cliente, indexar_questionario
+
+logger = logging.getLogger(__name__)
+
+JOB_GERAR_QUESTIONARIO = 'gerar_questionario'
+
+# Heartbeat: intervalo de renovação e tempo sem renovação para o job ser retomado por outro worker
+INTERVALO_HEARTBEAT = 20
+EXPIRACAO_HEARTBEAT = 120
+
+# Execuções permitidas por job e espera antes de repetir um job com o servidor fora do ar
+MAX_TENTATIVAS_JOB = 5
+ESPERA_REAGENDAMENTO = 30
+
+
+class JobRetomadoError(Exception):
+    """O job deixou de estar reservado para este worker (heartbeat expirado e job retomado por outro)"""
+
+
+class Worker:
+    def __init__(self, db: Database, ollama: OllamaClient, nome: Optional[str] = None,
+                 intervalo: float = 2.0):
+        """
+        Args:
+            db: Banco de dados com a tabela jobs
+            ollama: Cliente Ollama usado pelos jobs
+            nome: Identificador do worker (padrão: host, PID e sufixo aleatório)
+            intervalo: Segundos entre consultas quando a fila está vazia
+        """
+        self.db = db
+        self.ollama = ollama
+        self.nome = nome or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.intervalo = intervalo
+        self._executores: Dict[str, Callable[[Dict, Callable[[Dict], None]], Dict]] = {
+            JOB_GERAR_QUESTIONARIO: self._gerar_questionario,
+        }
+    
+    def executar_proximo(self) -> bool:
+        """
+        Reivindica e executa um job
+        
+        Returns:
+            True se algum job foi executado (com sucesso ou não)
+        """
+        job = self.db.reivindicar_job(self.nome, EXPIRACAO_HEARTBEAT, MAX_TENTATIVAS_JOB)
+        if job is None:
+            return False
+        
+        executor = self._executores.get(job['tipo'])
+        if executor is None:
+            self.db.falhar_job(job['id'], self.nome, f"Tipo de job desconhecido: {job['tipo']}")
+            return True
+        
+        # As requisições do job formam uma sessão própria no escalonador
+        definir_sessao(f"job-{job['id']}")
+        parar = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._manter_heartbeat, args=(job['id'], parar),
+            name=f"profoco-job-{job['id']}-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        
+        def progresso(dados: Dict):
+            try:
+                self.db.renovar_job(job['id'], self.nome, dados)
+            except Exception:
+                logger.warning("Falha ao gravar o progresso do job %s", job['id'], exc_info=True)
+        
+        try:
+            resultado = executor(job, progresso)
+            if not self.db.concluir_job(job['id'], self.nome, resultado):
+                # O que o job salvou fica ligado a ele; o worker que o retomou reaproveita
+                logger.warning("Job %s foi retomado por outro worker antes de ser concluído", job['id'])
+        except JobRetomadoError:
+            logger.warning("Job %s foi retomado por outro worker; resultado descartado", job['id'])
+        except (FilaCheiaError, ServidorIndisponivelError, ConnectionError, TimeoutError) as e:
+            # Servidor sobrecarregado ou fora do ar: tenta de novo mais tarde
+            if job['tentativas'] >= MAX_TENTATIVAS_JOB:
+                self.db.falhar_job(job['id'], self.nome, str(e))
+            else:
+                self.db.reagendar_job(job['id'], self.nome, str(e), ESPERA_REAGENDAMENTO)
+        except Exception as e:
+            logger.exception("Falha ao executar o job %s", job['id'])
+            self.db.falhar_job(job['id'], self.nome, str(e))
+        finally:
+            parar.set()
+            definir_sessao(None)
+        return True
+    
+    def _manter_heartbeat(self, job_id: int, parar: threading.Event):
+        # Mantém o job reservado enquanto uma chamada longa ao modelo não reporta progresso
+        while not parar.wait(INTERVALO_HEARTBEAT):
+            try:
+                self.db.renovar_job(job_id, self.nome)
+            except Exception:
+                logger.warning("Falha ao renovar o heartbeat do job %s", job_id, exc_info=True)
+    
+    def _gerar_questionario(self, job: Dict, progresso: Callable[[Dict], None]) -> Dict:
+        """
+        Gera as questões, salva o questionário com criar_questionario_job e indexa as questões
+        
+        Idempotente: se uma execução anterior do job já salvou o questionário (e parou
+        antes de concluir o job), ele é reaproveitado sem gerar de novo.
+        
+        Raises:
+            JobRetomadoError: se o job foi retomado por outro worker antes de salvar
+        """
+        existente = self.db.questionario_do_job(job['id'])
+        if existente is not None:
+            return {'id_questionario': existente['id'], 'num_questoes': len(existente['questoes'])}
+        
+        parametros = job['parametros']
+        total = parametros['num_questoes']
+        
+        def questoes_parciais(questoes: List[Dict]):
+            progresso({'questoes': questoes, 'total': total})
+        
+        questoes_parciais([])
+        questoes = self.ollama.gerar_questoes(
+            disciplina=parametros['disciplina'],
+            topico=parametros['topico'],
+            num_questoes=total,
+            prioridade=PRIORIDADE_PROFESSOR,
+            progresso=questoes_parciais
+        )
+        questionario_id = self.db.criar_questionario_job(
+            job['id'], self.nome,
+            disciplina=parametros['disciplina'],
+            topico=parametros['topico'],
+            questoes=questoes
+        )
+        if questionario_id is None:
+            raise JobRetomadoError(f"Job {job['id']} retomado por outro worker")
+        
+        # Indexa as novas questões para as próximas verificações de duplicatas
+        try:
+            indexar_questionario(self.db, self.ollama, questionario_id)
+        except Exception:
+            logger.warning("Falha ao indexar o questionário %s", questionario_id, exc_info=True)
+        
+        return {'id_questionario': questionario_id, 'num_questoes': len(questoes)}
+    
+    def executar(self, parar: Optional[threading.Event] = None):
+        """Executa jobs até parar ser sinalizado (ou para sempre)"""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            try:
+                if self.executar_proximo():
+                    continue
+            except Exception:
+                # Ex.: banco bloqueado por outro processo; tenta de novo no próximo ciclo
+                logger.exception("Falha ao consultar a fila de jobs")
+            parar.wait(self.intervalo)
+
+
+_worker_embutido: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+
+def iniciar_worker_embutido(db: Database, ollama: OllamaClient):
+    """
+    Inicia (uma única vez por processo) uma thread que executa os jobs no próprio app.
+    Desative com PROFOCO_WORKER_EMBUTIDO=0 quando rodar python worker.py à parte.
+    """
+    global _worker_embutido
+    if os.environ.get('PROFOCO_WORKER_EMBUTIDO', '1') == '0':
+        return
+    with _worker_lock:
+        if _worker_embutido is not None:
+            return
+        _worker_embutido = threading.Thread(
+            target=Worker(db, ollama).executar, name="profoco-worker", daemon=True
+        )
+        _worker_embutido.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default="profoco.db", help="arquivo do banco (padrão: profoco.db)")
+    parser.add_argument('--intervalo', type=float, default=2.0,
+                        help="segundos entre consultas com a fila vazia (padrão: 2)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    
+    db = Database(args.db)
+    ollama = criar_cliente(db)
+    ollama.iniciar_aquecimento()
+    
+    worker = Worker(db, ollama, intervalo=args.intervalo)
+    logger.info("Worker %s aguardando jobs em %s", worker.nome, args.db)
+    try:
+        worker.executar()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()